@@ -1,5 +1,4 @@
 from graphics import Canvas
-import time
 import random
 import math
 
@@ -221,7 +220,7 @@ def main():
                 canvas.delete(collision)
 
         # Sleep
-        time.sleep(DELAY)                 
+        canvas.sleep(DELAY)                 
 
     # Show game over text
     game_over(canvas, score == BRICK_SCORE*NUM_ROW*NUM_COL)
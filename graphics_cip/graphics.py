@@ -1,5 +1,16 @@
+import atexit
+import collections
+import contextlib
+import functools
+import heapq
+import math
+import os
+import random
+import re
+import struct
+import threading
+import time
 import tkinter
-import tkinter.font
 
 """
 File: graphics.py
@@ -21,78 +32,25 @@ TODO notes:
 """
 
 
-class Canvas(tkinter.Canvas):
+class _CanvasFunctions:
     """
-    Canvas is a simplified interface on top of the tkinter Canvas to allow for easier manipulation of graphical objects.
-    Canvas has a variety of functionality to create, modify and delete graphical objects, and also get information
-    about the canvas contents.  Canvas is a subclass of `tkinter.Canvas`, so all tkinter functionality is also available
-    if needed.
-    """
-
-    DEFAULT_WIDTH = 500
-    """The default width of the canvas is 500."""
-
-    DEFAULT_HEIGHT = 600
-    """The default height of the canvas is 600."""
-
-    DEFAULT_TITLE = "Canvas"
-    """The default text shown in the canvas window titlebar is 'Canvas'."""
-
-    LEFT = tkinter.LEFT
-    """
-    Directions to use for adding interactors to different sides of the canvas.  
-    LEFT refers to the left side of the window.
-    """
-
-    BOTTOM = tkinter.BOTTOM
-    """
-    Directions to use for adding interactors to different sides of the canvas.  
-    BOTTOM refers to the bottom of the window.
-    """
-
-    RIGHT = tkinter.RIGHT
-    """
-    Directions to use for adding interactors to different sides of the canvas.  
-    RIGHT refers to the right side of the window.
-    """
-
-    TOP = tkinter.TOP
-    """
-    Directions to use for adding interactors to different sides of the canvas.  
-    TOP refers to the top side of the window.
+    The canvas functions that work the same way whatever shows the canvas, shared by `Canvas` and
+    `HeadlessCanvas`.  They are written against the shadow scene (`_scene`) and a small set of functions each
+    backend provides:
+    - _tk_command(*args) runs a canvas widget command in tkinter, if there is one
+    - _create(kind, coords, options) creates an object, and returns its id
+    - _create_shapes(kind, coords, fills, outlines, width) creates many rectangles or ovals, and returns their ids
+    - _create_image(x, y, file_path, width, height, **kwargs) creates an image object, and returns its id
+    - _backend_geometry(name, obj) answers a geometry query the shadow scene can't, or checks one it did
+    - _clock() returns the time in seconds, _color_rgb(color) parses a color, and _new_async_bridge() makes the
+      task that updates the canvas for the asyncio functions
+    - itemconfigure, itemcget, batch, update and config, as in tkinter
     """
 
-    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, title=DEFAULT_TITLE):
+    def _init_input(self):
         """
-        When creating a canvas, you can optionally specify a width and height.  If no width and height are specified,
-        the canvas is initialized with its default size.
-
-        Args:
-            width: the width of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_WIDTH`)
-            height: the height of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_HEIGHT`)
+        Sets up the input callbacks, queues and state every backend keeps.
         """
-
-        # Create the main program window
-        self.main_window = tkinter.Tk()
-        self.main_window.geometry("{}x{}".format(width, height))
-        self.main_window.title(title)
-
-        # Create 4 perimeter frames to hold any buttons added later
-        self.bottom_frame = tkinter.Frame(self.main_window)
-        self.bottom_frame.pack(side=Canvas.BOTTOM)
-
-        self.top_frame = tkinter.Frame(self.main_window)
-        self.top_frame.pack(side=Canvas.TOP)
-
-        self.right_frame = tkinter.Frame(self.main_window)
-        self.right_frame.pack(side=Canvas.RIGHT)
-
-        self.left_frame = tkinter.Frame(self.main_window)
-        self.left_frame.pack(side=Canvas.LEFT)
-
-        # call the tkinter Canvas constructor
-        super().__init__(self.main_window, width=width, height=height, bd=0, highlightthickness=0)
-
         # Optional callbacks the client can specify to be called on each event
         self.on_mouse_pressed = None
         self.on_mouse_released = None
@@ -102,14 +60,17 @@ class Canvas(tkinter.Canvas):
         # Tracks whether the mouse is currently on top of the canvas
         self.mouse_on_canvas = False
 
-        # List of presses not handled by a callback
-        self.mouse_presses = []
+        # Queue of presses not handled by a callback
+        self.mouse_presses = _InputQueue(Canvas.INPUT_QUEUE_CAPACITY, Canvas.INPUT_QUEUE_OVERFLOW)
+
+        # Queue of key presses not handled by a callback
+        self.key_presses = _InputQueue(Canvas.INPUT_QUEUE_CAPACITY, Canvas.INPUT_QUEUE_OVERFLOW)
 
-        # List of key presses not handled by a callback
-        self.key_presses = []
+        # Queue of button clicks not handled by a callback
+        self.button_clicks = _InputQueue(Canvas.INPUT_QUEUE_CAPACITY, Canvas.INPUT_QUEUE_OVERFLOW)
 
-        # List of button clicks not handled by a callback
-        self.button_clicks = []
+        # Set of the keysyms of the keys currently held down
+        self.keys_down = set()
 
         # Map of name -> (text field, label) tuple
         self.text_fields = {}
@@ -119,26 +80,34 @@ class Canvas(tkinter.Canvas):
         self.wait_for_click_click_happened = False
         self.currently_waiting_for_click = False
         self.last_click = []
+        self.wait_for_click_location = None
+
+        # The input recording being written by start_recording, or being played back by start_replay, if any,
+        # and the handler each kind of recorded input is passed to
+        self._recorder = None
+        self._replay = None
+        self._input_handlers = {
+            _LOG_MOUSE_PRESS: self.__mouse_pressed,
+            _LOG_MOUSE_RELEASE: self.__mouse_released,
+            _LOG_KEY_PRESS: self.__key_pressed,
+            _LOG_KEY_RELEASE: self.__key_released,
+            _LOG_FOCUS_OUT: lambda event: self.keys_down.clear(),
+            _LOG_BUTTON_CLICK: self.__button_clicked,
+        }
+
+    def _wake_wait_for_click(self):
+        """
+        Called when a click ends a `wait_for_click`, for backends that have to wake it up.
+        """
+        pass
 
-        # bind events
-        self.focus_set()
-        self.bind("<Button-1>", lambda event: self.__mouse_pressed(event))
-        self.bind("<ButtonRelease-1>", lambda event: self.__mouse_released(event))
-        self.bind("<Key>", lambda event: self.__key_pressed(event))
-        self.bind("<Enter>", lambda event: self.__mouse_entered())
-        self.bind("<Leave>", lambda event: self.__mouse_exited())
-
-        self._image_gb_protection = {}
-        self.pack()
-        self.update()
-
-    def set_canvas_background_fill(self, fill):
+    def _interactors_changed(self):
         """
-        Sets the background fill of the canvas to the specified fill string.
-        Args:
-            fill: the fill (string) to make the background of the canvas.
+        Called after an interactor is removed, for backends that have to lay out the window again.
         """
-        self.config(background=fill)
+        pass
+
+    """ CANVAS PROPERTIES """
 
     def get_canvas_background_fill(self):
         """
@@ -155,7 +124,8 @@ class Canvas(tkinter.Canvas):
         Returns:
             the current width of the canvas.
         """
-
+        if self._logical_size is not None:
+            return self._logical_size[0]
         return self.winfo_width()
 
     def get_height(self):
@@ -165,8 +135,12 @@ class Canvas(tkinter.Canvas):
         Returns:
             the current height of the canvas.
         """
+        if self._logical_size is not None:
+            return self._logical_size[1]
         return self.winfo_height()
 
+    """ MOUSE AND KEYBOARD """
+
     def __mouse_pressed(self, event):
         """
         Called every time the mouse is pressed.  If we are currently waiting for a mouse click via
@@ -180,7 +154,7 @@ class Canvas(tkinter.Canvas):
         if not self.currently_waiting_for_click and self.on_mouse_pressed:
             self.on_mouse_pressed(event.x, event.y)
         elif not self.currently_waiting_for_click:
-            self.mouse_presses.append(event)
+            self.mouse_presses.append(_InputEvent(self._clock(), "mouse", x=event.x, y=event.y))
 
     def __mouse_released(self, event):
         """
@@ -197,6 +171,8 @@ class Canvas(tkinter.Canvas):
         # then having wait for click set currently waiting to false, then we go
         if self.currently_waiting_for_click:
             self.wait_for_click_click_happened = True
+            self.wait_for_click_location = [event.x, event.y]
+            self._wake_wait_for_click()
             return
 
         self.wait_for_click_click_happened = True
@@ -212,109 +188,59 @@ class Canvas(tkinter.Canvas):
             event: an object representing the key press that just occurred.  Assumed to have a keysym property
                 containing the name of this key press.
         """
+        self.keys_down.add(event.keysym)
         if self.on_key_pressed:
             self.on_key_pressed(event.keysym)
         else:
-            self.key_presses.append(event)
-
-    def __mouse_entered(self):
-        """
-        Called every time the mouse enters the canvas.  Updates the internal state to record that
-        the mouse is currently on the canvas.
-        """
-        self.mouse_on_canvas = True
-
-    def __mouse_exited(self):
-        """
-        Called every time the mouse exits the canvas.  Updates the internal state to record that
-        the mouse is currently not on the canvas.
-        """
-        self.mouse_on_canvas = False
-
-    def wait_for_click(self):
-        """
-        Waits until a mouse click occurs, and then returns.
-        """
-        self.currently_waiting_for_click = True
-        self.wait_for_click_click_happened = False
-        self.last_click = []
-        while not self.wait_for_click_click_happened:
-            self.update()
-        self.currently_waiting_for_click = False
-        self.wait_for_click_click_happened = False
-
-        # [CIP]
-        # Save the location of the mouse click
-        self.last_click = [self.get_mouse_x(), self.get_mouse_y()]
+            self.key_presses.append(_InputEvent(self._clock(), "key", keysym=event.keysym, char=event.char))
 
-    def get_mouse_x(self):
+    def __key_released(self, event):
         """
-        Returns the mouse's current X location on the canvas.
+        Called every time a keyboard key is released.  Updates the internal state to record that the key is no
+        longer held down.
 
-        Returns:
-            the mouses's current X location on the canvas.
-        """
-        """
-        Note: winfo_pointerx is absolute mouse position (to screen, not window),
-              winfo_rootx is absolute window position (to screen)
-        Since move takes into account relative position to window,
-        we adjust this mouse_x to be relative position to window.
+        Args:
+            event: an object representing the key release that just occurred.  Assumed to have a keysym property
+                containing the name of this key.
         """
-        return self.winfo_pointerx() - self.winfo_rootx()
+        self.keys_down.discard(event.keysym)
 
-    def get_mouse_y(self):
+    def __button_clicked(self, title):
         """
-        Returns the mouse's current Y location on the canvas.
+        Called every time a button is clicked.  If we have a registered button click handler, call that.  Otherwise,
+        append the button click to the list of button clicks to be handled later.
 
-        Returns:
-            the mouse's current Y location on the canvas.
-        """
-        """
-        Note: winfo_pointery is absolute mouse position (to screen, not window),
-              winfo_rooty is absolute window position (to screen)
-        Since move takes into account relative position to window,
-        we adjust this mouse_y to be relative position to window.
+        Args:
+            title: the name of the button that was clicked.
         """
-        return self.winfo_pointery() - self.winfo_rooty()
+        if self.on_button_clicked:
+            self.on_button_clicked(title)
+        else:
+            self.button_clicks.append(title)
 
-    def __get_frame_and_pack_location_for_location(self, location):
+    def is_key_down(self, keysym):
         """
-        Returns the frame and pack location that should be used for an interactor given the
-        specified interactor location on the canvas.
+        Returns whether the given key is currently held down.
 
         Args:
-            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) to get the frame and pack location for.
+            keysym: the name of the key, e.g. "Left", "space" or "a"
 
         Returns:
-            First, the frame, and second, the pack location, for the given interactor location.
-            For instance, for the top and bottom locations, the pack location should be Canvas.LEFT
-            to align interactors left to right.
+            True if the key is currently held down, False otherwise.
         """
-        frame = self.top_frame
-        pack_location = Canvas.LEFT
-        if location == Canvas.BOTTOM:
-            frame = self.bottom_frame
-        elif location == Canvas.LEFT:
-            frame = self.left_frame
-            pack_location = Canvas.TOP
-        elif location == Canvas.RIGHT:
-            frame = self.right_frame
-            pack_location = Canvas.TOP
-
-        return frame, pack_location
+        return keysym in self.keys_down
 
-    def __button_clicked(self, title):
+    def set_input_queue_limits(self, capacity, overflow="drop_oldest"):
         """
-        Called every time a button is clicked.  If we have a registered button click handler, call that.  Otherwise,
-        append the button click to the list of button clicks to be handled later.
+        Changes how many unhandled mouse presses, key presses and button clicks are kept, and what happens to new
+        ones when the limit is reached.  Any that are already waiting are kept, up to the new limit.
 
         Args:
-            title: the name of the button that was clicked.
+            capacity: the most presses or clicks of each kind to keep
+            overflow: "drop_oldest" to forget the oldest one to make room, or "drop_newest" to ignore the new one
         """
-        if self.on_button_clicked:
-            self.on_button_clicked(title)
-        else:
-            self.button_clicks.append(title)
+        for queue in (self.mouse_presses, self.key_presses, self.button_clicks):
+            queue.set_limits(capacity, overflow)
 
     def get_new_mouse_clicks(self):
         """
@@ -324,11 +250,9 @@ class Canvas(tkinter.Canvas):
         Returns:
             a list of all mouse clicks that have occurred since the last call to this function or any registered
                 mouse handler.  Each mouse click contains x and y properties for the click location, e.g.
-                clicks = canvas.get_new_mouse_clicks(); print(clicks[0].x).
+                clicks = canvas.get_new_mouse_clicks(); print(clicks[0].x), and a time property for when it happened.
         """
-        presses = self.mouse_presses
-        self.mouse_presses = []
-        return presses
+        return self.mouse_presses.drain()
 
     
     def get_last_click(self):
@@ -355,11 +279,10 @@ class Canvas(tkinter.Canvas):
         Returns:
             a list of all key presses that have occurred since the last call to this function or any registered
                 key handler.  Each key press contains a keysym property for the key pressed, e.g.
-                presses = canvas.get_new_key_presses(); print(presses[0].keysym).
+                presses = canvas.get_new_key_presses(); print(presses[0].keysym), and a time property for when it
+                happened.
         """
-        presses = self.key_presses
-        self.key_presses = []
-        return presses
+        return self.key_presses.drain()
 
     def get_last_key_press(self):
         """
@@ -374,26 +297,6 @@ class Canvas(tkinter.Canvas):
             return keys[-1].keysym
         return None
 
-    def create_button(self, title, location, **kwargs):
-        """
-        Adds a button to the canvas with the specified title at the specified location.  Buttons are added from left
-        to right at the top and bottom of the window and top to bottom on the sides of the window.
-
-        Args:
-            title: the title to display on the button.  Must be unique among button names.
-            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) where the button should be added around the canvas.
-            kwargs: other tkinter keyword args
-
-        Returns:
-            a reference to the button added to the window at the specified location.  Use this with the .destroy()
-            function to delete the button later if needed.  E.g. button = create_button(...); button.destroy();
-        """
-        frame, pack_location = self.__get_frame_and_pack_location_for_location(location)
-        button = tkinter.Button(frame, text=title, command=lambda: self.__button_clicked(title), **kwargs)
-        button.pack(side=pack_location)
-        self.update()
-        return button
-
     def get_new_button_clicks(self):
         """
         Returns a list of all button clicks that have occurred since the last call to this function or any registered
@@ -404,34 +307,51 @@ class Canvas(tkinter.Canvas):
                 button handler.  Each button click is the name of the button clicked, e.g.
                 clicks = canvas.get_new_button_clicked(); print(clicks[0]).
         """
-        clicks = self.button_clicks
-        self.button_clicks = []
-        return clicks
+        return self.button_clicks.drain()
 
-    def create_text_field(self, label, location, **kwargs):
+    """ RECORD AND REPLAY """
+
+    def start_replay(self, file_path, skip_sleep=False):
         """
-        Adds a label and text field pair to the canvas with the specified label text at the specified location.
-        Interactors are added from left to right at the top and bottom of the window and top to bottom on the sides
-        of the window.  Stores a reference to this text field in the Canvas map of text fields.
+        Plays back a recording made by `start_recording`: the random module is seeded with the recorded seed,
+        real mouse and keyboard input is ignored, and each recorded event is delivered by the same numbered
+        `update` call it arrived in, so `get_new_key_presses`, `get_last_click`, `get_mouse_x` and so on return
+        exactly what they returned while recording.  `wait_for_click` returns straight away with the recorded click.
 
         Args:
-            label: the label text to display next to the text field, and the name of the text field.
-                Must be unique among text field names.
-            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) where the label/text field
-                should be added around the canvas.
-            kwargs: other tkinter keyword args for the text field
+            file_path: the recording to play back
+            skip_sleep: if True, `sleep` does nothing until `stop_replay` is called, so a program that waits
+                between frames with `canvas.sleep` runs as fast as it can instead of at its normal speed
+        """
+        self.stop_replay()
+        self._replay = _InputReplay(file_path, self._input_handlers, skip_sleep)
+        random.seed(self._replay.seed)
+
+    def stop_replay(self):
+        """
+        Stops the playback started by `start_replay`, and puts `sleep` back to normal.
 
         Returns:
-            a reference to the text field and the label (in that order) added to the window at the specified location.
+            the number of recorded events that were never delivered, or None if nothing was being played back.
         """
-        frame, pack_location = self.__get_frame_and_pack_location_for_location(location)
-        text_field_label = tkinter.Label(frame, text=label)
-        text_field_label.pack(side=pack_location)
-        text_field = tkinter.Entry(frame, **kwargs)
-        text_field.pack(side=pack_location)
-        self.text_fields[label] = (text_field, text_field_label)
-        self.update()
-        return text_field, text_field_label
+        if self._replay is None:
+            return None
+        remaining = self._replay.close()
+        self._replay = None
+        return remaining
+
+    def sleep(self, seconds):
+        """
+        Pauses the program for the given number of seconds, like time.sleep.  Use this to wait between the frames
+        of a game, so that a replay started with skip_sleep can run the game without pausing.
+
+        Args:
+            seconds: how long to pause for
+        """
+        if self._replay is None or not self._replay.skip_sleep:
+            time.sleep(seconds)
+
+    """ INTERACTORS """
 
     def delete_text_field(self, text_field_name):
         """
@@ -445,7 +365,7 @@ class Canvas(tkinter.Canvas):
             self.text_fields[text_field_name][0].destroy()
             self.text_fields[text_field_name][1].destroy()
             del self.text_fields[text_field_name]
-            self.update()
+            self._interactors_changed()
 
     def get_text_field_text(self, text_field_name):
         """
@@ -462,84 +382,312 @@ class Canvas(tkinter.Canvas):
         else:
             return None
 
-    """ GRAPHICAL OBJECT MANIPULATION """
+    """ GAME LOOP """
 
-    def get_left_x(self, obj):
+    def set_loop_rate(self, hz):
         """
-        Returns the leftmost x coordinate of the specified graphical object.
+        Changes the number of ticks per second of the loop started by `run_loop`.
 
         Args:
-            obj: the object for which to calculate the leftmost x coordinate
+            hz: the new number of ticks per second
+        """
+        if self._loop is not None:
+            self._loop.set_rate(hz)
 
-        Returns:
-            the leftmost x coordinate of the specified graphical object.
+    def stop_loop(self):
         """
-        if self.type(obj) != "text":
-            return self.coords(obj)[0]
-        else:
-            return self.coords(obj)[0] - self.get_obj_width(obj) / 2
+        Stops the loop started by `run_loop`, which then returns.
+        """
+        if self._loop is not None:
+            self._loop.stop()
 
-    def get_top_y(self, obj):
+    def get_loop_stats(self):
         """
-        Returns the topmost y coordinate of the specified graphical object.
+        Returns the timing stats of the current (or last) loop started by `run_loop`, as a dictionary of:
+        ticks (the number of ticks run), frames (the number of timer callbacks), skipped_ticks (ticks dropped
+        because the program fell behind), tick_rate (ticks actually run per second), and last_frame_ms,
+        mean_frame_ms and max_frame_ms (the time taken by each timer callback).  Returns None if no loop has run.
+        """
+        if self._loop is None:
+            return None
+        return self._loop.stats()
+
+    """ ANIMATION """
+
+    def animate_move(self, obj, x, y, duration, easing="linear", delay=0, on_done=None):
+        """
+        Slides an object to a new location over time, without the program having to wait for it.  Animations are
+        advanced by a canvas timer, so they keep running while the program runs `update` or `mainloop`.
 
         Args:
-            obj: the object for which to calculate the topmost y coordinate
+            obj: the object to move
+            x: the x coordinate to move the object's left edge to, as with `move_to`
+            y: the y coordinate to move the object's top edge to, as with `move_to`
+            duration: how long the move takes, in seconds
+            easing: how the speed changes over the move: "linear", "ease_in" (speeding up), "ease_out" (slowing
+                down), "ease_in_out", "bounce", or a function from the fraction of the time gone by (0 to 1) to the
+                fraction of the way moved
+            delay: how long to wait before starting, in seconds
+            on_done: a function to call, with no arguments, when the move has finished
 
         Returns:
-            the topmost y coordinate of the specified graphical object.
+            the id of the animation, which can be passed to `cancel_animation`.
         """
-        if self.type(obj) != "text":
-            return self.coords(obj)[1]
-        else:
-            return self.coords(obj)[1] - self.get_height(obj) / 2
+        animation = _MoveAnimation()
+        animation.x = x
+        animation.y = y
+        return self.__animator().add(animation, obj, duration, easing, delay, on_done)
 
-    def get_obj_width(self, obj):
+    def animate_color(self, obj, color, duration, easing="linear", delay=0, on_done=None, option="fill"):
         """
-        Returns the width of the specified graphical object.
+        Fades the color of an object to a new color over time.  See `animate_move`.
 
         Args:
-            obj: the object for which to calculate the width
+            obj: the object to recolor
+            color: the color to end with, as a string
+            duration: how long the fade takes, in seconds
+            easing: how the speed of the fade changes over time (see `animate_move`)
+            delay: how long to wait before starting, in seconds
+            on_done: a function to call, with no arguments, when the fade has finished
+            option: which color to fade: "fill" or "outline"
 
         Returns:
-            the width of the specified graphical object.
+            the id of the animation, which can be passed to `cancel_animation`.
         """
-        if len(self.coords(obj)) == 2:  # two-dimensional coords
-            return self.bbox(obj)[2] - self.bbox(obj)[0]
-        return self.coords(obj)[2] - self.coords(obj)[0]
+        animation = _ColorAnimation()
+        animation.option = option
+        animation.color = color
+        animation.parse_color = self._color_rgb
+        return self.__animator().add(animation, obj, duration, easing, delay, on_done)
 
-    def get_obj_height(self, obj):
+    def animate_hidden(self, obj, is_hidden, delay, on_done=None):
         """
-        Returns the height of the specified graphical object.
+        Hides or shows an object after a delay, e.g. to turn a card back over a second after it was shown,
+        without the program having to sleep.
 
         Args:
-            obj: the object for which to calculate the height
+            obj: the object to hide or show
+            is_hidden: whether to hide (True) or show (False) the object
+            delay: how long to wait before hiding or showing it, in seconds
+            on_done: a function to call, with no arguments, once it has been hidden or shown
 
         Returns:
-            the height of the specified graphical object.
+            the id of the animation, which can be passed to `cancel_animation`.
         """
-        if len(self.coords(obj)) == 2:  # two-dimensional coords
-            return self.bbox(obj)[3] - self.bbox(obj)[1]
-        return self.coords(obj)[3] - self.coords(obj)[1]
+        animation = _VisibilityAnimation()
+        animation.is_hidden = is_hidden
+        return self.__animator().add(animation, obj, 0, "linear", delay, on_done)
 
-    def move_to(self, obj, new_x, new_y):
+    def cancel_animation(self, animation_id):
         """
-        Same as `Canvas.moveto`.
+        Stops an animation, leaving its object where (and how) it is.  Its on_done function is not called.
+
+        Args:
+            animation_id: the id returned by the animate function that started the animation
         """
-        # Note: Implements manually due to inconsistencies on some machines of bbox vs. coord.
-        old_x = self.get_left_x(obj)
-        old_y = self.get_top_y(obj)
-        self.move(obj, new_x - old_x, new_y - old_y)
+        if self._animator is not None:
+            self._animator.cancel(lambda animation: animation.id != animation_id)
 
-    def moveto(self, obj, x='', y=''):
+    def cancel_animations(self, obj=None):
         """
-        Moves the specified graphical object to the specified location, which is its bounding box's
-        new upper-left corner.
+        Stops every animation of an object, or every animation on the canvas if no object is given.
 
         Args:
-            obj: the object to move
-            x: the new x coordinate of the upper-left corner for the object
-            y: the new y coordinate of the upper-left corner for the object
+            obj: the object whose animations to stop
+        """
+        if self._animator is not None:
+            self._animator.cancel(lambda animation: obj is not None and animation.obj != obj)
+
+    def is_animating(self, obj=None):
+        """
+        Returns whether an object, or if no object is given anything on the canvas, has animations that have not
+        finished yet (including ones still waiting for their delay).
+        """
+        return self._animator is not None and self._animator.is_running(obj)
+
+    def __animator(self):
+        if self._animator is None:
+            self._animator = _Animator(self, self._clock, self._color_rgb)
+        return self._animator
+
+    """ ASYNCIO """
+
+    async def frame(self):
+        """
+        Use as `await canvas.frame()` inside a coroutine to wait until the canvas has been redrawn and new input
+        handled, about `Canvas.FRAME_INTERVAL` seconds from now.  While any coroutine is waiting on the canvas,
+        an asyncio task keeps the window updated, so other async work can run on the same thread in between.
+        The task stops when nothing is waiting any more, and if the window is closed, the waiting coroutines
+        get the error instead.
+
+        Returns:
+            the number of frames drawn by the asyncio task so far.
+        """
+        bridge = self.__async_bridge()
+        return await bridge.wait(bridge.frame_waiters)
+
+    async def next_click(self):
+        """
+        Use as `click = await canvas.next_click()` to wait for the next mouse click.  Clicks that happened before
+        and were not picked up by `get_new_mouse_clicks` count, oldest first.
+
+        Returns:
+            the click, with x, y and time properties like the clicks from `get_new_mouse_clicks`.
+        """
+        bridge = self.__async_bridge()
+        return await bridge.wait(bridge.click_waiters)
+
+    async def next_key(self):
+        """
+        Use as `key = await canvas.next_key()` to wait for the next key press.  Key presses that happened before
+        and were not picked up by `get_new_key_presses` count, oldest first.
+
+        Returns:
+            the key press, with keysym, char and time properties like the presses from `get_new_key_presses`.
+        """
+        bridge = self.__async_bridge()
+        return await bridge.wait(bridge.key_waiters)
+
+    async def input_events(self):
+        """
+        Use as `async for event in canvas.input_events():` to handle every mouse click, key press and button
+        click as it happens.  Each event has a kind ("mouse", "key" or "button") and time, plus x and y for mouse
+        clicks, keysym and char for key presses, and title for button clicks.
+        """
+        bridge = self.__async_bridge()
+        while True:
+            await bridge.wait(bridge.frame_waiters)
+            for event in bridge.drain_events():
+                yield event
+
+    def __async_bridge(self):
+        import asyncio
+        if self._async_bridge is None or not self._async_bridge.running(asyncio.get_running_loop()):
+            self._async_bridge = self._new_async_bridge()
+        return self._async_bridge
+
+    """ GRAPHICAL OBJECT MANIPULATION """
+
+    def get_left_x(self, obj):
+        """
+        Returns the leftmost x coordinate of the specified graphical object.
+
+        Args:
+            obj: the object for which to calculate the leftmost x coordinate
+
+        Returns:
+            the leftmost x coordinate of the specified graphical object.
+        """
+        item = self._scene.first(obj)
+        if item is None:
+            return self._backend_geometry("get_left_x", obj)
+        if item.kind != "text":
+            left_x = int(item.coords[0])
+        else:
+            left_x = int(item.coords[0]) - self.__width(item) / 2
+        return self.__checked("get_left_x", obj, left_x)
+
+    def get_top_y(self, obj):
+        """
+        Returns the topmost y coordinate of the specified graphical object.
+
+        Args:
+            obj: the object for which to calculate the topmost y coordinate
+
+        Returns:
+            the topmost y coordinate of the specified graphical object.
+        """
+        item = self._scene.first(obj)
+        if item is None:
+            return self._backend_geometry("get_top_y", obj)
+        if item.kind != "text":
+            top_y = int(item.coords[1])
+        else:
+            top_y = int(item.coords[1]) - self.__height(item) / 2
+        return self.__checked("get_top_y", obj, top_y)
+
+    def get_obj_width(self, obj):
+        """
+        Returns the width of the specified graphical object.
+
+        Args:
+            obj: the object for which to calculate the width
+
+        Returns:
+            the width of the specified graphical object.
+        """
+        item = self._scene.first(obj)
+        if item is None:
+            return self._backend_geometry("get_obj_width", obj)
+        width = self.__width(item)
+        return self.__checked("get_obj_width", obj, width)
+
+    def get_obj_height(self, obj):
+        """
+        Returns the height of the specified graphical object.
+
+        Args:
+            obj: the object for which to calculate the height
+
+        Returns:
+            the height of the specified graphical object.
+        """
+        item = self._scene.first(obj)
+        if item is None:
+            return self._backend_geometry("get_obj_height", obj)
+        height = self.__height(item)
+        return self.__checked("get_obj_height", obj, height)
+
+    @staticmethod
+    def __width(item):
+        bbox = item.bbox()
+        return bbox[2] - bbox[0]
+
+    @staticmethod
+    def __height(item):
+        bbox = item.bbox()
+        return bbox[3] - bbox[1]
+
+    def __checked(self, name, obj, cached):
+        """
+        Returns the answer to a geometry query from the shadow scene.  When `check_geometry` is on, first raises an
+        AssertionError if it does not match the answer of the backend (e.g. tkinter).
+        """
+        if self.check_geometry:
+            actual = self._backend_geometry(name, obj)
+            if cached != actual:
+                raise AssertionError("{}({}) returned {} but tkinter says {}".format(name, obj, cached, actual))
+        return cached
+
+    def coords(self, obj):
+        """
+        [CIP]
+        Returns an list of coordinates of the object that is formatted as [left_x, top_y]
+        """
+        item = self._scene.first(obj)
+        if item is None:
+            return self._backend_geometry("coords", obj)
+        coords = [int(item.coords[0]), int(item.coords[1])]
+        return self.__checked("coords", obj, coords)
+
+    def move_to(self, obj, new_x, new_y):
+        """
+        Same as `Canvas.moveto`.
+        """
+        # Note: Implements manually due to inconsistencies on some machines of bbox vs. coord.
+        old_x = self.get_left_x(obj)
+        old_y = self.get_top_y(obj)
+        self.move(obj, new_x - old_x, new_y - old_y)
+
+    def moveto(self, obj, x='', y=''):
+        """
+        Moves the specified graphical object to the specified location, which is its bounding box's
+        new upper-left corner.
+
+        Args:
+            obj: the object to move
+            x: the new x coordinate of the upper-left corner for the object
+            y: the new y coordinate of the upper-left corner for the object
         """
         self.move_to(obj, float(x), float(y))
 
@@ -552,7 +700,11 @@ class Canvas(tkinter.Canvas):
             dx: the amount by which to change the object's x position
             dy: the amount by which to change the object's y position
         """
-        super(Canvas, self).move(obj, dx, dy)
+        if self._scale is None:
+            self._tk_command("move", obj, dx, dy)
+        else:
+            self._tk_command("move", obj, float(dx) * self._scale, float(dy) * self._scale)
+        self._scene.move(obj, float(dx), float(dy))
 
     def delete(self, obj):
         """
@@ -561,13 +713,56 @@ class Canvas(tkinter.Canvas):
         Args:
             obj: the graphical object to remove from the canvas
         """
-        super(Canvas, self).delete(obj)
+        self._tk_command("delete", obj)
+        for item in self._scene.remove(obj):
+            self._image_gb_protection.pop(item.id, None)
 
     def clear(self):
         """
         Remove all graphical objects from the canvas.
         """
-        super(Canvas, self).delete('all')
+        self._tk_command("delete", "all")
+        self._scene.clear()
+        self._image_gb_protection.clear()
+
+    def snapshot(self, obj="all"):
+        """
+        Captures the graphical objects on the canvas (their type, coordinates, colors and other options, tags and
+        stacking order) so that they can be put back later with `restore`, e.g. to redraw a title screen or a
+        static layer without drawing it again piece by piece.
+
+        Args:
+            obj: the objects to capture: an object, a tag or group, or 'all' (the default) for the whole canvas
+
+        Returns:
+            the captured objects, to pass to `restore`.  A snapshot can be restored any number of times.
+        """
+        return tuple((item.id, item.kind, tuple(item.coords), tuple(item.options.items()),
+                      self._image_gb_protection.get(item.id))
+                     for item in self._scene.find(obj))
+
+    def restore(self, snapshot, clear=True):
+        """
+        Recreates the graphical objects captured by `snapshot`, all in one batch.  The new objects get new ids.
+
+        Args:
+            snapshot: what `snapshot` returned
+            clear: whether to remove everything on the canvas first.  If False, the objects are added on top of
+                what is already on the canvas.
+
+        Returns:
+            a dictionary mapping the id each captured object had to the id of the object recreated from it.
+        """
+        ids = {}
+        with self.batch():
+            if clear:
+                self.clear()
+            for item_id, kind, coords, options, image in snapshot:
+                new_id = self._create(kind, coords, dict(options))
+                if image is not None:
+                    self._image_gb_protection[new_id] = image
+                ids[item_id] = new_id
+        return ids
 
     def find_overlapping(self, x1, y1, x2, y2):
         """
@@ -582,7 +777,25 @@ class Canvas(tkinter.Canvas):
         Returns:
             a list of graphical objects on the canvas that overlap with this bounding box.
         """
-        return super(Canvas, self).find_overlapping(x1, y1, x2, y2)
+        # Answered from a grid of object bounding boxes rather than asking tkinter, so the cost does not grow
+        # with the number of objects on the canvas.  Objects are matched by their bounding boxes (including
+        # outlines), so e.g. the corners of an oval's bounding box count as part of the oval.
+        return self._scene.overlapping(float(x1), float(y1), float(x2), float(y2))
+
+    def find_colliding(self, obj):
+        """
+        Get a list of graphical objects on the canvas whose shapes touch the shape of the specified object.
+        Unlike `find_overlapping`, this compares the actual shapes rather than bounding boxes, so e.g. a ball
+        (an oval) does not hit a brick with the corners of its bounding box.  Lines, rectangles, ovals and
+        polygons are compared by their shapes; text and images by their bounding boxes.
+
+        Args:
+            obj: the object to find the collisions of (hidden objects are never found)
+
+        Returns:
+            a list of the other graphical objects on the canvas that touch obj.
+        """
+        return self._scene.colliding(obj)
 
     def set_fill_color(self, obj, fill_color):
         """
@@ -630,6 +843,17 @@ class Canvas(tkinter.Canvas):
         self.set_fill_color(obj, fill)
         self.set_outline_color(obj, fill)
 
+    def set_hidden(self, obj, is_hidden):
+        """
+        [CIP]
+        Set whether a shape is visible. If is_hidden is true, the object will become hidden, 
+        if it is false, it will become unhidden.
+        """        
+        if is_hidden:
+            self.itemconfigure(obj, state='hidden')
+        else:
+            self.itemconfigure(obj, state='normal')
+
     def create_line(self, x1, y1, x2, y2, fill="black", width=1, color=None):
         """
         Creates a line from (x1, y1) to (x2, y2) on the canvas with the specified fill color.
@@ -649,8 +873,7 @@ class Canvas(tkinter.Canvas):
         if color is not None:
             fill = color
 
-        return super(Canvas, self).create_line(
-            x1, y1, x2, y2, fill=fill, width=width)
+        return self._create("line", (x1, y1, x2, y2), {"fill": fill, "width": width})
 
     def create_rectangle(self, x1, y1, x2, y2, fill="black", outline=None, width=1, color=None):
         """
@@ -675,8 +898,7 @@ class Canvas(tkinter.Canvas):
         if outline is None:
             outline = fill
 
-        return super(Canvas, self).create_rectangle(
-            x1, y1, x2, y2, fill=fill, outline=outline, width=width)
+        return self._create("rectangle", (x1, y1, x2, y2), {"fill": fill, "outline": outline, "width": width})
 
     def create_oval(self, x1, y1, x2, y2, fill="black", outline=None, width=1, color=None):
         """
@@ -700,8 +922,50 @@ class Canvas(tkinter.Canvas):
         if outline is None:
             outline = fill
 
-        return super(Canvas, self).create_oval(
-            x1, y1, x2, y2, fill=fill, outline=outline, width=width)
+        return self._create("oval", (x1, y1, x2, y2), {"fill": fill, "outline": outline, "width": width})
+
+    def create_rectangles(self, coords, fills="black", outlines=None, width=1):
+        """
+        Creates many rectangles at once, much faster than calling `create_rectangle` for each one, since they are
+        all sent to tkinter in one go.
+
+        Args:
+            coords: a list of [x1, y1, x2, y2] rows, one per rectangle, or a NumPy array with 4 columns
+            fills: the fill color of every rectangle, or a list (or array) of one fill color per rectangle
+            outlines: the outline color of every rectangle, or a list of one per rectangle.  Defaults to the fills.
+            width: the width of the outlines
+
+        Returns:
+            the new rectangles, as a list, or as a NumPy array if coords was a NumPy array.
+        """
+        return _bulk_ids(coords, self._create_shapes("rectangle", coords, fills, outlines, width))
+
+    def create_ovals(self, coords, fills="black", outlines=None, width=1):
+        """
+        Creates many ovals at once, the same way `create_rectangles` creates many rectangles.  Each row of
+        coords is the [x1, y1, x2, y2] bounding box of one oval.
+        """
+        return _bulk_ids(coords, self._create_shapes("oval", coords, fills, outlines, width))
+
+    def pool(self, kind, fill, width, height, outline=None):
+        """
+        Creates a pool of same-sized rectangles or ovals, for shapes that are added and removed over and over
+        (snake segments, food, bricks, bullets).  Instead of creating a new object each time, `pool.acquire(x, y)`
+        shows a previously released one at the new location, so the canvas keeps a constant number of objects
+        however long the game runs.  `pool.release(obj)` hides an object so it can be reused, and `pool.stats()`
+        returns how many objects are in use, how many were created and reused, and the most ever in use at once.
+
+        Args:
+            kind: "rectangle" or "oval"
+            fill: the fill color of the shapes, which can be changed for each shape by acquire(x, y, fill)
+            width: the width of each shape
+            height: the height of each shape
+            outline: the outline color of the shapes.  Defaults to the fill color.
+
+        Returns:
+            the new, empty pool.
+        """
+        return _ItemPool(self, kind, fill, width, height, outline)
 
     def create_polygon(self, *args, fill="black", outline=None, width=1, color=None):
         """
@@ -711,7 +975,7 @@ class Canvas(tkinter.Canvas):
         if color is not None:
             fill = color
 
-        return super(Canvas, self).create_polygon(*args, fill=fill, outline=outline, width=width)      
+        return self._create("polygon", args, {"fill": fill, "outline": outline, "width": width})
 
     def create_text(self, x, y, text, font = "Arial", font_size="12", fill="black", anchor = "nw", color=None):
         """
@@ -730,7 +994,7 @@ class Canvas(tkinter.Canvas):
         if color is not None:
             fill = color
         # self.canvas.create_text(x, y, text=text_content, font=(font, font_size), color=color, anchor="center")
-        return super().create_text(x, y, anchor=anchor, font=(font, font_size), text=text, fill=fill)
+        return self._create("text", (x, y), {"anchor": anchor, "font": (font, font_size), "text": text, "fill": fill})
 
     def change_text(self, obj, text):
         """
@@ -750,39 +1014,6 @@ class Canvas(tkinter.Canvas):
         """
         self.itemconfig(obj, text=text)
 
-    def create_text_area(self, x, y, width=200, height=100, text="", bg="#ececec"):
-        """
-        Create a multi-line text area embedded in a specified canvas.
-
-        Args:
-            canvas: The canvas widget where the text area will be embedded.
-            x, y: The coordinates on the canvas where the top-left corner of the text area will be placed.
-            width: The width of the text area in pixels.
-            height: The height of the text area in pixels.
-            **text_kwargs: Additional keyword arguments to be passed to the tkinter Text widget.
-
-        Returns:
-            A tkinter Text widget instance representing the text area.
-        """
-        # Create a Frame to hold the Text widget; this is necessary for correct embedding in the canvas
-        frame = tkinter.Frame(self, width=width, height=height, bg=bg)
-        frame.pack_propagate(False)  # Prevent the frame from resizing to fit the Text widget
-
-        # Create the Text widget inside the frame
-        text_widget = tkinter.Text(frame, width=width, height=height, bg=bg, wrap=tkinter.WORD)
-        text_widget.insert(tkinter.END, text)
-        
-        # Set the text widget to be non-editable
-        text_widget.config(state=tkinter.DISABLED)
-        
-        text_widget.pack(fill=tkinter.BOTH, expand=True)
-
-        # Create a window on the canvas, and add the frame to it
-        self.create_window(x, y, anchor="nw", window=frame, width=width, height=height)
-
-        return text_widget
-
-
     def get_text(self, obj):
         """
         Returns the text displayed by the given text object.  Cannot be used on any non-text graphical object.
@@ -807,69 +1038,6 @@ class Canvas(tkinter.Canvas):
         """
         self.itemconfig(obj, font=(font, size))
 
-    def raise_to_front(self, obj):
-        """
-        Sends the given object to the very front of all the other objects on the canvas.
-
-        Args:
-            obj: the object to bring to the front of the objects on the canvas
-        """
-        self.raise_in_front_of(obj, 'all')
-
-    def raise_in_front_of(self, obj, above):
-        """
-        Sets the first object to be directly in front of the second object in Z-ordering on the canvas.  In other words,
-        the first object will now appear in front of the second object and all objects behind the second object,
-        but behind all objects that the second object is also behind.
-
-        Args:
-            obj: the object to put in front of the second object
-            above: the object to put the first object directly in front of
-        """
-        self.tag_raise(obj, above)
-
-    def lower_to_back(self, obj):
-        """
-        Sends the given object to be behind all the other objects on the canvas
-
-        Args:
-            obj: the object to put behind all other objects on the canvas
-        """
-        self.lower_behind(obj, 'all')
-
-    def set_hidden(self, obj, is_hidden):
-        """
-        [CIP]
-        Set whether a shape is visible. If is_hidden is true, the object will become hidden, 
-        if it is false, it will become unhidden.
-        """        
-        if is_hidden:
-            self.itemconfigure(obj, state='hidden')
-        else:
-            self.itemconfigure(obj, state='normal')
-
-    def coords(self, obj):
-        """
-        [CIP]
-        Returns an list of coordinates of the object that is formatted as [left_x, top_y]
-        """
-        coords = super().coords(obj)
-        if coords:
-            return [ int(coords[0]), int(coords[1]) ]
-        return coords
-
-    def lower_behind(self, obj, behind):
-        """
-        Sets the first object to be directly behind the second object in Z-ordering on the canvas.  In other words,
-        the first object will now appear directly behind the second object and all objects in front of the
-        second object, but in front of all objects that the second object is also in front of.
-
-        Args:
-            obj: the object to put in front of the second object
-            behind: the object to put the first object directly behind
-        """
-        self.tag_lower(obj, behind)
-
     def create_image(self, x, y, file_path, **kwargs):
         """
         Creates an image with the specified filename at the specified position on the canvas.  The image
@@ -884,7 +1052,7 @@ class Canvas(tkinter.Canvas):
         Returns:
             the graphical image object that is displaying the specified image at the specified location.
         """
-        return self.__create_image_with_optional_size(x, y, file_path, **kwargs)
+        return self._create_image(x, y, file_path, **kwargs)
 
     def create_image_with_size(self, x, y, width, height, file_path, **kwargs):
         """
@@ -903,35 +1071,5119 @@ class Canvas(tkinter.Canvas):
             the graphical image object that is displaying the specified image at the specified location with the
                 specified size.
         """
-        return self.__create_image_with_optional_size(x, y, file_path, width=width, height=height, **kwargs)
+        return self._create_image(x, y, file_path, width=width, height=height, **kwargs)
+
+    """ GROUPS """
 
-    def __create_image_with_optional_size(self, x, y, file_path, width=None, height=None, **kwargs):
+    @contextlib.contextmanager
+    def group(self, name):
         """
-        Creates an image with the specified filename at the specified position on the canvas.
-        Optionally specify the width and height to resize the image.
+        Use as `with canvas.group("snake"):` to put every object created inside the `with` block into the group
+        with the given name.  The whole group can then be moved, recolored, hidden or deleted at once with
+        `group_move`, `group_set_color`, `group_hide` and `group_delete`, which each cost a single tkinter
+        call however many objects are in the group.  Groups can be nested, and an object can be in several groups.
 
         Args:
-            x: the x coordinate of the top-left corner of the image on the canvas
-            y: the y coordinate of the top-left corner of the image on the canvas
-            file_path: the path to the image file to load and display on the canvas
-            width: optional width to include for the image.  If none, uses the width of the image file.
-            height: optional height to include for the image  If none, uses the height of the image file.
-            kwargs: other tkinter keyword args
+            name: the name of the group, e.g. "snake".  Cannot be a number, contain spaces, or be "all".
+        """
+        _check_group_name(name)
+        self._scene.group_tags.append(name)
+        try:
+            yield
+        finally:
+            self._scene.group_tags.remove(name)
+
+    def add_to_group(self, obj, group):
+        """
+        Adds an object that has already been created to a group.
+
+        Args:
+            obj: the object (or group) to add
+            group: the name of the group to add it to
+        """
+        _check_group_name(group)
+        self._tk_command("addtag", group, "withtag", obj)
+        self._scene.add_tag(obj, group)
+
+    def remove_from_group(self, obj, group):
+        """
+        Removes an object from a group.  The object itself stays on the canvas.
+
+        Args:
+            obj: the object to remove from the group
+            group: the name of the group
+        """
+        self._tk_command("dtag", obj, group)
+        self._scene.remove_tag(obj, group)
+
+    def get_group(self, group):
+        """
+        Returns a list of the objects in a group, from back to front.
+        """
+        return [item.id for item in self._scene.find(group)]
+
+    def group_move(self, group, dx, dy):
+        """
+        Moves every object in a group by the specified amounts in the x and y directions.
+        """
+        self.move(group, dx, dy)
+
+    def group_set_color(self, group, color):
+        """
+        Sets the fill color of every object in a group, the same as `set_color` does for one object.
+        """
+        self.set_color(group, color)
+
+    def group_hide(self, group, is_hidden=True):
+        """
+        Hides every object in a group, or shows them again if is_hidden is False.
+        """
+        self.set_hidden(group, is_hidden)
+
+    def group_delete(self, group):
+        """
+        Deletes every object in a group from the canvas.
+        """
+        self.delete(group)
+
+    def raise_to_front(self, obj):
+        """
+        Sends the given object to the very front of all the other objects on the canvas.
+
+        Args:
+            obj: the object to bring to the front of the objects on the canvas
+        """
+        self.raise_in_front_of(obj, 'all')
+
+    def raise_in_front_of(self, obj, above):
+        """
+        Sets the first object to be directly in front of the second object in Z-ordering on the canvas.  In other words,
+        the first object will now appear in front of the second object and all objects behind the second object,
+        but behind all objects that the second object is also behind.
+
+        Args:
+            obj: the object to put in front of the second object
+            above: the object to put the first object directly in front of
+        """
+        self.tag_raise(obj, above)
+
+    def lower_to_back(self, obj):
+        """
+        Sends the given object to be behind all the other objects on the canvas
+
+        Args:
+            obj: the object to put behind all other objects on the canvas
+        """
+        self.lower_behind(obj, 'all')
+
+    def lower_behind(self, obj, behind):
+        """
+        Sets the first object to be directly behind the second object in Z-ordering on the canvas.  In other words,
+        the first object will now appear directly behind the second object and all objects in front of the
+        second object, but in front of all objects that the second object is also in front of.
+
+        Args:
+            obj: the object to put in front of the second object
+            behind: the object to put the first object directly behind
+        """
+        self.tag_lower(obj, behind)
+
+    def tag_raise(self, obj, above=None):
+        """
+        Same as `tkinter.Canvas.tag_raise`, but also keeps the shadow scene up to date.
+        """
+        if above is None:
+            self._tk_command("raise", obj)
+        else:
+            self._tk_command("raise", obj, above)
+        self._scene.raise_above(obj, above)
+
+    def tag_lower(self, obj, below=None):
+        """
+        Same as `tkinter.Canvas.tag_lower`, but also keeps the shadow scene up to date.
+        """
+        if below is None:
+            self._tk_command("lower", obj)
+        else:
+            self._tk_command("lower", obj, below)
+        self._scene.lower_below(obj, below)
+
+    # tkinter.Canvas makes these aliases of its own tag_raise and tag_lower, which would skip the shadow scene
+    lift = tkraise = tag_raise
+    lower = tag_lower
+
+
+class Canvas(_CanvasFunctions, tkinter.Canvas):
+    """
+    Canvas is a simplified interface on top of the tkinter Canvas to allow for easier manipulation of graphical objects.
+    Canvas has a variety of functionality to create, modify and delete graphical objects, and also get information
+    about the canvas contents.  Canvas is a subclass of `tkinter.Canvas`, so all tkinter functionality is also available
+    if needed.
+    """
+
+    DEFAULT_WIDTH = 500
+    """The default width of the canvas is 500."""
+
+    DEFAULT_HEIGHT = 600
+    """The default height of the canvas is 600."""
+
+    DEFAULT_TITLE = "Canvas"
+    """The default text shown in the canvas window titlebar is 'Canvas'."""
+
+    LEFT = tkinter.LEFT
+    """
+    Directions to use for adding interactors to different sides of the canvas.  
+    LEFT refers to the left side of the window.
+    """
+
+    BOTTOM = tkinter.BOTTOM
+    """
+    Directions to use for adding interactors to different sides of the canvas.  
+    BOTTOM refers to the bottom of the window.
+    """
+
+    RIGHT = tkinter.RIGHT
+    """
+    Directions to use for adding interactors to different sides of the canvas.  
+    RIGHT refers to the right side of the window.
+    """
+
+    TOP = tkinter.TOP
+    """
+    Directions to use for adding interactors to different sides of the canvas.  
+    TOP refers to the top side of the window.
+    """
+
+    INPUT_QUEUE_CAPACITY = 256
+    """
+    The most unhandled mouse presses, key presses or button clicks that are kept.  Change it with
+    `set_input_queue_limits`.
+    """
+
+    INPUT_QUEUE_OVERFLOW = "drop_oldest"
+    """
+    What happens to a mouse press, key press or button click that arrives when its queue is full: "drop_oldest"
+    makes room by forgetting the oldest one, "drop_newest" ignores the new one.
+    """
+
+    FRAME_INTERVAL = 1 / 60
+    """
+    The time, in seconds, of one frame.  Calling `update` when nothing has changed since an update less than one
+    frame ago does nothing.
+    """
+
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, title=DEFAULT_TITLE):
+        """
+        When creating a canvas, you can optionally specify a width and height.  If no width and height are specified,
+        the canvas is initialized with its default size.
+
+        Args:
+            width: the width of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_WIDTH`)
+            height: the height of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_HEIGHT`)
+        """
+
+        # Create the main program window
+        self.main_window = tkinter.Tk()
+        self.main_window.geometry("{}x{}".format(width, height))
+        self.main_window.title(title)
+
+        # Map of side -> perimeter frame holding the interactors added on that side, created when first needed
+        self._perimeter_frames = {}
+
+        # In logical coordinate mode (see use_logical_coordinates): the (width, height) the program draws in, the
+        # window pixels per logical unit, and the pixels per unit tkinter already gives fonts sized in points
+        self._logical_size = None
+        self._scale = None
+        self._dpi_scale = 1
+
+        # call the tkinter Canvas constructor
+        super().__init__(self.main_window, width=width, height=height, bd=0, highlightthickness=0)
+
+        # Input callbacks, queues and wait_for_click state
+        self._init_input()
+
+        # Written when a click (or timeout) should end wait_for_click, which sleeps in tkinter until then
+        self.wait_for_click_signal = tkinter.BooleanVar(self.main_window, False)
+
+        # Set once the window has been closed, which also ends any wait_for_click or run_loop that is waiting
+        self._closed = False
+
+        # Python-side copy of the canvas contents, used to answer geometry queries without asking tkinter
+        self._scene = _Scene()
+
+        # The loop started by run_loop, if any, and the runner of the animations started by the animate functions
+        self._loop = None
+        self._animator = None
+
+        # Whether anything has been drawn since the last update, when the last update happened, and how many
+        # updates have been asked for and actually done
+        self._dirty = True
+        self._last_update_time = 0
+        self._updates_requested = 0
+        self._updates_performed = 0
+
+        # While inside a batch: the Tcl commands waiting to be sent, the objects to measure once they exist, and
+        # the id of the last object created if the last command was a create
+        self._batch = None
+        self._unmapped = None
+        self._batch_unmeasured = []
+        self._batch_last_create = None
+
+        # A list to collect the errors of failing commands in, instead of a failing command stopping the rest of
+        # its batch and raising.  Used by the renderer of a RemoteCanvas, which must show whatever it can.
+        self._batch_errors = None
+
+        # Set to True to double check every geometry query answered by the Python-side copy against tkinter
+        self.check_geometry = False
+
+        # The profiler started by enable_profiling, if any
+        self._profiler = None
+
+        # The asyncio task updating the canvas for frame, next_click and the other coroutines, once one is awaited
+        self._async_bridge = None
+
+        # bind events
+        self.focus_set()
+        self.bind("<Button-1>", lambda event: self.__live_input(_LOG_MOUSE_PRESS, event))
+        self.bind("<ButtonRelease-1>", lambda event: self.__live_input(_LOG_MOUSE_RELEASE, event))
+        self.bind("<Key>", lambda event: self.__live_input(_LOG_KEY_PRESS, event))
+        self.bind("<KeyRelease>", lambda event: self.__live_input(_LOG_KEY_RELEASE, event))
+        self.bind("<FocusOut>", lambda event: self.__live_input(_LOG_FOCUS_OUT, event))
+        self.bind("<Enter>", lambda event: self.__mouse_entered())
+        self.bind("<Leave>", lambda event: self.__mouse_exited())
+        self.bind("<Destroy>", lambda event: self.__window_closed())
+
+        self._image_gb_protection = {}
+        self._fonts = None
+        self.pack()
+
+        # Until the window is shown, drawing is collected in a batch rather than sent to tkinter one command at a
+        # time.  The window is shown, and the batch sent, the first time anything else needs tkinter.
+        self._batch = []
+        self._unmapped = _UnmappedTk(self, self.tk)
+        self.tk = self._unmapped
+
+    def _create(self, itemType, args, kw):
+        """
+        Creates a graphical object in tkinter, and records its geometry and options in the shadow scene that
+        is used to answer `find_overlapping` without asking tkinter.  All the create functions go through here.
+        """
+        args = tkinter._flatten(args)
+        cnf = {}
+        if args and isinstance(args[-1], dict):
+            cnf = args[-1]
+            args = args[:-1]
+        options = dict(cnf)
+        options.update(kw)
+        if self._scene.group_tags:
+            options["tags"] = self._scene.with_group_tags(options.get("tags"))
+            cnf, kw = {}, options
+        coords = args
+        if self._scale is not None:
+            coords = tuple(float(coord) * self._scale for coord in args)
+            cnf, kw = {}, self.__physical_options(options)
+
+        # tkinter numbers objects 1, 2, 3, ... so during a batch, the id the object will get is known in advance
+        item_id = self._tk_command("create", itemType, *(coords + self._options(cnf, kw)))
+        if self._batch is None:
+            item_id = self.tk.getint(item_id)
+        else:
+            item_id = self._scene.next_id
+            self._batch_last_create = item_id
+
+        self._scene.add(itemType, args, options, item_id=item_id)
+        if itemType not in ("rectangle", "oval"):
+            # Rectangle and oval bounding boxes are calculated exactly like tkinter does, but other objects
+            # (e.g. text, whose size depends on the font) are measured once by tkinter
+            self.__measure_soon(item_id, itemType)
+        return item_id
+
+    def __measure_soon(self, item_id, kind):
+        """
+        Measures an object with tkinter now, or when the current batch is sent.  Before the window is shown, text,
+        images and windows are still measured straight away, which shows the window, since nothing else knows
+        their size.  Lines and polygons wait until the window is shown, and until then their size is worked out
+        from their coordinates.
+        """
+        if self._batch is None or (self._unmapped is not None and kind not in ("line", "polygon")):
+            self.__remeasure(item_id)
+        else:
+            self._batch_unmeasured.append(item_id)
+
+    def _tk_command(self, *args):
+        """
+        Runs the given canvas widget command in tkinter, e.g. ("move", obj, dx, dy).  During a `batch`, the
+        command is added to the batch's script instead, and None is returned.
+        """
+        self._dirty = True
+        if self._batch is None:
+            return self.tk.call((self._w,) + args)
+        self._batch.append(" ".join(_tcl_quote(arg) for arg in (self._w,) + args))
+        self._batch_last_create = None
+        return None
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Use as `with canvas.batch():` to speed up drawing many objects at once.  The changes made to the canvas
+        inside the `with` block (creating, moving, configuring and deleting objects) are sent to tkinter in one go
+        at the end of the block, and the canvas is redrawn once.  Create functions still return the new object
+        straight away, and functions like `get_left_x` and `find_overlapping` already see the changes, but
+        anything asked of tkinter directly inside the block sees the canvas as it was before the block.
+        """
+        if self._unmapped is not None:
+            # Objects created in the block should be measurable as soon as it ends, which needs the window shown
+            self._show_window(self._unmapped)
+        if self._batch is not None:
+            # Already batching, so the outer block will send everything
+            yield
+            return
+        self._batch = []
+        self._batch_unmeasured = []
+        self._batch_last_create = None
+        try:
+            yield
+        finally:
+            self.__send_batch()
+
+    def __send_batch(self):
+        """
+        Ends the current batch: sends its script to tkinter in one go, and measures the objects created in it.
+        """
+        script = self._batch
+        last_create = self._batch_last_create
+        self._batch = None
+        if script and self._batch_errors is not None:
+            # tkinter uses up an object number even when creating the object fails, so the numbering still holds
+            self.tk.eval("set ::_cip_batch_errors {}\n" + "\n".join(
+                "if {[catch {" + command + "} error]} {lappend ::_cip_batch_errors $error}" for command in script))
+            self._batch_errors.extend(self.tk.splitlist(self.tk.globalgetvar("_cip_batch_errors")))
+        elif script:
+            result = self.tk.eval("\n".join(script))
+            if last_create is not None and self.tk.getint(result) != last_create:
+                raise RuntimeError("Objects were numbered {} by tkinter but {} by the canvas; something created "
+                                   "objects without going through the canvas".format(result, last_create))
+        for item_id in self._batch_unmeasured:
+            self.__remeasure(item_id)
+        self._batch_unmeasured = []
+        self.update_idletasks()
+
+    def _show_window(self, unmapped):
+        """
+        Called by `_UnmappedTk` the first time tkinter is needed, or by `batch`: sends the drawing collected since
+        the canvas was created, and shows the window.
+        """
+        self._unmapped = None
+        unmapped.canvas = None
+        # Puts the interpreter back in place of the stand-in, which is inside the profiler's _CountingTk if
+        # profiling was turned on before the window was shown
+        holder = self
+        while isinstance(holder.tk, _CountingTk):
+            holder = holder.tk
+        if holder.tk is unmapped:
+            holder.tk = unmapped.tk
+        self.__send_batch()
+        tkinter.Misc.update(self)
+
+    def __remeasure(self, item_id):
+        """
+        Updates the shadow scene with tkinter's bounding box for an object that is measured rather than calculated.
+        """
+        item = self._scene.first(item_id)
+        if item is not None:
+            measured = self.__measure(item_id, item.coords)
+            if measured is not None:
+                self._scene.configure(item, {}, measured)
+
+    def __measure(self, item_id, coords):
+        """
+        Returns the tkinter bounding box of an object as offsets from its first coordinate, or None if tkinter
+        can't currently measure it (e.g. because it is hidden).
+        """
+        bbox = super().bbox(item_id)
+        if not bbox:
+            return None
+        x, y = coords[0], coords[1]
+        if self._scale is not None:
+            scale = self._scale
+            return bbox[0] / scale - x, bbox[1] / scale - y, bbox[2] / scale - x, bbox[3] / scale - y
+        return bbox[0] - x, bbox[1] - y, bbox[2] - x, bbox[3] - y
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        """
+        Same as `tkinter.Canvas.itemconfigure`, but also keeps the shadow scene up to date.
+        """
+        if not (isinstance(cnf, dict) or kw):
+            # Querying the current options
+            return super().itemconfigure(tagOrId, cnf, **kw)
+        options = dict(cnf or {})
+        options.update(kw)
+        if self._scale is not None:
+            cnf, kw = {}, self.__physical_options(options)
+        self._tk_command("itemconfigure", tagOrId, *self._options(cnf, kw))
+        self._scene.configure(tagOrId, options)
+        if not _UNSIZED_OPTIONS.issuperset(options):
+            for item in self._scene.find(tagOrId):
+                if item.measured is not None:
+                    self.__measure_soon(item.id, item.kind)
+
+    itemconfig = itemconfigure
+
+    def scale(self, tagOrId, xOrigin, yOrigin, xScale, yScale):
+        """
+        Same as `tkinter.Canvas.scale`, but also keeps the shadow scene up to date.  Like tkinter, only the
+        coordinates are scaled: line widths, text and images keep their size.
+        """
+        if self._scale is None:
+            self._tk_command("scale", tagOrId, xOrigin, yOrigin, xScale, yScale)
+        else:
+            self._tk_command("scale", tagOrId, float(xOrigin) * self._scale, float(yOrigin) * self._scale,
+                             xScale, yScale)
+        # Measured objects only have their anchor point moved, so their measured offsets still hold
+        self._scene.scale(tagOrId, float(xOrigin), float(yOrigin), float(xScale), float(yScale))
+
+    def addtag(self, *args):
+        """
+        Same as `tkinter.Canvas.addtag`, which all the addtag_ functions use, but also keeps the shadow scene up
+        to date.  The objects to tag are found in the shadow scene, except for addtag_closest, which asks tkinter.
+        """
+        newtag, search = args[0], args[1:]
+        found = self._scene.search(search)
+        if self._scale is not None and search[0] in ("closest", "enclosed", "overlapping"):
+            # The closest search takes x, y and a halo, which are all distances
+            count = 3 if search[0] == "closest" else 4
+            search = ((search[0],) + tuple(float(value) * self._scale for value in search[1:count + 1]) +
+                      tuple(search[count + 1:]))
+        if found is not None:
+            self._tk_command("addtag", newtag, *search)
+            for item in found:
+                self._scene.add_tag(item.id, newtag)
+            return
+        # tkinter must see every change so far to find the closest object, and to say which object it tagged
+        self.__flush_batch()
+        self._dirty = True
+        self.tk.call(self._w, "addtag", newtag, *search)
+        for item_id in self.tk.splitlist(self.tk.call(self._w, "find", "withtag", newtag)):
+            self._scene.add_tag(item_id, newtag)
+
+    def dtag(self, *args):
+        """
+        Same as `tkinter.Canvas.dtag`, but also keeps the shadow scene up to date.
+        """
+        self._tk_command("dtag", *args)
+        self._scene.remove_tag(args[0], args[1] if len(args) > 1 else args[0])
+
+    def insert(self, *args):
+        """
+        Same as `tkinter.Canvas.insert`, but also keeps the shadow scene up to date.
+        """
+        self._tk_command("insert", *args)
+        self.__reread_edited(args[0])
+
+    def dchars(self, *args):
+        """
+        Same as `tkinter.Canvas.dchars`, but also keeps the shadow scene up to date.
+        """
+        self._tk_command("dchars", *args)
+        self.__reread_edited(args[0])
+
+    def __reread_edited(self, obj):
+        """
+        Copies the text of text objects, and the coordinates of lines and polygons, from tkinter into the shadow
+        scene after insert or dchars, since the indices those take (e.g. "end", "insert" or "@x,y") are only
+        understood by tkinter.
+        """
+        self.__flush_batch()
+        for item in self._scene.find(obj):
+            if item.kind == "text":
+                self._scene.configure(item, {"text": super().itemcget(item.id, "text")})
+                self.__remeasure(item.id)
+            elif item.kind in ("line", "polygon"):
+                coords = super().coords(item.id)
+                if self._scale is not None:
+                    coords = [coord / self._scale for coord in coords]
+                self._scene.set_coords(item.id, coords)
+                self.__remeasure(item.id)
+
+    def __flush_batch(self):
+        """
+        Sends the drawing collected so far to tkinter, so that tkinter can be asked about it, and carries on
+        batching if inside a `batch` block.
+        """
+        if self._unmapped is not None:
+            self._show_window(self._unmapped)
+        elif self._batch is not None:
+            self.__send_batch()
+            self._batch = []
+            self._batch_last_create = None
+
+    def set_canvas_background_fill(self, fill):
+        """
+        Sets the background fill of the canvas to the specified fill string.
+        Args:
+            fill: the fill (string) to make the background of the canvas.
+        """
+        self.config(background=fill)
+        self._dirty = True
+
+    def update(self, force=False):
+        """
+        Redraws the canvas and handles any mouse and keyboard events that have happened.  If nothing has been
+        drawn since the last update, and that update was less than `Canvas.FRAME_INTERVAL` ago, this does nothing,
+        so it is cheap to call update after every change.
+
+        Args:
+            force: if True, always update, even if nothing has changed
+        """
+        self._updates_requested += 1
+        if self._replay is not None:
+            self._replay.deliver_due(self._updates_requested)
+        now = time.perf_counter()
+        if not force and not self._dirty and now - self._last_update_time < Canvas.FRAME_INTERVAL:
+            return
+        self._dirty = False
+        self._last_update_time = now
+        self._updates_performed += 1
+        super().update()
+        if self._profiler is not None:
+            self._profiler.end_frame()
+
+    def get_update_stats(self):
+        """
+        Returns a dictionary of how many times `update` has been called (requested) and how many of those calls
+        actually updated the canvas (performed).
+        """
+        return {"requested": self._updates_requested, "performed": self._updates_performed}
+
+    """ PROFILING """
+
+    def enable_profiling(self, window=120):
+        """
+        Starts timing every call to a public Canvas function and counting the calls made to tkinter, so you
+        can see where the time in each frame goes with `stats`.  A frame ends each time the canvas is redrawn
+        by `update`.  Profiling slows the program down a little, so only turn it on while investigating.
+
+        Args:
+            window: how many of the most recent frames the frame time histogram covers
+        """
+        if self._profiler is not None:
+            return
+        self._profiler = _Profiler(window)
+        self._profiler.attach(self, _CanvasFunctions)
+        self.tk = _CountingTk(self.tk, self._profiler)
+
+    def disable_profiling(self):
+        """
+        Stops profiling started by `enable_profiling`, and returns the final `stats`.
+        """
+        if self._profiler is None:
+            return None
+        stats = self._profiler.stats()
+        self._profiler.detach(self)
+        self.tk = self.tk.tk
+        self._profiler = None
+        return stats
+
+    def stats(self):
+        """
+        Returns a snapshot of what has been measured since `enable_profiling`, as a dictionary with:
+        - frames: the number of frames measured
+        - tcl_calls and last_frame_tcl_calls: the number of calls made to tkinter, in total and in the last frame
+        - last_frame_ms, mean_frame_ms and max_frame_ms: frame times over the most recent frames
+        - frame_histogram: a dictionary of {upper limit in milliseconds: number of recent frames that took
+          at most that long (and longer than the previous limit)}
+        - methods: a dictionary of {function name: {calls, total_ms, max_call_ms, last_frame_calls,
+          last_frame_ms, max_frame_ms}}, where max_frame_ms is the most time spent in that function in one frame
+
+        Time spent in a function includes the time of any other Canvas functions it calls.
+        """
+        if self._profiler is None:
+            raise RuntimeError("Profiling is not enabled; call enable_profiling() first")
+        return self._profiler.stats()
+
+    """ LOGICAL COORDINATES """
+
+    def use_logical_coordinates(self, width=None, height=None, scale=None):
+        """
+        Lets the window be resized, and sizes it for high-DPI displays, while the program keeps drawing in the same
+        coordinates.  From now on, the canvas is width x height logical units, which are scaled to fill as much of
+        the window as they can: object coordinates and sizes, line widths and font sizes are all given in logical
+        units, and mouse locations, `get_width` and `get_height` are returned in them.  Images keep their size in
+        pixels.  Resizing the window rescales what is on the canvas in one go, without drawing it again.
+
+        Args:
+            width: the logical width of the canvas (or if not specified, its current width)
+            height: the logical height of the canvas (or if not specified, its current height)
+            scale: the window pixels per logical unit to start with (or if not specified, the display's pixels per
+                pixel of a standard 96 dpi display, so the game looks the same size on any display)
+        """
+        self._dpi_scale = float(self.tk.call("tk", "scaling")) * 72 / 96
+        if width is None:
+            width = self.get_width()
+        if height is None:
+            height = self.get_height()
+        if scale is None:
+            scale = self._dpi_scale
+        first_time = self._logical_size is None
+        self._logical_size = (width, height)
+        self.__rescale(scale)
+        self.main_window.geometry("{}x{}".format(round(width * scale), round(height * scale)))
+        if first_time:
+            self.pack_configure(fill=tkinter.BOTH, expand=True)
+            self.bind("<Configure>", self.__resized, add="+")
+
+    def __resized(self, event):
+        """
+        Called when the canvas changes size: rescales it so the logical canvas fits in it.
+        """
+        width, height = self._logical_size
+        scale = min(event.width / width, event.height / height)
+        if scale > 0 and abs(scale - self._scale) > 1e-6:
+            self.__rescale(scale)
+
+    def __rescale(self, scale):
+        """
+        Changes the window pixels per logical unit: scales every object's coordinates with a single tkinter
+        `scale`, then sets the sizes `scale` leaves alone (fonts, line widths and text area sizes) in one pass.
+        """
+        factor = scale / (1 if self._scale is None else self._scale)
+        self._scale = scale
+        with self.batch():
+            if factor != 1:
+                self._tk_command("scale", "all", 0, 0, factor, factor)
+            for item in self._scene.items.values():
+                options = {name: item.options[name] for name in ("font", "width", "height") if name in item.options}
+                if options:
+                    self._tk_command("itemconfigure", item.id, *self._options(self.__physical_options(options)))
+                if item.measured is not None:
+                    self._batch_unmeasured.append(item.id)
+
+    def __physical_options(self, options):
+        """
+        Returns a copy of the given object options with the sizes in them converted from logical units to pixels.
+        """
+        options = dict(options)
+        for name in ("width", "height"):
+            if options.get(name) not in (None, ""):
+                options[name] = float(options[name]) * self._scale
+        font = options.get("font")
+        if font:
+            font = list(self.tk.splitlist(font)) if isinstance(font, str) else list(font)
+            if len(font) > 1:
+                size = float(font[1])
+                # Fonts sized in points are already scaled to the display by tkinter, and ones sized in pixels
+                # (negative sizes) are not
+                if size < 0:
+                    font[1] = min(-1, round(size * self._scale))
+                else:
+                    font[1] = max(1, round(size * self._scale / self._dpi_scale))
+                options["font"] = tuple(font)
+        return options
+
+    def __logical(self, pixels):
+        """
+        Converts a distance in window pixels to whole logical units.
+        """
+        return math.floor(pixels / self._scale)
+
+    def __live_input(self, kind, event):
+        """
+        Called for every mouse, keyboard and button event from tkinter.  While replaying a recording the event is
+        ignored, since the recording decides what input the program sees.  While recording it is written to the
+        recording, stamped with the number of the update during which it arrived.
+        """
+        if self._replay is not None:
+            return
+        if self._scale is not None and kind in (_LOG_MOUSE_PRESS, _LOG_MOUSE_RELEASE):
+            event.x = self.__logical(event.x)
+            event.y = self.__logical(event.y)
+        if self._recorder is not None:
+            self._recorder.record_event(kind, self._updates_requested, event)
+        self._input_handlers[kind](event)
+
+    def __mouse_entered(self):
+        """
+        Called every time the mouse enters the canvas.  Updates the internal state to record that
+        the mouse is currently on the canvas.
+        """
+        self.mouse_on_canvas = True
+
+    def __mouse_exited(self):
+        """
+        Called every time the mouse exits the canvas.  Updates the internal state to record that
+        the mouse is currently not on the canvas.
+        """
+        self.mouse_on_canvas = False
+
+    def __window_closed(self):
+        """
+        Called when the canvas is destroyed, e.g. because the window was closed.  Wakes up anything waiting in
+        tkinter for the canvas, since nothing else would.
+        """
+        self._closed = True
+        self.wait_for_click_signal.set(False)
+        if self._loop is not None:
+            self._loop.stop()
+
+    def _wake_wait_for_click(self):
+        self.wait_for_click_signal.set(True)
+
+    def wait_for_click(self, timeout=None):
+        """
+        Waits until a mouse click occurs, and then returns.  The program sleeps inside tkinter while waiting,
+        so waiting does not use any CPU.  If the window is closed while waiting, a tkinter.TclError is raised, as
+        it would be by anything else that uses the closed window.
+
+        Args:
+            timeout: optional number of seconds after which to stop waiting, even if there has been no click
+
+        Returns:
+            the [x, y] location of the click, or None if the timeout passed without a click.
+        """
+        if self._closed:
+            raise tkinter.TclError("Cannot wait for a click, the window has been closed")
+        self.currently_waiting_for_click = True
+        self.wait_for_click_click_happened = False
+        self.wait_for_click_location = None
+        self.last_click = []
+        if self._replay is not None:
+            # The recording says when the click (or timeout) came, so there is nothing to wait for
+            self._replay.deliver_until(lambda: self.wait_for_click_click_happened)
+        else:
+            timer = None
+            if timeout is not None:
+                timer = self.after(int(timeout * 1000), lambda: self.wait_for_click_signal.set(False))
+            while not self.wait_for_click_click_happened:
+                self.wait_variable(self.wait_for_click_signal)
+                if not self.wait_for_click_signal.get():
+                    break
+            if timer is not None:
+                self.after_cancel(timer)
+            if self._closed:
+                self.currently_waiting_for_click = False
+                raise tkinter.TclError("The window was closed while waiting for a click")
+            if self._recorder is not None and not self.wait_for_click_click_happened:
+                self._recorder.record(_LOG_WAIT_TIMEOUT, self._updates_requested)
+        self.currently_waiting_for_click = False
+        self.wait_for_click_click_happened = False
+
+        # [CIP]
+        # Save the location of the mouse click
+        if self.wait_for_click_location is not None:
+            self.last_click = self.wait_for_click_location
+        return self.wait_for_click_location
+
+    """ GAME LOOP """
+
+    def run_loop(self, tick, hz=30, max_catchup=5):
+        """
+        Calls tick() hz times per second until tick returns False, `stop_loop` is called or the window is closed,
+        then returns.  Use this instead of a `while` loop with `time.sleep`: the rate stays the same however long
+        each tick and screen update takes, and the window keeps responding to input between ticks.  If tick raises
+        an exception, the loop stops and run_loop raises it.
+
+        Args:
+            tick: the function to call for each step of the game.  Return False from it to stop the loop.
+            hz: the number of ticks per second.  Can be changed while running with `set_loop_rate`.
+            max_catchup: the most ticks to run back to back when the program has fallen behind.  Any further
+                missed ticks are skipped.
+
+        Returns:
+            the timing stats for the loop, the same as `get_loop_stats`.
+        """
+        done = tkinter.BooleanVar(self.main_window, False)
+        loop = self._loop = _FrameLoop(self, tick, hz, max_catchup, time.perf_counter, lambda: done.set(True))
+        loop.start()
+        if self._closed:
+            loop.stop()
+        # tkwait only returns when the variable is next written, so it must not be called once the loop is done
+        if not done.get():
+            self.wait_variable(done)
+        # Closing the window in the middle of a tick makes the rest of the tick fail, which is not worth reporting
+        if loop.error is not None and not (self._closed and isinstance(loop.error, tkinter.TclError)):
+            raise loop.error
+        return loop.stats()
+
+    """ ANIMATION """
+
+    @staticmethod
+    def _clock():
+        return time.perf_counter()
+
+    def _color_rgb(self, color):
+        """
+        Converts any color tkinter knows to a (red, green, blue) tuple of 8-bit values.
+        """
+        return tuple(value >> 8 for value in self.winfo_rgb(color))
+
+    """ ASYNCIO """
+
+    def _new_async_bridge(self):
+        return _AsyncBridge(self, lambda: self.update(force=True), Canvas.FRAME_INTERVAL, time.perf_counter)
+
+    def get_mouse_x(self):
+        """
+        Returns the mouse's current X location on the canvas.
+
+        Returns:
+            the mouses's current X location on the canvas.
+        """
+        """
+        Note: winfo_pointerx is absolute mouse position (to screen, not window),
+              winfo_rootx is absolute window position (to screen)
+        Since move takes into account relative position to window,
+        we adjust this mouse_x to be relative position to window.
+        """
+        if self._replay is not None:
+            return self._replay.sample(_LOG_MOUSE_X)
+        mouse_x = self.winfo_pointerx() - self.winfo_rootx()
+        if self._scale is not None:
+            mouse_x = self.__logical(mouse_x)
+        if self._recorder is not None:
+            self._recorder.record(_LOG_MOUSE_X, self._updates_requested, (mouse_x,))
+        return mouse_x
+
+    def get_mouse_y(self):
+        """
+        Returns the mouse's current Y location on the canvas.
+
+        Returns:
+            the mouse's current Y location on the canvas.
+        """
+        """
+        Note: winfo_pointery is absolute mouse position (to screen, not window),
+              winfo_rooty is absolute window position (to screen)
+        Since move takes into account relative position to window,
+        we adjust this mouse_y to be relative position to window.
+        """
+        if self._replay is not None:
+            return self._replay.sample(_LOG_MOUSE_Y)
+        mouse_y = self.winfo_pointery() - self.winfo_rooty()
+        if self._scale is not None:
+            mouse_y = self.__logical(mouse_y)
+        if self._recorder is not None:
+            self._recorder.record(_LOG_MOUSE_Y, self._updates_requested, (mouse_y,))
+        return mouse_y
+
+    """ RECORD AND REPLAY """
+
+    def start_recording(self, file_path, seed=None):
+        """
+        Starts recording every mouse press and release, key press and release, button click and mouse location
+        the program asks for into the given file, so the same run can be played back later with `start_replay`.
+        Each is stamped with the number of the `update` call it happened during.  Also seeds the random module,
+        and stores the seed in the file, so random choices come out the same on replay.  Call this before the
+        program starts using input and random numbers.  The file is finished by `stop_recording`, or when the
+        program exits.
+
+        Args:
+            file_path: the file to write the recording to
+            seed: the seed for the random module.  If not given, a random seed is chosen.
+
+        Returns:
+            the seed used.
+        """
+        self.stop_recording()
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        self._recorder = _InputRecorder(file_path, seed)
+        return seed
+
+    def stop_recording(self):
+        """
+        Stops the recording started by `start_recording`, and finishes writing the file.
+        """
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def __get_frame_and_pack_location_for_location(self, location):
+        """
+        Returns the frame and pack location that should be used for an interactor given the
+        specified interactor location on the canvas.
+
+        Args:
+            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) to get the frame and pack location for.
+
+        Returns:
+            First, the frame, and second, the pack location, for the given interactor location.
+            For instance, for the top and bottom locations, the pack location should be Canvas.LEFT
+            to align interactors left to right.
+        """
+        pack_location = Canvas.LEFT
+        if location == Canvas.BOTTOM:
+            frame = self.bottom_frame
+        elif location == Canvas.LEFT:
+            frame = self.left_frame
+            pack_location = Canvas.TOP
+        elif location == Canvas.RIGHT:
+            frame = self.right_frame
+            pack_location = Canvas.TOP
+        else:
+            frame = self.top_frame
+
+        return frame, pack_location
+
+    @property
+    def top_frame(self):
+        """
+        The frame above the canvas that holds the interactors added at `Canvas.TOP`.
+        """
+        return self.__perimeter_frame(Canvas.TOP)
+
+    @property
+    def bottom_frame(self):
+        """
+        The frame below the canvas that holds the interactors added at `Canvas.BOTTOM`.
+        """
+        return self.__perimeter_frame(Canvas.BOTTOM)
+
+    @property
+    def left_frame(self):
+        """
+        The frame left of the canvas that holds the interactors added at `Canvas.LEFT`.
+        """
+        return self.__perimeter_frame(Canvas.LEFT)
+
+    @property
+    def right_frame(self):
+        """
+        The frame right of the canvas that holds the interactors added at `Canvas.RIGHT`.
+        """
+        return self.__perimeter_frame(Canvas.RIGHT)
+
+    def __perimeter_frame(self, side):
+        """
+        Returns the frame on the given side of the canvas, creating it the first time it is needed.  Whichever
+        frame is created first, the frames are packed in the order bottom, top, right, left, so that they always
+        share out the edges of the window the same way.
+        """
+        frame = self._perimeter_frames.get(side)
+        if frame is None:
+            frame = self._perimeter_frames[side] = tkinter.Frame(self.main_window)
+            order = (Canvas.BOTTOM, Canvas.TOP, Canvas.RIGHT, Canvas.LEFT)
+            later = [self._perimeter_frames[other] for other in order[order.index(side) + 1:]
+                     if other in self._perimeter_frames]
+            frame.pack(side=side, before=later[0] if later else self)
+        return frame
+
+    def create_button(self, title, location, **kwargs):
+        """
+        Adds a button to the canvas with the specified title at the specified location.  Buttons are added from left
+        to right at the top and bottom of the window and top to bottom on the sides of the window.
+
+        Args:
+            title: the title to display on the button.  Must be unique among button names.
+            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) where the button should be added around the canvas.
+            kwargs: other tkinter keyword args
+
+        Returns:
+            a reference to the button added to the window at the specified location.  Use this with the .destroy()
+            function to delete the button later if needed.  E.g. button = create_button(...); button.destroy();
+        """
+        frame, pack_location = self.__get_frame_and_pack_location_for_location(location)
+        button = tkinter.Button(frame, text=title, command=lambda: self.__live_input(_LOG_BUTTON_CLICK, title),
+                                **kwargs)
+        button.pack(side=pack_location)
+        self.update(force=True)
+        return button
+
+    def create_text_field(self, label, location, **kwargs):
+        """
+        Adds a label and text field pair to the canvas with the specified label text at the specified location.
+        Interactors are added from left to right at the top and bottom of the window and top to bottom on the sides
+        of the window.  Stores a reference to this text field in the Canvas map of text fields.
+
+        Args:
+            label: the label text to display next to the text field, and the name of the text field.
+                Must be unique among text field names.
+            location: the region (Canvas.TOP/LEFT/BOTTOM/RIGHT) where the label/text field
+                should be added around the canvas.
+            kwargs: other tkinter keyword args for the text field
+
+        Returns:
+            a reference to the text field and the label (in that order) added to the window at the specified location.
+        """
+        frame, pack_location = self.__get_frame_and_pack_location_for_location(location)
+        text_field_label = tkinter.Label(frame, text=label)
+        text_field_label.pack(side=pack_location)
+        text_field = tkinter.Entry(frame, **kwargs)
+        text_field.pack(side=pack_location)
+        self.text_fields[label] = (text_field, text_field_label)
+        self.update(force=True)
+        return text_field, text_field_label
+
+    def _interactors_changed(self):
+        self.update(force=True)
+
+    """ GRAPHICAL OBJECT MANIPULATION """
+
+    def _backend_geometry(self, name, obj):
+        """
+        Answers a geometry query (e.g. "get_left_x") by asking tkinter, for objects the shadow scene doesn't know
+        about and for `check_geometry`.
+        """
+        return {
+            "get_left_x": self.__tk_get_left_x,
+            "get_top_y": self.__tk_get_top_y,
+            "get_obj_width": self.__tk_get_obj_width,
+            "get_obj_height": self.__tk_get_obj_height,
+            "coords": self.__tk_coords,
+        }[name](obj)
+
+    def __tk_get_left_x(self, obj):
+        """
+        Calculates `get_left_x` by asking tkinter.
+        """
+        if self.type(obj) != "text":
+            return self.__tk_coords(obj)[0]
+        else:
+            return self.__tk_coords(obj)[0] - self.__tk_get_obj_width(obj) / 2
+
+    def __tk_get_top_y(self, obj):
+        """
+        Calculates `get_top_y` by asking tkinter.
+        """
+        if self.type(obj) != "text":
+            return self.__tk_coords(obj)[1]
+        else:
+            return self.__tk_coords(obj)[1] - self.__tk_get_obj_height(obj) / 2
+
+    def __tk_get_obj_width(self, obj):
+        """
+        Calculates `get_obj_width` by asking tkinter.
+        """
+        if len(self.__tk_coords(obj)) == 2:  # two-dimensional coords
+            return self.bbox(obj)[2] - self.bbox(obj)[0]
+        return self.__tk_coords(obj)[2] - self.__tk_coords(obj)[0]
+
+    def __tk_get_obj_height(self, obj):
+        """
+        Calculates `get_obj_height` by asking tkinter.
+        """
+        if len(self.__tk_coords(obj)) == 2:  # two-dimensional coords
+            return self.bbox(obj)[3] - self.bbox(obj)[1]
+        return self.__tk_coords(obj)[3] - self.__tk_coords(obj)[1]
+
+    def _create_shapes(self, kind, coords, fills, outlines, width):
+        """
+        Adds the create commands for many rectangles or ovals straight to a batch script, and returns their ids.
+        Does what `_create` does for each shape, but quotes each combination of options only once.
+        """
+        rows, fills, outlines = _bulk_shapes(coords, fills, outlines)
+        scene = self._scene
+        tags = scene.with_group_tags(None)
+        scale = 1 if self._scale is None else self._scale
+        options_words = {}
+        ids = []
+        with self.batch():
+            for (x1, y1, x2, y2), fill, outline in zip(rows, fills, outlines):
+                if outline is None:
+                    outline = fill
+                words = options_words.get((fill, outline))
+                if words is None:
+                    options = ("-fill", fill, "-outline", outline, "-width", width * scale)
+                    if tags:
+                        options += ("-tags", " ".join(tags))
+                    words = options_words[(fill, outline)] = " ".join(_tcl_quote(word) for word in options)
+                item_id = scene.next_id
+                self._batch.append(" ".join((self._w, "create", kind, _tcl_quote(x1 * scale), _tcl_quote(y1 * scale),
+                                             _tcl_quote(x2 * scale), _tcl_quote(y2 * scale), words)))
+                scene.add(kind, (x1, y1, x2, y2), {"fill": fill, "outline": outline, "width": width}, item_id)
+                ids.append(item_id)
+            if ids:
+                self._dirty = True
+                self._batch_last_create = ids[-1]
+        return ids
+
+    def create_text_area(self, x, y, width=200, height=100, text="", bg="#ececec"):
+        """
+        Create a multi-line text area embedded in a specified canvas.
+
+        Args:
+            canvas: The canvas widget where the text area will be embedded.
+            x, y: The coordinates on the canvas where the top-left corner of the text area will be placed.
+            width: The width of the text area in pixels.
+            height: The height of the text area in pixels.
+            **text_kwargs: Additional keyword arguments to be passed to the tkinter Text widget.
+
+        Returns:
+            A tkinter Text widget instance representing the text area.
+        """
+        # Create a Frame to hold the Text widget; this is necessary for correct embedding in the canvas
+        frame = tkinter.Frame(self, width=width, height=height, bg=bg)
+        frame.pack_propagate(False)  # Prevent the frame from resizing to fit the Text widget
+
+        # Create the Text widget inside the frame
+        text_widget = tkinter.Text(frame, width=width, height=height, bg=bg, wrap=tkinter.WORD)
+        text_widget.insert(tkinter.END, text)
+        
+        # Set the text widget to be non-editable
+        text_widget.config(state=tkinter.DISABLED)
+        
+        text_widget.pack(fill=tkinter.BOTH, expand=True)
+
+        # Create a window on the canvas, and add the frame to it
+        self.create_window(x, y, anchor="nw", window=frame, width=width, height=height)
+
+        return text_widget
+
+
+    def measure_text(self, text, font="Arial", font_size="12"):
+        """
+        Returns the width and height that `create_text` would give the specified text in the specified font,
+        without creating an object, so that text can be placed exactly, e.g. centered.  Fonts are looked up once
+        and the widths of texts are remembered, so measuring the same text again is fast.
+
+        Args:
+            text: the text to measure, which may have several lines
+            font: the name of the font, as a string
+            font_size: the size of the font
+
+        Returns:
+            the (width, height) of the text.
+        """
+        if self._fonts is None:
+            self._fonts = _FontCache(self.main_window, FONT_CACHE_MAX_TEXTS)
+        if self._scale is None:
+            return self._fonts.measure(font, font_size, text)
+        # Measured in the font tkinter draws at the current scale, so the size matches the drawn text
+        font, font_size = self.__physical_options({"font": (font, font_size)})["font"]
+        width, height = self._fonts.measure(font, font_size, text)
+        return width / self._scale, height / self._scale
+
+    """ GROUPS """
+
+    def __tk_coords(self, obj):
+        """
+        Calculates `coords` by asking tkinter.
+        """
+        coords = super().coords(obj)
+        if coords:
+            return [ int(coords[0]), int(coords[1]) ]
+        return coords
+
+    def _create_image(self, x, y, file_path, width=None, height=None, **kwargs):
+        """
+        Creates an image with the specified filename at the specified position on the canvas.
+        Optionally specify the width and height to resize the image.
+
+        Args:
+            x: the x coordinate of the top-left corner of the image on the canvas
+            y: the y coordinate of the top-left corner of the image on the canvas
+            file_path: the path to the image file to load and display on the canvas
+            width: optional width to include for the image.  If none, uses the width of the image file.
+            height: optional height to include for the image  If none, uses the height of the image file.
+            kwargs: other tkinter keyword args
+
+        Returns:
+            the graphical image object that is displaying the specified image at the specified location.
+        """
+        # Images are decoded once and shared by every object showing the same file at the same size
+        image = _image_cache.get_photo_image(self, file_path, width, height)
+        img_obj = super().create_image(x, y, anchor="nw", image=image, **kwargs)
+        # note: if you don't do this, the image gets garbage collected!!!
+        # the reference is released again when the object is deleted
+        self._image_gb_protection[img_obj] = image
+        return img_obj
+
+    def load_atlas(self, file_path, frame_width, frame_height):
+        """
+        Loads a sprite sheet: an image file holding several pictures (frames) of the same size side by side, e.g.
+        the faces of all the cards in a game.  The frames are numbered from 0, left to right and then top to bottom.
+        The file is only decoded once, however many times it is loaded, and every sprite showing the same frame
+        shares one image.
+
+        Args:
+            file_path: the path to the image file holding the frames
+            frame_width: the width of each frame
+            frame_height: the height of each frame
+
+        Returns:
+            the atlas, to pass to `create_sprite`.
+        """
+        return _image_cache.get_atlas(self, file_path, frame_width, frame_height)
+
+    def create_sprite(self, x, y, atlas, frame=0):
+        """
+        Creates and returns an image graphical object showing one frame of an atlas loaded by `load_atlas`.
+
+        Args:
+            x: the x coordinate of the top-left corner of the sprite
+            y: the y coordinate of the top-left corner of the sprite
+            atlas: the atlas holding the sprite's frames
+            frame: the number of the frame to show
+
+        Returns:
+            the graphical image object showing the frame at the specified location.
+        """
+        sprite = super().create_image(x, y, anchor="nw", image=atlas.frames[atlas.index(frame)])
+        # Keeps the atlas, and so its images, alive while the sprite exists
+        self._image_gb_protection[sprite] = atlas
+        return sprite
+
+    def set_sprite_frame(self, obj, frame):
+        """
+        Changes which frame of its atlas a sprite made by `create_sprite` shows.  Nothing is decoded again, so this
+        is cheap enough to animate many sprites every frame.
+
+        Args:
+            obj: the sprite
+            frame: the number of the frame to show
+        """
+        atlas = self._image_gb_protection.get(obj)
+        if not isinstance(atlas, _Atlas):
+            raise ValueError("{} is not a sprite made by create_sprite".format(obj))
+        image = atlas.frames[atlas.index(frame)]
+        # Every frame is the same size, so unlike itemconfigure this doesn't need to measure the sprite again
+        self._tk_command("itemconfigure", obj, "-image", image)
+        self._scene.configure(obj, {"image": image})
+
+
+# Characters that can appear in a Tcl word without any quoting
+_TCL_PLAIN_WORD = re.compile(r"[\w.,:/=@%+-]+", re.ASCII)
+
+
+def _tcl_quote(value):
+    """
+    Quotes a value as a single word of a Tcl script, so it reaches the command unchanged (no $ or [] substitution).
+    """
+    if type(value) is int or type(value) is float:
+        # Coordinates are by far the most common words, and never need quoting
+        return repr(value)
+    if isinstance(value, (tuple, list)):
+        # A Tcl list, the way tkinter passes tuples, e.g. a font of ("Arial", 12.5).  Each element is quoted as a
+        # list element, then the whole list as one word.
+        return _tcl_quote_string(" ".join(_tcl_quote(element) for element in value))
+    return _tcl_quote_string(str(value))
+
+
+@functools.lru_cache(maxsize=1024)
+def _tcl_quote_string(value):
+    if _TCL_PLAIN_WORD.fullmatch(value):
+        return value
+    if not value:
+        return "{}"
+    value = re.sub(r"([^\w\n\t])", r"\\\1", value, flags=re.ASCII)
+    return value.replace("\n", "\\n").replace("\t", "\\t")
+
+
+""" INPUT """
+
+
+class _InputEvent:
+    """
+    A compact record of one mouse press, key press or button click: when it happened (in seconds, from
+    `time.perf_counter` or the simulated clock), its kind ("mouse", "key" or "button"), and its x and y location,
+    keysym and char, or button title.  It has the same x, y, keysym and char properties as a tkinter event object.
+    """
+    __slots__ = ("time", "kind", "x", "y", "keysym", "char", "title")
+
+    def __init__(self, time, kind, x=0, y=0, keysym="", char="", title=""):
+        self.time = time
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.keysym = keysym
+        self.char = char
+        self.title = title
+
+    def __repr__(self):
+        if self.kind == "key":
+            return "<key {} at {:.3f}>".format(self.keysym, self.time)
+        if self.kind == "button":
+            return "<button {!r} at {:.3f}>".format(self.title, self.time)
+        return "<{} ({}, {}) at {:.3f}>".format(self.kind, self.x, self.y, self.time)
+
+
+class _InputQueue:
+    """
+    A first-in, first-out queue of input that holds at most capacity entries.  When it is full, the overflow
+    policy decides whether the oldest entry is forgotten ("drop_oldest") or the new one is ignored ("drop_newest").
+    The number of entries lost this way is counted in dropped.
+    """
+
+    def __init__(self, capacity, overflow):
+        self.entries = collections.deque()
+        self.dropped = 0
+        self.set_limits(capacity, overflow)
+
+    def set_limits(self, capacity, overflow):
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError("overflow must be 'drop_oldest' or 'drop_newest', not {!r}".format(overflow))
+        self.capacity = capacity
+        self.overflow = overflow
+        while len(self.entries) > capacity:
+            self.entries.popleft()
+            self.dropped += 1
+
+    def append(self, entry):
+        if len(self.entries) >= self.capacity:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self.entries.popleft()
+        self.entries.append(entry)
+
+    def drain(self):
+        """
+        Removes and returns all the entries, oldest first.
+        """
+        entries = list(self.entries)
+        self.entries.clear()
+        return entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Kinds of record in an input recording (text field and text area changes are only sent by a `RemoteCanvas`
+# renderer)
+(_LOG_MOUSE_PRESS, _LOG_MOUSE_RELEASE, _LOG_KEY_PRESS, _LOG_KEY_RELEASE, _LOG_FOCUS_OUT, _LOG_BUTTON_CLICK,
+ _LOG_MOUSE_X, _LOG_MOUSE_Y, _LOG_WAIT_TIMEOUT, _LOG_TEXT_FIELD, _LOG_RENDER_ERROR, _LOG_TEXT_AREA) = range(1, 13)
+
+# An input recording starts with a header of a magic string and the random seed.  Each record is then its kind and
+# the update number it happened during, followed by the numbers and then the strings of that kind, in the format
+# below.  Strings are stored as one length byte followed by that many bytes of UTF-8.
+_LOG_HEADER = struct.Struct("<8sQ")
+_LOG_MAGIC = b"CIPINPUT"
+_LOG_RECORD = struct.Struct("<BI")
+_LOG_FIELDS = {
+    _LOG_MOUSE_PRESS: (struct.Struct("<ii"), 0),
+    _LOG_MOUSE_RELEASE: (struct.Struct("<ii"), 0),
+    _LOG_KEY_PRESS: (None, 2),
+    _LOG_KEY_RELEASE: (None, 2),
+    _LOG_FOCUS_OUT: (None, 0),
+    _LOG_BUTTON_CLICK: (None, 1),
+    _LOG_MOUSE_X: (struct.Struct("<i"), 0),
+    _LOG_MOUSE_Y: (struct.Struct("<i"), 0),
+    _LOG_WAIT_TIMEOUT: (None, 0),
+    _LOG_TEXT_FIELD: (None, 2),
+    _LOG_RENDER_ERROR: (None, 1),
+    # The text area's id, whether the text goes on in the next record, and a piece of the text
+    _LOG_TEXT_AREA: (struct.Struct("<iB"), 1),
+}
+
+
+def _pack_input(kind, tick, numbers=(), strings=()):
+    """
+    Returns the bytes of one input record.
+    """
+    numbers_format, _ = _LOG_FIELDS[kind]
+    record = _LOG_RECORD.pack(kind, tick)
+    if numbers_format is not None:
+        record += numbers_format.pack(*numbers)
+    for string in strings:
+        data = string.encode("utf-8")[:255]
+        record += bytes((len(data),)) + data
+    return record
+
+
+def _unpack_input(data, offset=0):
+    """
+    Reads the input record starting at offset, and returns its kind, tick, numbers and strings, and the offset
+    of the next record.
+    """
+    kind, tick = _LOG_RECORD.unpack_from(data, offset)
+    offset += _LOG_RECORD.size
+    numbers_format, string_count = _LOG_FIELDS[kind]
+    numbers = ()
+    if numbers_format is not None:
+        numbers = numbers_format.unpack_from(data, offset)
+        offset += numbers_format.size
+    strings = []
+    for _ in range(string_count):
+        length = data[offset]
+        strings.append(bytes(data[offset + 1:offset + 1 + length]).decode("utf-8"))
+        offset += 1 + length
+    return kind, tick, numbers, strings, offset
+
+
+def _deliver_input(handlers, kind, numbers, strings):
+    """
+    Passes an input record to the handler for its kind, as the kind of argument tkinter would pass.
+    """
+    if kind in (_LOG_MOUSE_PRESS, _LOG_MOUSE_RELEASE):
+        handlers[kind](_InputEvent(None, "mouse", *numbers))
+    elif kind in (_LOG_KEY_PRESS, _LOG_KEY_RELEASE):
+        handlers[kind](_InputEvent(None, "key", keysym=strings[0], char=strings[1]))
+    elif kind == _LOG_BUTTON_CLICK:
+        handlers[kind](strings[0])
+    elif kind in handlers:
+        # Mouse locations pass the number, text field changes the name and text, and the rest nothing
+        args = tuple(numbers) + tuple(strings)
+        handlers[kind](*args) if args else handlers[kind](None)
+
+
+class _InputRecorder:
+    """
+    Writes input, as it happens, to an input recording file.
+    """
+
+    def __init__(self, file_path, seed):
+        self.file = open(file_path, "wb")
+        self.file.write(_LOG_HEADER.pack(_LOG_MAGIC, seed))
+        # Make sure the recording is complete even if the program ends without calling stop_recording
+        atexit.register(self.close)
+
+    def record_event(self, kind, tick, event):
+        """
+        Records a tkinter event (or the title of a clicked button) of the given kind.
+        """
+        if kind in (_LOG_MOUSE_PRESS, _LOG_MOUSE_RELEASE):
+            self.record(kind, tick, (event.x, event.y))
+        elif kind in (_LOG_KEY_PRESS, _LOG_KEY_RELEASE):
+            self.record(kind, tick, strings=(event.keysym, event.char))
+        elif kind == _LOG_BUTTON_CLICK:
+            self.record(kind, tick, strings=(event,))
+        else:
+            self.record(kind, tick)
+
+    def record(self, kind, tick, numbers=(), strings=()):
+        self.file.write(_pack_input(kind, tick, numbers, strings))
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            atexit.unregister(self.close)
+
+
+class _InputReplay:
+    """
+    Plays back an input recording by passing each recorded event to the canvas's handler for that kind of event.
+    Events are delivered in the order they were recorded, and mouse locations are answered in the order they
+    were asked for.  skip_sleep says whether the canvas's `sleep` should do nothing while playing back.
+    """
+
+    def __init__(self, file_path, handlers, skip_sleep):
+        with open(file_path, "rb") as file:
+            data = file.read()
+        magic, self.seed = _LOG_HEADER.unpack_from(data)
+        if magic != _LOG_MAGIC:
+            raise ValueError("{} is not an input recording".format(file_path))
+        self.handlers = handlers
+        self.events = collections.deque()
+        self.samples = {_LOG_MOUSE_X: collections.deque(), _LOG_MOUSE_Y: collections.deque()}
+        self.last_samples = {_LOG_MOUSE_X: 0, _LOG_MOUSE_Y: 0}
+
+        offset = _LOG_HEADER.size
+        while offset < len(data):
+            kind, tick, numbers, strings, offset = _unpack_input(data, offset)
+            if kind in self.samples:
+                self.samples[kind].append(numbers[0])
+            else:
+                self.events.append((kind, tick, numbers, strings))
+
+        self.skip_sleep = skip_sleep
+
+    def deliver_due(self, tick):
+        """
+        Delivers every event recorded during update number tick or earlier.
+        """
+        while self.events and self.events[0][1] <= tick:
+            self.__deliver(self.events.popleft())
+
+    def deliver_until(self, done):
+        """
+        Delivers events until done() returns True, a recorded wait_for_click timeout is reached, or there are
+        no more events.
+        """
+        while self.events and not done():
+            event = self.events.popleft()
+            if event[0] == _LOG_WAIT_TIMEOUT:
+                return
+            self.__deliver(event)
+
+    def sample(self, kind):
+        """
+        Returns the next recorded mouse location of the given kind, or the last one once they run out.
+        """
+        if self.samples[kind]:
+            self.last_samples[kind] = self.samples[kind].popleft()
+        return self.last_samples[kind]
+
+    def __deliver(self, event):
+        kind, _, numbers, strings = event
+        _deliver_input(self.handlers, kind, numbers, strings)
+
+    def close(self):
+        """
+        Returns the number of events that were never delivered.
+        """
+        return len(self.events)
+
+
+""" IMAGES """
+
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+"""The most memory, in bytes, used to keep decoded images around for reuse by `Canvas.create_image`."""
+
+
+class _ImageCache:
+    """
+    Decoded images shared by all canvases, keyed by file path, modification time and size, so each image file is
+    only opened, decoded and resized once.  When the images take up more than max_bytes, the least recently used
+    ones are forgotten.  Forgetting an image does not remove it from the screen, since every image object on a
+    canvas keeps its own reference to the image it shows.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()    # key -> (PhotoImage, main window, size in bytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_photo_image(self, canvas, file_path, width=None, height=None):
+        """
+        Returns a PhotoImage of the given file, resized to width by height if both are given, that can be
+        shown on the given canvas.
+        """
+        key = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns, width, height)
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] is canvas._root():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        from PIL import ImageTk
+        from PIL import Image
+        with Image.open(file_path) as image:
+            # Resize the image if another width and height is specified
+            if width is not None and height is not None:
+                image = image.resize((width, height))
+            photo_image = ImageTk.PhotoImage(image, master=canvas)
+            size = image.size[0] * image.size[1] * 4
+        self.__add(key, (photo_image, canvas._root(), size))
+        return photo_image
+
+    def get_atlas(self, canvas, file_path, frame_width, frame_height):
+        """
+        Returns an `_Atlas` of the given file cut into frames of frame_width by frame_height, with a PhotoImage per
+        frame that can be shown on the given canvas.
+        """
+        key = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns, "atlas", frame_width, frame_height)
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] is canvas._root():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        from PIL import ImageTk
+        from PIL import Image
+        with Image.open(file_path) as image:
+            image.load()
+            atlas = _Atlas(file_path, frame_width, frame_height, image.size)
+            atlas.frames = [ImageTk.PhotoImage(image.crop(atlas.box(frame)), master=canvas)
+                            for frame in range(len(atlas))]
+            size = len(atlas) * frame_width * frame_height * 4
+        self.__add(key, (atlas, canvas._root(), size))
+        return atlas
+
+    def __add(self, key, entry):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[2]
+        self.entries[key] = entry
+        self.total_bytes += entry[2]
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+
+_image_cache = _ImageCache(IMAGE_CACHE_MAX_BYTES)
+
+
+class _Atlas:
+    """
+    An image file cut into frames of the same size, numbered from 0 left to right and then top to bottom, as
+    loaded by `Canvas.load_atlas`.  On a `Canvas`, frames holds a PhotoImage per frame; on a `HeadlessCanvas`
+    it is None, since sprites there only record which frame they show.
+    """
+
+    def __init__(self, file_path, frame_width, frame_height, image_size):
+        self.file_path = file_path
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.columns = image_size[0] // frame_width
+        self.rows = image_size[1] // frame_height
+        if self.columns == 0 or self.rows == 0:
+            raise ValueError("Frames of {}x{} do not fit in the {}x{} image {!r}".format(
+                frame_width, frame_height, image_size[0], image_size[1], file_path))
+        self.frames = None
+
+    def __len__(self):
+        return self.columns * self.rows
+
+    def index(self, frame):
+        """
+        Returns the given frame number, or raises an IndexError if the atlas has no such frame.
+        """
+        if not 0 <= frame < len(self):
+            raise IndexError("Frame {} is not in the {} frames of {!r}".format(frame, len(self), self.file_path))
+        return frame
+
+    def box(self, frame):
+        """
+        Returns the (left, top, right, bottom) area of the image file that the given frame covers.
+        """
+        left = frame % self.columns * self.frame_width
+        top = frame // self.columns * self.frame_height
+        return left, top, left + self.frame_width, top + self.frame_height
+
+
+""" FONTS """
+
+FONT_CACHE_MAX_TEXTS = 4096
+"""The most text widths each canvas remembers for `Canvas.measure_text`."""
+
+
+class _FontCache:
+    """
+    The tkinter fonts of one window, keyed by family and size, so each font is only looked up once, along with its
+    line height and the widths of lines measured in it.  When more than max_texts widths are remembered, the least
+    recently used ones are forgotten.
+    """
+
+    def __init__(self, master, max_texts):
+        self.master = master
+        self.max_texts = max_texts
+        self.fonts = {}                             # (family, size) -> (tkinter Font, line height)
+        self.widths = collections.OrderedDict()     # (family, size, line) -> width
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, family, size):
+        """
+        Returns the (tkinter Font, line height) for the given font family and whole-number size.
+        """
+        key = (family, size)
+        entry = self.fonts.get(key)
+        if entry is None:
+            import tkinter.font
+            font = tkinter.font.Font(root=self.master, family=family, size=size)
+            entry = self.fonts[key] = (font, font.metrics("linespace"))
+        return entry
+
+    def measure(self, family, size, text):
+        """
+        Returns the (width, height) of the given text, which may have several lines, in the given font.
+        """
+        # tkinter font sizes are whole numbers, so e.g. "12" and 12.0 are the same font
+        size = round(float(size))
+        lines = str(text).split("\n")
+        width = 0
+        for line in lines:
+            key = (family, size, line)
+            line_width = self.widths.get(key)
+            if line_width is not None:
+                self.widths.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                line_width = self.widths[key] = self.font(family, size)[0].measure(line)
+                if len(self.widths) > self.max_texts:
+                    self.widths.popitem(last=False)
+            width = max(width, line_width)
+        return width, len(lines) * self.font(family, size)[1]
+
+
+""" PROFILING """
+
+PROFILER_HISTOGRAM_MS = (1, 2, 4, 8, 16, 33, 50, 100, math.inf)
+"""Upper limits, in milliseconds, of the frame time histogram buckets reported by `Canvas.stats`."""
+
+# Functions that are never timed, since they manage the profiler itself
+_UNPROFILED = {"enable_profiling", "disable_profiling", "stats"}
+
+
+class _Profiler:
+    """
+    Times calls to the public functions of one canvas.  For each function it keeps a list of
+    [calls, total time, longest call, calls this frame, time this frame, most time in one frame,
+    calls last frame, time last frame], with times in seconds.
+    """
+
+    def __init__(self, window):
+        self.methods = {}
+        self.depth = 0
+        self.tcl_calls = 0
+        self.frame_tcl_calls = 0
+        self.last_frame_tcl_calls = 0
+        self.frames = 0
+        self.frame_times = collections.deque(maxlen=window)
+        self.frame_start = time.perf_counter()
+        self.frame_ended = False
+
+    def attach(self, canvas, base):
+        """
+        Replaces every public function the canvas's class defines (up to and including base) with a timed
+        version on the canvas itself.
+        """
+        names = set()
+        for cls in type(canvas).__mro__:
+            names.update(name for name, value in vars(cls).items()
+                         if not name.startswith("_") and name not in _UNPROFILED and callable(value))
+            if cls is base:
+                break
+        for name in names:
+            setattr(canvas, name, self.wrap(name, getattr(canvas, name)))
+
+    def detach(self, canvas):
+        for name in self.methods:
+            canvas.__dict__.pop(name, None)
+
+    def wrap(self, name, method):
+        record = self.methods.setdefault(name, [0, 0.0, 0.0, 0, 0.0, 0.0, 0, 0.0])
+
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            self.depth += 1
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.depth -= 1
+                record[0] += 1
+                record[1] += elapsed
+                record[2] = max(record[2], elapsed)
+                record[3] += 1
+                record[4] += elapsed
+                if self.frame_ended and self.depth == 0:
+                    self.__finish_frame()
+        return profiled
+
+    def end_frame(self):
+        """
+        Marks the end of a frame.  If a timed function is running (e.g. update), the frame ends when it returns,
+        so its own time counts towards the frame.
+        """
+        if self.depth == 0:
+            self.__finish_frame()
+        else:
+            self.frame_ended = True
+
+    def __finish_frame(self):
+        now = time.perf_counter()
+        self.frame_times.append(now - self.frame_start)
+        self.frame_start = now
+        self.frame_ended = False
+        self.frames += 1
+        self.last_frame_tcl_calls = self.frame_tcl_calls
+        self.frame_tcl_calls = 0
+        for record in self.methods.values():
+            record[5] = max(record[5], record[4])
+            record[6] = record[3]
+            record[7] = record[4]
+            record[3] = 0
+            record[4] = 0.0
+
+    def stats(self):
+        histogram = dict.fromkeys(PROFILER_HISTOGRAM_MS, 0)
+        for frame_time in self.frame_times:
+            limit = next(limit for limit in PROFILER_HISTOGRAM_MS if frame_time * 1000 <= limit)
+            histogram[limit] += 1
+        frame_times = self.frame_times
+        return {
+            "frames": self.frames,
+            "tcl_calls": self.tcl_calls,
+            "last_frame_tcl_calls": self.last_frame_tcl_calls,
+            "last_frame_ms": frame_times[-1] * 1000 if frame_times else 0,
+            "mean_frame_ms": sum(frame_times) * 1000 / len(frame_times) if frame_times else 0,
+            "max_frame_ms": max(frame_times) * 1000 if frame_times else 0,
+            "frame_histogram": histogram,
+            "methods": {
+                name: {
+                    "calls": record[0],
+                    "total_ms": record[1] * 1000,
+                    "max_call_ms": record[2] * 1000,
+                    "last_frame_calls": record[6],
+                    "last_frame_ms": record[7] * 1000,
+                    "max_frame_ms": max(record[5], record[4]) * 1000,
+                }
+                for name, record in sorted(self.methods.items()) if record[0]
+            },
+        }
+
+
+class _UnmappedTk:
+    """
+    Stands in for the Tcl interpreter of a canvas whose window has not been shown yet, while its drawing is
+    collected in a batch.  The first time the canvas uses the interpreter for anything, the window is shown and
+    the interpreter itself takes over.
+    """
+
+    def __init__(self, canvas, tk):
+        self.canvas = canvas
+        self.tk = tk
+
+    def __getattr__(self, name):
+        canvas = self.canvas
+        if canvas is not None:
+            self.canvas = None
+            canvas._show_window(self)
+        return getattr(self.tk, name)
+
+
+class _CountingTk:
+    """
+    Stands in for a canvas's Tcl interpreter while it is being profiled, counting the commands sent to Tcl
+    and passing everything through unchanged.
+    """
+
+    def __init__(self, tk, profiler):
+        self.tk = tk
+        self.profiler = profiler
+
+    def call(self, *args):
+        self.profiler.tcl_calls += 1
+        self.profiler.frame_tcl_calls += 1
+        return self.tk.call(*args)
+
+    def eval(self, script):
+        self.profiler.tcl_calls += 1
+        self.profiler.frame_tcl_calls += 1
+        return self.tk.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self.tk, name)
+
+
+""" SCENE MODEL """
+
+HEADLESS_CHAR_WIDTH = 0.6
+"""Approximate width of one character, as a fraction of the font size, used by `HeadlessCanvas` to size text."""
+
+HEADLESS_LINE_HEIGHT = 1.25
+"""Approximate height of one line of text, as a fraction of the font size, used by `HeadlessCanvas` to size text."""
+
+# Options each item kind accepts, mirroring the tkinter item options the Canvas API sets.
+# Configuring anything else raises a tkinter.TclError, just like tkinter does.
+_ITEM_OPTIONS = {
+    "line": {"fill", "width", "state", "tags"},
+    "rectangle": {"fill", "outline", "width", "state", "tags"},
+    "oval": {"fill", "outline", "width", "state", "tags"},
+    "polygon": {"fill", "outline", "width", "state", "tags"},
+    "text": {"fill", "font", "text", "anchor", "state", "tags"},
+    "image": {"image", "anchor", "state", "tags"},
+    "window": {"window", "anchor", "width", "height", "state", "tags"},
+}
+
+SPATIAL_HASH_CELL_SIZE = 64
+"""The width and height, in pixels, of each cell of the grid used to find overlapping objects."""
+
+# Options that never change the size of an item, so changing them does not need the item to be re-indexed
+_UNSIZED_OPTIONS = {"fill", "state", "tags"}
+
+# Offset (as a fraction of the width and height) from the anchor point to the top-left corner
+_ANCHOR_OFFSETS = {
+    "nw": (0, 0), "n": (-0.5, 0), "ne": (-1, 0),
+    "w": (0, -0.5), "center": (-0.5, -0.5), "e": (-1, -0.5),
+    "sw": (0, -1), "s": (-0.5, -1), "se": (-1, -1),
+}
+
+
+class _HeadlessWidget:
+    """
+    Stand-in for the tkinter Button, Label, Entry and Text widgets created by the interactor functions.
+    Supports the handful of widget methods the Canvas API exposes to clients.
+    """
+
+    def __init__(self, text=""):
+        self.text = text
+        self.destroyed = False
+
+    def get(self, *args):
+        return self.text
+
+    def insert(self, index, text):
+        index = self.__index(index)
+        self.text = self.text[:index] + text + self.text[index:]
+
+    def delete(self, first, last=None):
+        first = self.__index(first)
+        last = first + 1 if last is None else self.__index(last)
+        self.text = self.text[:first] + self.text[last:]
+
+    def __index(self, index):
+        """
+        Converts an Entry index (e.g. 3 or "end") or single-line Text index (e.g. "1.3") to a string offset.
+        """
+        if index == tkinter.END:
+            return len(self.text)
+        if isinstance(index, str) and "." in index:
+            index = index.split(".")[1]
+        return min(int(index), len(self.text))
+
+    def config(self, **kwargs):
+        if "text" in kwargs:
+            self.text = kwargs["text"]
+
+    configure = config
+
+    def destroy(self):
+        self.destroyed = True
+
+
+def _headless_text_size(text, font_size):
+    """
+    Returns the approximate (width, height) of the given text in a font of the given size, since there are no
+    font metrics without a display.
+    """
+    size = abs(float(font_size))
+    lines = str(text).split("\n")
+    width = max(len(line) for line in lines) * size * HEADLESS_CHAR_WIDTH
+    return width, len(lines) * size * HEADLESS_LINE_HEIGHT
+
+
+class _SceneItem:
+    """
+    A single graphical object in a `_Scene`: its kind (e.g. "rectangle"), its flat list of coordinates,
+    its tkinter-style options and its stacking position.
+
+    Text, image and window items can also carry a measured bounding box, as offsets from their anchor point,
+    for when the real size is known from tkinter rather than estimated.
+    """
+    __slots__ = ("id", "kind", "coords", "options", "z", "measured")
+
+    def __init__(self, item_id, kind, coords, options, z):
+        self.id = item_id
+        self.kind = kind
+        self.coords = coords
+        self.options = options
+        self.z = z
+        self.measured = None
+        self.normalize()
+
+    def normalize(self):
+        """
+        Puts the top-left corner of a rectangle or oval first, the way tkinter stores them.
+        """
+        if self.kind in ("rectangle", "oval") and len(self.coords) == 4:
+            x1, y1, x2, y2 = self.coords
+            self.coords = [min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)]
+
+    @property
+    def tags(self):
+        tags = self.options.get("tags", ())
+        if isinstance(tags, str):
+            return tuple(tags.split())
+        return tuple(tags)
+
+    @property
+    def hidden(self):
+        return self.options.get("state") == "hidden"
+
+    def text_size(self):
+        """
+        Returns the approximate (width, height) of a text item, since there are no font metrics without a display.
+        """
+        font = self.options.get("font", ("Arial", 12))
+        return _headless_text_size(self.options.get("text", ""), font[1] if len(font) > 1 else 12)
+
+    def extent(self):
+        """
+        Returns the geometric (x1, y1, x2, y2) extent of the item, before any outline is added.
+        """
+        coords = self.coords
+        if self.measured is not None:
+            x1, y1, x2, y2 = self.measured
+            return coords[0] + x1, coords[1] + y1, coords[0] + x2, coords[1] + y2
+        if self.kind in ("text", "image", "window"):
+            if self.kind == "text":
+                width, height = self.text_size()
+            else:
+                width = float(self.options.get("width", 0))
+                height = float(self.options.get("height", 0))
+            offset_x, offset_y = _ANCHOR_OFFSETS[self.options.get("anchor", "center")]
+            x1 = coords[0] + offset_x * width
+            y1 = coords[1] + offset_y * height
+            return x1, y1, x1 + width, y1 + height
+        xs = coords[0::2]
+        ys = coords[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def outline_width(self):
+        """
+        Returns the width of the item's outline, or 0 if it is not outlined.
+        """
+        if self.kind == "line":
+            return float(self.options.get("width", 1))
+        if self.kind in ("rectangle", "oval", "polygon") and self.options.get("outline"):
+            return float(self.options.get("width", 1))
+        return 0
+
+    def bounds(self):
+        """
+        Returns the (x1, y1, x2, y2) area covered by the item, including half of its outline.
+        """
+        x1, y1, x2, y2 = self.extent()
+        halo = self.outline_width() / 2
+        return x1 - halo, y1 - halo, x2 + halo, y2 + halo
+
+    def bbox(self):
+        """
+        Returns the integer bounding box of the item, padded the same way tkinter pads outlined items.
+        """
+        x1, y1, x2, y2 = self.extent()
+        if self.measured is not None:
+            return _round_half_away(x1), _round_half_away(y1), _round_half_away(x2), _round_half_away(y2)
+        width = self.outline_width()
+        bloat = int(width + 1) // 2 if width else 0
+        if self.kind in ("line", "polygon"):
+            # tkinter adds an extra pixel of fudge factor around lines and polygons
+            bloat += 1
+        # tkinter always draws rectangles and ovals at least 1x1 in size
+        x2 = max(x2, x1 + 1)
+        y2 = max(y2, y1 + 1)
+        return (_round_half_away(x1) - bloat, _round_half_away(y1) - bloat,
+                _round_half_away(x2) + bloat, _round_half_away(y2) + bloat)
+
+
+def _round_half_away(value):
+    """
+    Rounds to the nearest integer, with halves rounded away from zero, the same way tkinter rounds coordinates.
+    """
+    return int(value + 0.5) if value >= 0 else int(value - 0.5)
+
+
+class _SpatialHash:
+    """
+    A uniform grid over the canvas, mapping each grid cell to the items whose bounds touch it, so that the
+    items near a point or small rectangle can be found without looking at every item on the canvas.
+    """
+
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}         # (column, row) -> {item id: item}
+        self.ranges = {}        # item id -> (first column, first row, last column, last row)
+        self.bounds = {}        # item id -> (x1, y1, x2, y2) bounds when the item was filed
+
+    def __range(self, x1, y1, x2, y2):
+        size = self.cell_size
+        return int(x1 // size), int(y1 // size), int(x2 // size), int(y2 // size)
+
+    def insert(self, item):
+        bounds = item.bounds()
+        cell_range = self.__range(*bounds)
+        self.bounds[item.id] = bounds
+        self.ranges[item.id] = cell_range
+        col1, row1, col2, row2 = cell_range
+        cells = self.cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                cell = cells.get((col, row))
+                if cell is None:
+                    cells[(col, row)] = {item.id: item}
+                else:
+                    cell[item.id] = item
+
+    def remove(self, item):
+        cell_range = self.ranges.pop(item.id, None)
+        if cell_range is None:
+            return
+        del self.bounds[item.id]
+        col1, row1, col2, row2 = cell_range
+        cells = self.cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                cell = cells[(col, row)]
+                del cell[item.id]
+                if not cell:
+                    del cells[(col, row)]
+
+    def update(self, item):
+        """
+        Re-files an item after its bounds change.  Does nothing if it still touches the same cells.
+        """
+        bounds = item.bounds()
+        if self.ranges.get(item.id) != self.__range(*bounds):
+            self.remove(item)
+            self.insert(item)
+        else:
+            self.bounds[item.id] = bounds
+
+    def query(self, x1, y1, x2, y2):
+        """
+        Returns the items whose bounds touch the given rectangle, in no particular order.
+        """
+        col1, row1, col2, row2 = self.__range(x1, y1, x2, y2)
+        if (col2 - col1 + 1) * (row2 - row1 + 1) > len(self.ranges):
+            # The rectangle covers more cells than there are items, so checking every item is cheaper
+            candidates = {}
+            for cell in self.cells.values():
+                candidates.update(cell)
+        elif col1 == col2 and row1 == row2:
+            candidates = self.cells.get((col1, row1), {})
+        else:
+            candidates = {}
+            cells = self.cells
+            for col in range(col1, col2 + 1):
+                for row in range(row1, row2 + 1):
+                    cell = cells.get((col, row))
+                    if cell:
+                        candidates.update(cell)
+        bounds = self.bounds
+        found = []
+        for item_id, item in candidates.items():
+            left, top, right, bottom = bounds[item_id]
+            if left <= x2 and right >= x1 and top <= y2 and bottom >= y1:
+                found.append(item)
+        return found
+
+    def clear(self):
+        self.cells.clear()
+        self.ranges.clear()
+        self.bounds.clear()
+
+
+def _check_group_name(name):
+    """
+    Raises a ValueError if name cannot be used as a group name: tkinter would read a number as an object id,
+    spaces as several tags, and "all" and "current" already have a meaning.
+    """
+    if not isinstance(name, str) or not name or name.isdigit() or name in ("all", "current") \
+            or any(c.isspace() for c in name):
+        raise ValueError("{!r} cannot be used as a group name".format(name))
+
+
+class _Scene:
+    """
+    A pure-Python model of the contents of a canvas: the items on it, their geometry and options, and their
+    stacking order.  Item ids are handed out the same way tkinter does, starting at 1 and never reused.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.index = _SpatialHash()
+        self._next_id = 1
+        self._top_z = 0
+        self._bottom_z = 0
+        # Groups whose `group` block is running, which every new item is tagged with
+        self.group_tags = []
+        # Ids of the items added, changed or removed since a frame was last drawn, or None when nothing draws
+        # frames of the scene
+        self.changed = None
+
+    def add(self, kind, coords, options, item_id=None, measured=None):
+        """
+        Adds a new item on top of all other items and returns its id.  The id is normally handed out by the
+        scene, but can be given when the scene is shadowing a real tkinter canvas.
+        """
+        if self.group_tags:
+            options = dict(options, tags=self.with_group_tags(options.get("tags")))
+        if item_id is None:
+            item_id = self._next_id
+        self._next_id = max(self._next_id, item_id + 1)
+        self._top_z += 1
+        item = _SceneItem(item_id, kind, [float(c) for c in coords], options, self._top_z)
+        item.measured = measured
+        self.items[item_id] = item
+        self.index.insert(item)
+        if self.changed is not None:
+            self.changed.add(item_id)
+        return item_id
+
+    @property
+    def next_id(self):
+        """
+        The id the next item added will get.
+        """
+        return self._next_id
+
+    def find(self, obj):
+        """
+        Returns the list of items referenced by obj, which may be an item id, the string of an id, a tag or 'all'.
+        Items are returned in stacking order, lowest first.
+        """
+        if isinstance(obj, _SceneItem):
+            return [obj]
+        if isinstance(obj, str) and not obj.isdigit():
+            if obj == "all":
+                found = list(self.items.values())
+            else:
+                found = [item for item in self.items.values() if obj in item.tags]
+            found.sort(key=lambda item: item.z)
+            return found
+        item = self.items.get(int(obj))
+        return [item] if item is not None else []
+
+    def with_group_tags(self, tags):
+        """
+        Returns the given tags (a string or sequence, or None) with the tags of the running groups added.
+        """
+        if tags is None:
+            tags = ()
+        elif isinstance(tags, str):
+            tags = tags.split()
+        tags = tuple(tags)
+        return tags + tuple(tag for tag in self.group_tags if tag not in tags)
+
+    def add_tag(self, obj, tag):
+        for item in self.find(obj):
+            if tag not in item.tags:
+                item.options["tags"] = item.tags + (tag,)
+
+    def remove_tag(self, obj, tag):
+        for item in self.find(obj):
+            item.options["tags"] = tuple(t for t in item.tags if t != tag)
+
+    def first(self, obj):
+        """
+        Returns the lowest item referenced by obj, or None if there is no such item.
+        """
+        found = self.find(obj)
+        return found[0] if found else None
+
+    def move(self, obj, dx, dy):
+        changed = self.changed
+        for item in self.find(obj):
+            coords = item.coords
+            for i in range(0, len(coords), 2):
+                coords[i] += dx
+                coords[i + 1] += dy
+            self.index.update(item)
+            if changed is not None:
+                changed.add(item.id)
+
+    def scale(self, obj, x_origin, y_origin, x_scale, y_scale):
+        """
+        Scales the coordinates of every item referenced by obj about the given origin, the way tkinter's scale
+        does, and returns the items.
+        """
+        found = self.find(obj)
+        for item in found:
+            coords = item.coords
+            for i in range(0, len(coords), 2):
+                coords[i] = x_origin + (coords[i] - x_origin) * x_scale
+                coords[i + 1] = y_origin + (coords[i + 1] - y_origin) * y_scale
+            item.normalize()
+            self.index.update(item)
+            if self.changed is not None:
+                self.changed.add(item.id)
+        return found
+
+    def search(self, spec):
+        """
+        Returns the items a tkinter search spec (as taken by addtag and find) refers to: ("all",),
+        ("withtag", obj), ("above", obj), ("below", obj), ("enclosed", x1, y1, x2, y2) or
+        ("overlapping", x1, y1, x2, y2).  Returns None for ("closest", ...), which needs tkinter.
+        """
+        kind = spec[0]
+        if kind == "all":
+            return self.find("all")
+        if kind == "withtag":
+            return self.find(spec[1])
+        if kind in ("above", "below"):
+            found = self.find(spec[1])
+            if not found:
+                return []
+            ordered = sorted(self.items.values(), key=lambda item: item.z)
+            if kind == "above":
+                index = ordered.index(found[-1]) + 1
+                return ordered[index:index + 1]
+            index = ordered.index(found[0])
+            return ordered[index - 1:index] if index > 0 else []
+        if kind in ("enclosed", "overlapping"):
+            x1, y1, x2, y2 = (float(value) for value in spec[1:5])
+            if kind == "overlapping":
+                return [self.items[item_id] for item_id in self.overlapping(x1, y1, x2, y2)]
+            x1, x2 = min(x1, x2), max(x1, x2)
+            y1, y2 = min(y1, y2), max(y1, y2)
+            found = []
+            for item in self.index.query(x1, y1, x2, y2):
+                left, top, right, bottom = item.bounds()
+                if not item.hidden and x1 <= left and right <= x2 and y1 <= top and bottom <= y2:
+                    found.append(item)
+            found.sort(key=lambda item: item.z)
+            return found
+        return None
+
+    def set_coords(self, obj, coords):
+        for item in self.find(obj):
+            item.coords = [float(c) for c in coords]
+            item.normalize()
+            self.index.update(item)
+            if self.changed is not None:
+                self.changed.add(item.id)
+
+    def configure(self, obj, options, measured=None):
+        """
+        Updates the options of every item referenced by obj, re-filing them in the index if their size changed.
+        """
+        for item in self.find(obj):
+            item.options.update(options)
+            if measured is not None:
+                item.measured = measured
+            if measured is not None or not _UNSIZED_OPTIONS.issuperset(options):
+                self.index.update(item)
+            if self.changed is not None:
+                self.changed.add(item.id)
+
+    def remove(self, obj):
+        """
+        Removes every item referenced by obj, and returns the removed items.
+        """
+        found = self.find(obj)
+        for item in found:
+            del self.items[item.id]
+            self.index.remove(item)
+            if self.changed is not None:
+                self.changed.add(item.id)
+        return found
+
+    def clear(self):
+        if self.changed is not None:
+            self.changed.update(self.items)
+        self.items.clear()
+        self.index.clear()
+
+    def overlapping(self, x1, y1, x2, y2):
+        """
+        Returns the ids of the visible items whose bounds touch the given rectangle, in stacking order.
+        """
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+        found = [item for item in self.index.query(x1, y1, x2, y2) if not item.hidden]
+        found.sort(key=lambda item: item.z)
+        return tuple(item.id for item in found)
+
+    def colliding(self, obj):
+        """
+        Returns the ids of the visible items whose shapes touch the shape of the lowest item referenced by obj,
+        in stacking order.  The grid finds the items whose bounds touch, and only those are tested exactly.
+        """
+        target = self.first(obj)
+        if target is None:
+            return ()
+        shape = _collision_shape(target)
+        found = [item for item in self.index.query(*target.bounds())
+                 if item is not target and not item.hidden and _shapes_collide(shape, _collision_shape(item))]
+        found.sort(key=lambda item: item.z)
+        return tuple(item.id for item in found)
+
+    def raise_above(self, obj, above=None):
+        """
+        Moves the items referenced by obj directly above the topmost item referenced by above, or to the very
+        top if above is None or 'all'.
+        """
+        moving = self.find(obj)
+        self._restacked(moving)
+        if above is None or above == "all":
+            for item in moving:
+                self._top_z += 1
+                item.z = self._top_z
+            return
+        targets = self.find(above)
+        if targets:
+            self._restack(moving, targets[-1], after=True)
+
+    def lower_below(self, obj, below=None):
+        """
+        Moves the items referenced by obj directly below the lowest item referenced by below, or to the very
+        bottom if below is None or 'all'.
+        """
+        moving = self.find(obj)
+        self._restacked(moving)
+        if below is None or below == "all":
+            for item in reversed(moving):
+                self._bottom_z -= 1
+                item.z = self._bottom_z
+            return
+        targets = self.find(below)
+        if targets:
+            self._restack(moving, targets[0], after=False)
+
+    def _restacked(self, moving):
+        """
+        Notes that the moving items are changing place in the stacking order.  The other items keep their order
+        relative to each other, so only the moving items need to be drawn again.
+        """
+        if self.changed is not None:
+            self.changed.update(item.id for item in moving)
+
+    def _restack(self, moving, target, after):
+        """
+        Renumbers the stacking order so that the moving items sit directly next to the target item.
+        """
+        if target in moving:
+            return
+        ordered = [item for item in sorted(self.items.values(), key=lambda item: item.z) if item not in moving]
+        index = ordered.index(target) + (1 if after else 0)
+        ordered[index:index] = moving
+        for z, item in enumerate(ordered, start=1):
+            item.z = z
+        self._bottom_z = 0
+        self._top_z = len(ordered)
+
+    def stacking_order(self):
+        """
+        Returns the ids of all items in stacking order, lowest first.
+        """
+        return tuple(item.id for item in sorted(self.items.values(), key=lambda item: item.z))
+
+
+""" COLLISIONS """
+
+# Number of corners of the polygon used in place of an ellipse when testing it against another (non-circular)
+# ellipse, which has no simple exact test
+ELLIPSE_SEGMENTS = 32
+
+
+def _circle_hits_box(cx, cy, radius, x1, y1, x2, y2):
+    """
+    Returns whether the circle touches the axis-aligned box.
+    """
+    dx = cx - min(max(cx, x1), x2)
+    dy = cy - min(max(cy, y1), y2)
+    return dx * dx + dy * dy <= radius * radius
+
+
+def _circles_hit(ax, ay, a_radius, bx, by, b_radius):
+    """
+    Returns whether the two circles touch.
+    """
+    reach = a_radius + b_radius
+    return (ax - bx) ** 2 + (ay - by) ** 2 <= reach * reach
+
+
+def _point_in_polygon(x, y, points):
+    """
+    Returns whether the point is inside the polygon with the given (x, y) corners, by the even-odd rule.
+    """
+    inside = False
+    ax, ay = points[-1]
+    for bx, by in points:
+        if (ay > y) != (by > y) and x < ax + (y - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+        ax, ay = bx, by
+    return inside
+
+
+def _segment_hits_box(ax, ay, bx, by, x1, y1, x2, y2):
+    """
+    Returns whether the segment from (ax, ay) to (bx, by) touches the axis-aligned box, by clipping the segment
+    to the box one side at a time.
+    """
+    start, end = 0.0, 1.0
+    for delta, low, high in ((bx - ax, x1 - ax, x2 - ax), (by - ay, y1 - ay, y2 - ay)):
+        if delta == 0:
+            if low > 0 or high < 0:
+                return False
+            continue
+        near, far = low / delta, high / delta
+        if near > far:
+            near, far = far, near
+        start = max(start, near)
+        end = min(end, far)
+        if start > end:
+            return False
+    return True
+
+
+def _point_segment_distance(x, y, ax, ay, bx, by):
+    """
+    Returns the distance from the point to the nearest point of the segment from (ax, ay) to (bx, by).
+    """
+    dx = bx - ax
+    dy = by - ay
+    length_squared = dx * dx + dy * dy
+    if length_squared == 0:
+        return math.hypot(x - ax, y - ay)
+    t = min(max(((x - ax) * dx + (y - ay) * dy) / length_squared, 0), 1)
+    return math.hypot(x - ax - t * dx, y - ay - t * dy)
+
+
+def _segments_distance(ax, ay, bx, by, cx, cy, dx, dy):
+    """
+    Returns the distance between the segment from (ax, ay) to (bx, by) and the one from (cx, cy) to (dx, dy),
+    which is 0 if they cross.
+    """
+    def side(px, py, qx, qy, rx, ry):
+        return (qx - px) * (ry - py) - (qy - py) * (rx - px)
+
+    if (side(ax, ay, bx, by, cx, cy) > 0) != (side(ax, ay, bx, by, dx, dy) > 0) and \
+            (side(cx, cy, dx, dy, ax, ay) > 0) != (side(cx, cy, dx, dy, bx, by) > 0):
+        return 0
+    return min(_point_segment_distance(ax, ay, cx, cy, dx, dy), _point_segment_distance(bx, by, cx, cy, dx, dy),
+               _point_segment_distance(cx, cy, ax, ay, bx, by), _point_segment_distance(dx, dy, ax, ay, bx, by))
+
+
+def _edges(points, closed=True):
+    """
+    Returns the (ax, ay, bx, by) edges between consecutive points, including the closing edge if closed.
+    """
+    edges = [(ax, ay, bx, by) for (ax, ay), (bx, by) in zip(points, points[1:])]
+    if closed and len(points) > 2:
+        edges.append(points[-1] + points[0])
+    return edges
+
+
+def _circle_hits_polygon(cx, cy, radius, points):
+    return _point_in_polygon(cx, cy, points) or \
+        any(_point_segment_distance(cx, cy, *edge) <= radius for edge in _edges(points))
+
+
+def _polygon_hits_box(points, x1, y1, x2, y2):
+    x, y = points[0]
+    return (x1 <= x <= x2 and y1 <= y <= y2) or _point_in_polygon(x1, y1, points) or \
+        any(_segment_hits_box(*edge, x1, y1, x2, y2) for edge in _edges(points))
+
+
+def _path_hits_box(points, half, x1, y1, x2, y2):
+    """
+    Returns whether a line through the points, half as wide as given, touches the box.  The line reaches the
+    box if it touches the box widened sideways or lengthwise by half, or passes within half of a corner.
+    """
+    edges = _edges(points, closed=False) or [points[0] * 2]
+    corners = ((x1, y1), (x2, y1), (x1, y2), (x2, y2))
+    return any(_segment_hits_box(*edge, x1 - half, y1, x2 + half, y2) or
+               _segment_hits_box(*edge, x1, y1 - half, x2, y2 + half) or
+               any(_point_segment_distance(x, y, *edge) <= half for x, y in corners)
+               for edge in edges)
+
+
+# Shape kinds in the order `_shapes_collide` expects them, so each pair of kinds only needs one test
+_BOX, _ELLIPSE, _POLYGON, _PATH = range(4)
+
+
+def _collision_shape(item):
+    """
+    Returns the exact shape of an item, as one of:
+        (_BOX, (x1, y1, x2, y2)) for rectangles, text, images and windows
+        (_ELLIPSE, (center x, center y, x radius, y radius)) for ovals
+        (_POLYGON, [(x, y), ...]) for polygons
+        (_PATH, ([(x, y), ...], half the line width)) for lines
+    Outlines are included, except for polygons, whose outline is thin compared to their size.
+    """
+    kind = item.kind
+    if kind == "line":
+        coords = item.coords
+        return _PATH, (list(zip(coords[0::2], coords[1::2])), item.outline_width() / 2)
+    if kind == "polygon" and len(item.coords) >= 6:
+        coords = item.coords
+        return _POLYGON, list(zip(coords[0::2], coords[1::2]))
+    x1, y1, x2, y2 = item.bounds()
+    if kind == "oval" and x2 > x1 and y2 > y1:
+        return _ELLIPSE, ((x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2, (y2 - y1) / 2)
+    return _BOX, (x1, y1, x2, y2)
+
+
+def _shapes_collide(a, b):
+    """
+    Returns whether two shapes returned by `_collision_shape` touch.  Ellipses are tested by scaling the plane
+    so that they become unit circles, which keeps boxes as boxes and polygons as polygons.
+    """
+    if a[0] > b[0]:
+        a, b = b, a
+    a_kind, a_shape = a
+    b_kind, b_shape = b
+    if a_kind == _BOX:
+        x1, y1, x2, y2 = a_shape
+        if b_kind == _BOX:
+            return x1 <= b_shape[2] and b_shape[0] <= x2 and y1 <= b_shape[3] and b_shape[1] <= y2
+        if b_kind == _ELLIPSE:
+            cx, cy, rx, ry = b_shape
+            return _circle_hits_box(cx / rx, cy / ry, 1, x1 / rx, y1 / ry, x2 / rx, y2 / ry)
+        if b_kind == _POLYGON:
+            return _polygon_hits_box(b_shape, x1, y1, x2, y2)
+        return _path_hits_box(*b_shape, x1, y1, x2, y2)
+
+    if a_kind == _ELLIPSE:
+        cx, cy, rx, ry = a_shape
+        if b_kind == _ELLIPSE:
+            bx, by, b_rx, b_ry = b_shape
+            if rx == ry and b_rx == b_ry:
+                return _circles_hit(cx, cy, rx, bx, by, b_rx)
+            steps = [2 * math.pi * i / ELLIPSE_SEGMENTS for i in range(ELLIPSE_SEGMENTS)]
+            points = [((bx + b_rx * math.cos(t)) / rx, (by + b_ry * math.sin(t)) / ry) for t in steps]
+            return _circle_hits_polygon(cx / rx, cy / ry, 1, points)
+        if b_kind == _POLYGON:
+            return _circle_hits_polygon(cx / rx, cy / ry, 1, [(x / rx, y / ry) for x, y in b_shape])
+        points, half = b_shape
+        rx += half
+        ry += half
+        points = [(x / rx, y / ry) for x, y in points]
+        if len(points) == 1:
+            return _circles_hit(cx / rx, cy / ry, 1, points[0][0], points[0][1], 0)
+        return any(_point_segment_distance(cx / rx, cy / ry, *edge) <= 1 for edge in _edges(points, closed=False))
+
+    if a_kind == _POLYGON:
+        if b_kind == _POLYGON:
+            return _point_in_polygon(*a_shape[0], b_shape) or _point_in_polygon(*b_shape[0], a_shape) or \
+                any(_segments_distance(*edge, *other) == 0 for edge in _edges(a_shape) for other in _edges(b_shape))
+        points, half = b_shape
+        return _point_in_polygon(*points[0], a_shape) or \
+            any(_segments_distance(*edge, *other) <= half
+                for edge in _edges(points, closed=False) for other in _edges(a_shape))
+
+    a_points, a_half = a_shape
+    b_points, b_half = b_shape
+    reach = a_half + b_half
+    a_edges = _edges(a_points, closed=False) or [a_points[0] * 2]
+    b_edges = _edges(b_points, closed=False) or [b_points[0] * 2]
+    return any(_segments_distance(*edge, *other) <= reach for edge in a_edges for other in b_edges)
+
+
+""" POOLS """
+
+
+class _ItemPool:
+    """
+    Same-sized shapes that are hidden when released and shown again when acquired, instead of being deleted and
+    created.  Works through the public canvas functions, so it works on any canvas.
+    """
+
+    def __init__(self, canvas, kind, fill, width, height, outline=None):
+        if kind == "rectangle":
+            self.create = canvas.create_rectangle
+        elif kind == "oval":
+            self.create = canvas.create_oval
+        else:
+            raise ValueError("Can only pool 'rectangle' or 'oval' objects, not {!r}".format(kind))
+        self.canvas = canvas
+        self.kind = kind
+        self.fill = fill
+        self.width = width
+        self.height = height
+        self.outline = outline
+        self.free = []
+        self.in_use = set()
+        self.fills = {}
+        self.created = 0
+        self.reused = 0
+        self.high_water = 0
+
+    def acquire(self, x, y, fill=None):
+        """
+        Shows a shape with its upper-left corner at (x, y), reusing a released one if there is one, and returns it.
+
+        Args:
+            x: the x coordinate of the shape's upper-left corner
+            y: the y coordinate of the shape's upper-left corner
+            fill: the fill color of the shape, if not the pool's fill color
+        """
+        if fill is None:
+            fill = self.fill
+        if self.free:
+            obj = self.free.pop()
+            self.canvas.moveto(obj, x, y)
+            if self.fills[obj] != fill:
+                self.canvas.itemconfig(obj, fill=fill, outline=fill if self.outline is None else self.outline)
+                self.fills[obj] = fill
+            self.canvas.set_hidden(obj, False)
+            self.reused += 1
+        else:
+            obj = self.create(x, y, x + self.width, y + self.height, fill=fill, outline=self.outline)
+            self.fills[obj] = fill
+            self.created += 1
+        self.in_use.add(obj)
+        self.high_water = max(self.high_water, len(self.in_use))
+        return obj
+
+    def release(self, obj):
+        """
+        Hides a shape returned by acquire, so it can be reused by a later acquire.
+        """
+        self.in_use.remove(obj)
+        self.canvas.set_hidden(obj, True)
+        self.free.append(obj)
+
+    def release_all(self):
+        """
+        Hides every shape in use.
+        """
+        for obj in list(self.in_use):
+            self.release(obj)
+
+    def clear(self):
+        """
+        Deletes every shape the pool has created, in use or not.
+        """
+        for obj in self.free + list(self.in_use):
+            self.canvas.delete(obj)
+        self.free = []
+        self.in_use = set()
+        self.fills = {}
+
+    def stats(self):
+        """
+        Returns a dictionary of how many shapes are in use and free, how many were created and reused, and
+        the most that were ever in use at once (high_water).
+        """
+        return {
+            "in_use": len(self.in_use),
+            "free": len(self.free),
+            "created": self.created,
+            "reused": self.reused,
+            "high_water": self.high_water,
+        }
+
+    def __len__(self):
+        return len(self.in_use)
+
+
+""" BULK CREATION """
+
+
+def _as_rows(values):
+    """
+    Returns a list (or other sequence) of the rows of values, converting NumPy arrays to plain Python numbers.
+    """
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return values
+
+
+def _per_shape(values, count, name):
+    """
+    Returns a list of count values: values repeated if it is a single color (or None), or values itself otherwise.
+    """
+    if values is None or isinstance(values, str):
+        return [values] * count
+    values = list(_as_rows(values))
+    if len(values) != count:
+        raise ValueError("Got {} {} for {} shapes".format(len(values), name, count))
+    return values
+
+
+def _bulk_shapes(coords, fills, outlines):
+    """
+    Checks the arguments of create_rectangles or create_ovals, and returns them as lists of one entry per shape.
+    """
+    rows = _as_rows(coords)
+    for row in rows:
+        if len(row) != 4:
+            raise ValueError("Each row of coords must be [x1, y1, x2, y2], not {!r}".format(row))
+    return rows, _per_shape(fills, len(rows), "fills"), _per_shape(outlines, len(rows), "outlines")
+
+
+def _bulk_ids(coords, ids):
+    """
+    Returns the ids of shapes created by create_rectangles or create_ovals, as a NumPy array if coords was one.
+    """
+    if type(coords).__module__ == "numpy":
+        import numpy
+        return numpy.array(ids, dtype=numpy.int64)
+    return ids
+
+
+""" ASYNCIO """
+
+
+class _AsyncBridge:
+    """
+    An asyncio task that runs one frame of a canvas (with step) every delay seconds, and then wakes up the
+    coroutines waiting for a frame, a mouse click or a key press.  Clicks and key presses are taken from the
+    canvas's queues, so they are never handed out twice.  The task stops once nothing is waiting, and is started
+    again by the next `wait`.
+    """
+
+    def __init__(self, canvas, step, delay, clock):
+        import asyncio
+        self.canvas = canvas
+        self.step = step
+        self.delay = delay
+        self.clock = clock
+        self.frames = 0
+        self.frame_waiters = collections.deque()
+        self.click_waiters = collections.deque()
+        self.key_waiters = collections.deque()
+        self.loop = asyncio.get_running_loop()
+        self.task = None
+
+    def running(self, loop):
+        return self.loop is loop
+
+    def wait(self, waiters):
+        """
+        Returns a future, added to the given waiters, that the pump will resolve.  Starts the pump if it has
+        stopped.
+        """
+        future = self.loop.create_future()
+        waiters.append(future)
+        if self.task is None or self.task.done():
+            self.task = self.loop.create_task(self.__pump())
+        return future
+
+    def drain_events(self):
+        """
+        Removes and returns all the queued mouse clicks, key presses and button clicks, oldest first.
+        """
+        events = self.canvas.get_new_mouse_clicks() + self.canvas.get_new_key_presses()
+        events.sort(key=lambda event: event.time)
+        now = self.clock()
+        events.extend(_InputEvent(now, "button", title=title) for title in self.canvas.get_new_button_clicks())
+        return events
+
+    async def __pump(self):
+        import asyncio
+        while True:
+            try:
+                self.step()
+            except Exception as error:
+                # e.g. the window was closed: nobody waiting will ever get what they are waiting for, so they get
+                # the error instead, and the pump stops without raising it again
+                for waiters in (self.frame_waiters, self.click_waiters, self.key_waiters):
+                    while waiters:
+                        waiter = waiters.popleft()
+                        if not waiter.done():
+                            waiter.set_exception(error)
+                return
+            self.frames += 1
+            self.__wake(self.click_waiters, self.canvas.mouse_presses)
+            self.__wake(self.key_waiters, self.canvas.key_presses)
+            waiters, self.frame_waiters = self.frame_waiters, collections.deque()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(self.frames)
+            # Sleeping before looking for waiters gives the coroutines just woken a chance to wait again
+            await asyncio.sleep(self.delay)
+            if not self.__waiting():
+                return
+
+    def __waiting(self):
+        """
+        Returns whether any coroutine is still waiting, forgetting the ones that gave up (e.g. timed out).
+        """
+        for waiters in (self.frame_waiters, self.click_waiters, self.key_waiters):
+            remaining = [waiter for waiter in waiters if not waiter.done()]
+            waiters.clear()
+            waiters.extend(remaining)
+        return bool(self.frame_waiters or self.click_waiters or self.key_waiters)
+
+    @staticmethod
+    def __wake(waiters, queue):
+        while waiters and queue:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(queue.entries.popleft())
+
+
+""" THREADING """
+
+
+class _CommandFuture:
+    """
+    The result of a canvas call made through a `ThreadedCanvas`, which becomes available once the Tk thread
+    has run the call.  Asking for the result tells the Tk thread to run waiting calls straight away, instead of
+    at the next frame.
+    """
+
+    def __init__(self, hurry):
+        self._hurry = hurry
+        self._ready = threading.Event()
+        self._value = None
+        self._error = None
+
+    def done(self):
+        """
+        Returns whether the call has run.
+        """
+        return self._ready.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the call to run and returns what it returned, or raises what it raised.
+
+        Args:
+            timeout: the most seconds to wait.  Raises a TimeoutError if the call has not run by then.
+        """
+        if not self._ready.is_set():
+            self._hurry.set()
+            if not self._ready.wait(timeout):
+                raise TimeoutError("The canvas call has not run yet")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def exception(self, timeout=None):
+        """
+        Waits for the call to run and returns what it raised, or None.
+        """
+        try:
+            self.result(timeout)
+        except TimeoutError:
+            raise
+        except Exception as error:
+            return error
+        return None
+
+    def _finish(self, value=None, error=None):
+        self._value = value
+        self._error = error
+        self._ready.set()
+
+
+# Canvas functions that only change the canvas, so running them inside a batch makes no difference to their result
+_DRAWING_CALLS = frozenset({
+    "itemconfigure", "itemconfig", "tag_raise", "tag_lower", "move_to", "moveto", "move", "delete", "clear",
+    "restore", "set_fill_color", "set_color", "set_outline_color", "set_fill", "set_hidden", "set_text",
+    "change_text", "set_font", "create_line", "create_rectangle", "create_oval", "create_rectangles",
+    "create_ovals", "create_polygon", "create_text", "create_image", "create_image_with_size", "create_sprite",
+    "set_sprite_frame", "add_to_group", "remove_from_group", "group_move", "group_set_color", "group_hide",
+    "group_delete", "raise_to_front", "raise_in_front_of", "lower_to_back", "lower_behind",
+})
+
+# Canvas functions answered from the shadow scene or the input queues rather than by tkinter, so they see changes
+# still waiting in a batch.  They do ask tkinter when check_geometry is on.
+_SCENE_CALLS = frozenset({
+    "get_left_x", "get_top_y", "get_obj_width", "get_obj_height", "coords", "find_overlapping", "find_colliding",
+    "get_group", "snapshot", "get_new_mouse_clicks", "get_last_click", "get_new_key_presses",
+    "get_last_key_press", "get_new_button_clicks", "is_key_down",
+})
+
+
+class ThreadedCanvas:
+    """
+    Lets game logic run on a separate thread from the window, so slow computations (a solver, path finding)
+    don't freeze drawing and input.  tkinter may only be used from the thread that created the window, so every
+    canvas function called on a ThreadedCanvas is queued, and run by the window's thread in one batch per frame.
+    Each call immediately returns a future: call .result() on it to wait for the answer, e.g.
+    `x = threaded.get_left_x(ball).result()`.  The future of a create function can be passed straight to
+    other functions in place of the object it will create, without waiting.
+
+        canvas = Canvas(400, 400)
+        threaded = ThreadedCanvas(canvas)
+        threaded.run(play_game, threaded)     # play_game runs on its own thread, and draws through threaded
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.commands = collections.deque()
+        self.hurry = threading.Event()
+        # Set by the Tk thread when a mouse press is waiting to be collected, to wake up wait_for_click
+        self.clicked = threading.Event()
+        self.tk_thread = threading.current_thread()
+
+    def run(self, worker, *args):
+        """
+        Calls worker(*args) on a new thread, and runs its canvas calls on this thread until it returns.
 
         Returns:
-            the graphical image object that is displaying the specified image at the specified location.
+            what worker returned.  If worker raised an exception, it is raised here.
+        """
+        outcome = {}
+        thread = threading.Thread(target=self.__work, args=(worker, args, outcome), daemon=True)
+        thread.start()
+        next_frame = time.perf_counter()
+        while True:
+            finished = not thread.is_alive()
+            self.__run_commands()
+            now = time.perf_counter()
+            if now >= next_frame:
+                self.canvas.update()
+                next_frame = now + Canvas.FRAME_INTERVAL
+                if self.canvas.mouse_presses:
+                    self.clicked.set()
+            if finished and not self.commands:
+                break
+            self.hurry.wait(max(0, next_frame - time.perf_counter()))
+            self.hurry.clear()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("value")
+
+    def call(self, func, *args, **kwargs):
+        """
+        Queues func(*args, **kwargs) to run on the window's thread, and returns a future of its result.  Any
+        future in the arguments is replaced by its result first.
+        """
+        future = _CommandFuture(self.hurry)
+        if threading.current_thread() is self.tk_thread:
+            self.__run(func, args, kwargs, future)
+        else:
+            self.commands.append((func, args, kwargs, future))
+        return future
+
+    def wait_for_click(self):
+        """
+        Same as `Canvas.wait_for_click`, but waits on the calling thread, so the window keeps running.  The
+        calling thread sleeps until the window's thread sees a click.
+
+        Returns:
+            the [x, y] location of the click.
+        """
+        self.call(self.canvas.get_new_mouse_clicks)
+        while True:
+            # Cleared before looking, so a click that arrives after looking still ends the wait below
+            self.clicked.clear()
+            clicks = self.call(self.canvas.get_new_mouse_clicks).result()
+            if clicks:
+                location = [clicks[0].x, clicks[0].y]
+                self.call(setattr, self.canvas, "last_click", location)
+                return location
+            self.clicked.wait()
+
+    def sleep(self, seconds):
+        """
+        Same as `Canvas.sleep`, but sleeps on the calling thread, so the window keeps running.
+        """
+        replay = self.canvas._replay
+        if replay is None or not replay.skip_sleep:
+            time.sleep(seconds)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Does nothing, since calls on a ThreadedCanvas are always sent in batches.
+        """
+        yield
+
+    def __getattr__(self, name):
+        attribute = getattr(self.canvas, name)
+        if not callable(attribute):
+            return attribute
+        return lambda *args, **kwargs: self.call(attribute, *args, **kwargs)
+
+    def __work(self, worker, args, outcome):
+        try:
+            outcome["value"] = worker(*args)
+        except BaseException as error:
+            outcome["error"] = error
+        finally:
+            self.hurry.set()
+
+    def __run_commands(self):
+        """
+        Runs the queued calls, batching runs of calls that can be batched.  A call that asks tkinter about the
+        canvas first sends the batch so far, since inside a batch tkinter still sees the canvas as it was before.
+        """
+        batched = _DRAWING_CALLS if getattr(self.canvas, "check_geometry", False) else _DRAWING_CALLS | _SCENE_CALLS
+        with contextlib.ExitStack() as batch:
+            in_batch = False
+            while self.commands:
+                func, args, kwargs, future = self.commands.popleft()
+                if getattr(func, "__name__", None) in batched:
+                    if not in_batch:
+                        batch.enter_context(self.canvas.batch())
+                        in_batch = True
+                elif in_batch:
+                    batch.close()
+                    in_batch = False
+                self.__run(func, args, kwargs, future)
+
+    @staticmethod
+    def __run(func, args, kwargs, future):
+        try:
+            args = [arg.result() if isinstance(arg, _CommandFuture) else arg for arg in args]
+            kwargs = {key: value.result() if isinstance(value, _CommandFuture) else value
+                      for key, value in kwargs.items()}
+            future._finish(func(*args, **kwargs))
+        except Exception as error:
+            future._finish(error=error)
+
+
+""" GAME LOOP """
+
+
+class _FrameLoop:
+    """
+    Calls a tick function at a fixed rate using canvas timers.  Time is accumulated between timer callbacks and
+    spent in fixed steps, so the tick rate does not drift by however long each tick took.  When the program
+    falls behind, at most max_catchup ticks are run per callback and the rest are skipped.  An exception raised by
+    tick stops the loop and is kept in error, since tkinter would only print it from inside a timer callback.
+    """
+
+    def __init__(self, canvas, tick, hz, max_catchup, clock, on_stop):
+        self.canvas = canvas
+        self.tick = tick
+        self.period = 1 / hz
+        self.max_catchup = max_catchup
+        self.clock = clock
+        self.on_stop = on_stop
+        self.running = False
+        self.error = None
+        self.timer = None
+        self.accumulator = 0
+        self.last_time = 0
+        self.start_time = 0
+
+        # Timing stats
+        self.ticks = 0
+        self.frames = 0
+        self.skipped_ticks = 0
+        self.last_frame_time = 0
+        self.total_frame_time = 0
+        self.max_frame_time = 0
+
+    def start(self):
+        self.running = True
+        self.start_time = self.last_time = self.clock()
+        self.timer = self.canvas.after(int(math.ceil(self.period * 1000)), self.__frame)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.timer is not None:
+            self.canvas.after_cancel(self.timer)
+            self.timer = None
+        self.on_stop()
+
+    def set_rate(self, hz):
+        self.period = 1 / hz
+
+    def __frame(self):
+        """
+        Timer callback: runs as many ticks as the time elapsed since the last callback pays for, then schedules
+        the next callback for when the next tick is due.
+        """
+        self.timer = None
+        now = self.clock()
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = 0
+        while self.running and self.accumulator >= self.period and steps < self.max_catchup:
+            try:
+                keep_going = self.tick()
+            except BaseException as error:
+                self.error = error
+                self.stop()
+                break
+            if keep_going is False:
+                self.stop()
+            self.accumulator -= self.period
+            steps += 1
+            self.ticks += 1
+        if self.accumulator >= self.period:
+            # Too far behind to catch up: drop the missed ticks rather than running them all in a burst
+            missed = int(self.accumulator // self.period)
+            self.skipped_ticks += missed
+            self.accumulator -= missed * self.period
+
+        frame_time = self.clock() - now
+        self.frames += 1
+        self.last_frame_time = frame_time
+        self.total_frame_time += frame_time
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+
+        if self.running:
+            # Round up, since a timer that fires early would find no tick due and have to be rescheduled
+            delay = max(0, self.period - self.accumulator - frame_time)
+            self.timer = self.canvas.after(int(math.ceil(delay * 1000)), self.__frame)
+
+    def stats(self):
+        elapsed = self.last_time - self.start_time
+        return {
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "skipped_ticks": self.skipped_ticks,
+            "tick_rate": self.ticks / elapsed if elapsed > 0 else 0,
+            "last_frame_ms": self.last_frame_time * 1000,
+            "mean_frame_ms": self.total_frame_time * 1000 / self.frames if self.frames else 0,
+            "max_frame_ms": self.max_frame_time * 1000,
+        }
+
+
+""" ANIMATION """
+
+ANIMATION_HZ = 60
+"""The number of times per second that running animations are advanced."""
+
+
+def _ease_in_out(t):
+    return 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t)
+
+
+def _bounce(t):
+    """
+    Eases out with three smaller and smaller bounces at the end.
+    """
+    if t < 1 / 2.75:
+        return 7.5625 * t * t
+    if t < 2 / 2.75:
+        t -= 1.5 / 2.75
+        return 7.5625 * t * t + 0.75
+    if t < 2.5 / 2.75:
+        t -= 2.25 / 2.75
+        return 7.5625 * t * t + 0.9375
+    t -= 2.625 / 2.75
+    return 7.5625 * t * t + 0.984375
+
+
+# Easing functions by name, each mapping the fraction of the animation's time gone by (0 to 1) to the fraction of
+# the way the animated property has come (0 at the start and 1 at the end)
+_EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": _ease_in_out,
+    "bounce": _bounce,
+}
+
+
+class _Animation:
+    """
+    One animation of one object, which starts at start (in seconds on the animator's clock) and takes duration
+    seconds.  The property animated is read when the animation starts (after any delay), by `begin`, and then set
+    on each tick by `step`, given the eased fraction of the way the animation has come.
+    """
+    __slots__ = ("id", "obj", "start", "duration", "easing", "on_done")
+
+    def begin(self, canvas):
+        pass
+
+    def step(self, canvas, fraction):
+        pass
+
+
+class _MoveAnimation(_Animation):
+    __slots__ = ("x", "y", "start_x", "start_y", "last_x", "last_y")
+
+    def begin(self, canvas):
+        self.start_x = self.last_x = canvas.get_left_x(self.obj)
+        self.start_y = self.last_y = canvas.get_top_y(self.obj)
+
+    def step(self, canvas, fraction):
+        # Moving by the change since the last step, rather than to an absolute position, lets the object also be
+        # moved by the program while it is being animated
+        x = self.start_x + (self.x - self.start_x) * fraction
+        y = self.start_y + (self.y - self.start_y) * fraction
+        if x != self.last_x or y != self.last_y:
+            canvas.move(self.obj, x - self.last_x, y - self.last_y)
+            self.last_x = x
+            self.last_y = y
+
+
+class _ColorAnimation(_Animation):
+    __slots__ = ("option", "color", "parse_color", "start_rgb", "rgb", "last_color")
+
+    def begin(self, canvas):
+        start = canvas.itemcget(self.obj, self.option)
+        self.rgb = self.parse_color(self.color)
+        # Something with no color (e.g. no outline) cannot fade, so it takes the new color straight away
+        self.start_rgb = self.parse_color(start) if start else self.rgb
+        self.last_color = start
+
+    def step(self, canvas, fraction):
+        if fraction >= 1:
+            color = self.color
+        else:
+            # Easings may overshoot, but colors cannot go past either end
+            fraction = min(max(fraction, 0), 1)
+            red, green, blue = self.start_rgb
+            end_red, end_green, end_blue = self.rgb
+            color = "#%02x%02x%02x" % (int(red + (end_red - red) * fraction + 0.5),
+                                       int(green + (end_green - green) * fraction + 0.5),
+                                       int(blue + (end_blue - blue) * fraction + 0.5))
+        # A slow fade keeps the same color for several ticks, which needs no redraw
+        if color != self.last_color:
+            canvas.itemconfig(self.obj, **{self.option: color})
+            self.last_color = color
+
+
+class _VisibilityAnimation(_Animation):
+    __slots__ = ("is_hidden",)
+
+    def step(self, canvas, fraction):
+        if fraction >= 1:
+            canvas.set_hidden(self.obj, self.is_hidden)
+
+
+class _Animator:
+    """
+    Runs every animation of a canvas from one repeating canvas timer, which advances all the animations that have
+    started in a single `batch`, so the canvas is redrawn once per tick however many animations are running.
+    The timer only runs while there are animations.
+    """
+
+    def __init__(self, canvas, clock, parse_color):
+        self.canvas = canvas
+        self.clock = clock
+        self.parse_color = parse_color
+        self.animations = []
+        self.waiting = []       # animations added but not yet begun, because they are still in their delay
+        self.timer = None
+        self.next_id = 1
+
+    def add(self, animation, obj, duration, easing, delay, on_done):
+        """
+        Fills in the common fields of a new animation and starts running it.  Returns its id.
+        """
+        animation.id = self.next_id
+        self.next_id += 1
+        animation.obj = obj
+        animation.start = self.clock() + delay
+        animation.duration = duration
+        animation.easing = _EASINGS[easing] if isinstance(easing, str) else easing
+        animation.on_done = on_done
+        self.waiting.append(animation)
+        if self.timer is None:
+            self.timer = self.canvas.after(int(1000 / ANIMATION_HZ), self.__tick)
+        return animation.id
+
+    def cancel(self, keep):
+        """
+        Stops the animations for which keep returns False, leaving their objects as they are.
+        """
+        self.animations = [animation for animation in self.animations if keep(animation)]
+        self.waiting = [animation for animation in self.waiting if keep(animation)]
+
+    def is_running(self, obj=None):
+        return any(obj is None or animation.obj == obj for animation in self.animations + self.waiting)
+
+    def __tick(self):
+        self.timer = None
+        canvas = self.canvas
+        now = self.clock()
+
+        if self.waiting:
+            started = [animation for animation in self.waiting if animation.start <= now]
+            if started:
+                self.waiting = [animation for animation in self.waiting if animation.start > now]
+                for animation in started:
+                    # An object deleted before its animation started has nothing to animate
+                    if canvas.type(animation.obj) is not None:
+                        animation.begin(canvas)
+                        self.animations.append(animation)
+
+        finished = []
+        with canvas.batch():
+            for animation in self.animations:
+                elapsed = now - animation.start
+                if elapsed >= animation.duration:
+                    animation.step(canvas, 1)
+                    finished.append(animation)
+                else:
+                    animation.step(canvas, animation.easing(elapsed / animation.duration))
+        if finished:
+            finished_ids = {animation.id for animation in finished}
+            self.animations = [animation for animation in self.animations if animation.id not in finished_ids]
+            for animation in finished:
+                if animation.on_done is not None:
+                    animation.on_done()
+
+        if (self.animations or self.waiting) and self.timer is None:
+            self.timer = canvas.after(int(1000 / ANIMATION_HZ), self.__tick)
+
+
+""" HEADLESS BACKEND """
+
+
+class HeadlessCanvas(_CanvasFunctions):
+    """
+    HeadlessCanvas is a drop-in replacement for `Canvas` that keeps the canvas contents in a pure-Python scene
+    instead of a tkinter window, so that programs can be run without a display, e.g. for automated tests or
+    benchmarks.  It supports the same functions as `Canvas`.  Because there is no real mouse or keyboard,
+    input is queued with the `queue_*` functions and delivered the next time `update` is called.
+
+    Timers registered with `after` run on a simulated clock rather than the wall clock, so `mainloop` runs
+    them back to back without waiting.  Animations and `run_loop` run on the same clock, and each `frame` moves
+    it forward by `Canvas.FRAME_INTERVAL` instead of waiting, so coroutines run as fast as they can.  A recording
+    played back with `start_replay` is delivered before any input queued with the `queue_*` functions.
+    """
+
+    DEFAULT_WIDTH = Canvas.DEFAULT_WIDTH
+    DEFAULT_HEIGHT = Canvas.DEFAULT_HEIGHT
+    DEFAULT_TITLE = Canvas.DEFAULT_TITLE
+    LEFT = Canvas.LEFT
+    BOTTOM = Canvas.BOTTOM
+    RIGHT = Canvas.RIGHT
+    TOP = Canvas.TOP
+
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, title=DEFAULT_TITLE):
+        """
+        When creating a canvas, you can optionally specify a width and height.  If no width and height are specified,
+        the canvas is initialized with its default size.
+
+        Args:
+            width: the width of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_WIDTH`)
+            height: the height of the Canvas to create (or if not specified, uses `Canvas.DEFAULT_HEIGHT`)
+        """
+        self.width = width
+        self.height = height
+        self.title = title
+        self.background = "white"
+        self._scene = _Scene()
+        self._init_input()
+
+        # Simulated mouse location, and map of title -> button
+        self.mouse_x = 0
+        self.mouse_y = 0
+        self.buttons = {}
+
+        # Input waiting to be delivered by the next update, as (handler, args) pairs
+        self._pending_input = collections.deque()
+
+        # Simulated clock (in milliseconds) and heap of (due time, sequence number, timer id, callback, args)
+        self.current_time = 0
+        self._timers = []
+        self._cancelled_timers = set()
+        self._next_timer_id = 0
+        self._running = False
+        self._loop = None
+        self._animator = None
+        self._updates_requested = 0
+        self._profiler = None
+        self._async_bridge = None
+        self._rasterizer = None
+        self._capture_pattern = None
+        self._captured_frames = 0
+
+        # There is no window to fit, so logical coordinates are never scaled or checked against tkinter
+        self._scale = None
+        self._logical_size = None
+        self.check_geometry = False
+
+        self._image_gb_protection = {}
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Same as `Canvas.batch`.  Changes to a HeadlessCanvas are never sent anywhere, so this does nothing.
+        """
+        yield
+
+    """ SIMULATED INPUT """
+
+    def queue_mouse_move(self, x, y):
+        """
+        Queues a mouse movement to (x, y), to be delivered the next time `update` is called.
+        """
+        self._pending_input.append((self.__mouse_moved, (x, y)))
+
+    def queue_click(self, x, y):
+        """
+        Queues a mouse press and release at (x, y), to be delivered the next time `update` is called.
+        """
+        self._pending_input.append((self.__mouse_moved, (x, y)))
+        self._pending_input.append((self._input_handlers[_LOG_MOUSE_PRESS], (_InputEvent(None, "mouse", x, y),)))
+        self._pending_input.append((self._input_handlers[_LOG_MOUSE_RELEASE], (_InputEvent(None, "mouse", x, y),)))
+
+    def queue_key_press(self, keysym, char=""):
+        """
+        Queues a key press, to be delivered the next time `update` is called.  The key counts as held down
+        until a matching `queue_key_release` is delivered.
+
+        Args:
+            keysym: the tkinter name of the key, e.g. "Left" or "space"
+            char: the character the key types, if any, e.g. " "
+        """
+        event = _InputEvent(None, "key", keysym=keysym, char=char)
+        self._pending_input.append((self._input_handlers[_LOG_KEY_PRESS], (event,)))
+
+    def queue_key_release(self, keysym):
+        """
+        Queues the release of a key, to be delivered the next time `update` is called.
+        """
+        self._pending_input.append((self.keys_down.discard, (keysym,)))
+
+    def queue_button_click(self, title):
+        """
+        Queues a click on the button with the given title, to be delivered the next time `update` is called.
+        """
+        self._pending_input.append((self._input_handlers[_LOG_BUTTON_CLICK], (title,)))
+
+    def has_pending_input(self):
+        """
+        Returns whether there is queued input that has not yet been delivered.
+        """
+        return bool(self._pending_input)
+
+    def __mouse_moved(self, x, y):
+        self.mouse_x = x
+        self.mouse_y = y
+        self.mouse_on_canvas = 0 <= x < self.width and 0 <= y < self.height
+
+    """ EVENT LOOP """
+
+    def update(self, force=False):
+        """
+        Delivers all queued input, then runs any timers that are due on the simulated clock.
+        """
+        self._updates_requested += 1
+        if self._replay is not None:
+            self._replay.deliver_due(self._updates_requested)
+        while self._pending_input:
+            handler, args = self._pending_input.popleft()
+            handler(*args)
+        self.__run_due_timers()
+        if self._capture_pattern is not None:
+            _write_frame(self._capture_pattern.format(self._captured_frames), self.__render())
+            self._captured_frames += 1
+        if self._profiler is not None:
+            self._profiler.end_frame()
+
+    def get_update_stats(self):
+        """
+        Same as `Canvas.get_update_stats`.  There is nothing to redraw, so every update counts as performed.
+        """
+        return {"requested": self._updates_requested, "performed": self._updates_requested}
+
+    """ PROFILING """
+
+    def enable_profiling(self, window=120):
+        """
+        Same as `Canvas.enable_profiling`.  There is no tkinter, so no Tcl calls are counted.
+        """
+        if self._profiler is None:
+            self._profiler = _Profiler(window)
+            self._profiler.attach(self, _CanvasFunctions)
+
+    def disable_profiling(self):
+        """
+        Same as `Canvas.disable_profiling`.
+        """
+        if self._profiler is None:
+            return None
+        stats = self._profiler.stats()
+        self._profiler.detach(self)
+        self._profiler = None
+        return stats
+
+    def stats(self):
+        """
+        Same as `Canvas.stats`.
+        """
+        if self._profiler is None:
+            raise RuntimeError("Profiling is not enabled; call enable_profiling() first")
+        return self._profiler.stats()
+
+    """ FRAME CAPTURE """
+
+    def render_frame(self):
+        """
+        Draws a picture of the canvas, e.g. to check what a test run looks like.  Only the parts of the canvas
+        that changed since the last picture are drawn again, so drawing every frame of a game is cheap.
+        Needs NumPy.
+
+        Shapes are drawn without anti-aliasing, each character of text is drawn as a solid block, and text areas,
+        buttons and text fields are left out.
+
+        Returns:
+            the canvas pixels as a NumPy array of shape (height, width, 3) and type uint8, in RGB order
+        """
+        return self.__render().copy()
+
+    def save_frame(self, file_path):
+        """
+        Saves a picture of the canvas (see `render_frame`) to a file.
+
+        Args:
+            file_path: the file to save to, ending in .png or .ppm
+        """
+        _write_frame(file_path, self.__render())
+
+    def start_frame_capture(self, file_pattern="frame{:05d}.png"):
+        """
+        Saves a picture of the canvas (see `render_frame`) at the end of every update from now on, e.g. to turn
+        a run into a video.  The .ppm format is much quicker to save than .png, but takes more space.
+
+        Args:
+            file_pattern: the files to save to, ending in .png or .ppm, with {} where the frame number goes
+        """
+        _frame_format(file_pattern)
+        self._capture_pattern = file_pattern
+        self._captured_frames = 0
+
+    def stop_frame_capture(self):
+        """
+        Stops saving a picture of the canvas on every update.
+
+        Returns:
+            the number of pictures saved
+        """
+        self._capture_pattern = None
+        return self._captured_frames
+
+    def __render(self):
+        if self._rasterizer is None:
+            self._rasterizer = _Rasterizer(self._scene)
+        return self._rasterizer.render(self.width, self.height, self.background)
+
+    def update_idletasks(self):
+        """
+        Same as `tkinter.Canvas.update_idletasks`.
+        """
+        self.__run_due_timers()
+
+    def after(self, ms, func=None, *args):
+        """
+        Schedules func(*args) to run ms milliseconds from now on the simulated clock.
+
+        Returns:
+            an id that can be passed to `after_cancel`.
+        """
+        self._next_timer_id += 1
+        timer_id = "after#{}".format(self._next_timer_id)
+        heapq.heappush(self._timers, (self.current_time + int(ms), self._next_timer_id, timer_id, func, args))
+        return timer_id
+
+    def after_idle(self, func, *args):
+        """
+        Same as `tkinter.Canvas.after_idle`.
+        """
+        return self.after(0, func, *args)
+
+    def after_cancel(self, timer_id):
+        """
+        Same as `tkinter.Canvas.after_cancel`.
+        """
+        self._cancelled_timers.add(timer_id)
+
+    def advance(self, ms):
+        """
+        Moves the simulated clock forward by ms milliseconds, running every timer that becomes due along the way.
+        """
+        end = self.current_time + ms
+        while self._timers and self._timers[0][0] <= end:
+            self.current_time = max(self.current_time, self._timers[0][0])
+            self.__run_due_timers()
+        self.current_time = end
+
+    def sleep(self, seconds):
+        """
+        Same as `Canvas.sleep`, but moves the simulated clock forward by the given number of seconds instead of
+        waiting, running every timer that becomes due along the way.
+        """
+        if self._replay is None or not self._replay.skip_sleep:
+            self.advance(int(seconds * 1000))
+
+    def mainloop(self, n=0):
+        """
+        Runs timers in order, jumping the simulated clock straight to each one, until there are none left or
+        `quit` is called.
+        """
+        self._running = True
+        while self._running and (self._timers or self._pending_input):
+            self.update()
+            if self._timers and self._timers[0][0] > self.current_time:
+                self.current_time = self._timers[0][0]
+        self._running = False
+
+    def quit(self):
+        """
+        Same as `tkinter.Canvas.quit`.
+        """
+        self._running = False
+
+    def destroy(self):
+        """
+        Same as `Canvas.destroy`.
+        """
+        self.quit()
+        self._timers = []
+
+    def __run_due_timers(self):
+        while self._timers and self._timers[0][0] <= self.current_time:
+            _, _, timer_id, func, args = heapq.heappop(self._timers)
+            if timer_id in self._cancelled_timers:
+                self._cancelled_timers.discard(timer_id)
+            elif func is not None:
+                func(*args)
+
+    """ GAME LOOP """
+
+    def run_loop(self, tick, hz=30, max_catchup=5):
+        """
+        Same as `Canvas.run_loop`, but runs on the simulated clock, so ticks run back to back without waiting.
+        """
+        loop = self._loop = _FrameLoop(self, tick, hz, max_catchup, self._clock, self.quit)
+        loop.start()
+        self.mainloop()
+        if loop.error is not None:
+            raise loop.error
+        return loop.stats()
+
+    def _clock(self):
+        """
+        Returns the simulated time in seconds, which animations, `run_loop` and the asyncio functions run on.
+        """
+        return self.current_time / 1000
+
+    """ ANIMATION """
+
+    def _color_rgb(self, color):
+        """
+        Returns the (red, green, blue) value of a color, for color animations.
+        """
+        return _parse_color(color)
+
+    """ ASYNCIO """
+
+    def _new_async_bridge(self):
+        """
+        Makes the asyncio task behind `frame`, which updates the canvas and moves the simulated clock forward by
+        one frame every time round, without waiting.
+        """
+        return _AsyncBridge(self, self.__async_step, 0, self._clock)
+
+    def __async_step(self):
+        self.update()
+        self.advance(int(round(Canvas.FRAME_INTERVAL * 1000)))
+
+    """ CANVAS PROPERTIES """
+
+    def set_canvas_background_fill(self, fill):
+        """
+        Same as `Canvas.set_canvas_background_fill`.
+        """
+        self.background = fill
+
+    def use_logical_coordinates(self, width=None, height=None, scale=None):
+        """
+        Same as `Canvas.use_logical_coordinates`.  There is no window to fit, so the canvas just becomes width x
+        height units, and scale is ignored.
+        """
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = height
+
+    def winfo_width(self):
+        """
+        Same as `tkinter.Canvas.winfo_width`.
+        """
+        return self.width
+
+    def winfo_height(self):
+        """
+        Same as `tkinter.Canvas.winfo_height`.
+        """
+        return self.height
+
+    def config(self, **kwargs):
+        """
+        Same as `Canvas.config`.
+        """
+        if "background" in kwargs:
+            self.background = kwargs["background"]
+        if "width" in kwargs:
+            self.width = int(kwargs["width"])
+        if "height" in kwargs:
+            self.height = int(kwargs["height"])
+
+    configure = config
+
+    def __getitem__(self, key):
+        if key in ("background", "bg"):
+            return self.background
+        if key in ("width", "height"):
+            return str(getattr(self, key))
+        raise tkinter.TclError('unknown option "-{}"'.format(key))
+
+    def focus_set(self):
+        """
+        Same as `tkinter.Canvas.focus_set`.
+        """
+        pass
+
+    def pack(self, **kwargs):
+        """
+        Same as `tkinter.Canvas.pack`.
+        """
+        pass
+
+    """ MOUSE AND KEYBOARD """
+
+    def wait_for_click(self, timeout=None):
+        """
+        Waits until a queued mouse click is delivered, and then returns its [x, y] location.  If the queued input
+        runs out before a click, no click could ever arrive: returns None if a timeout was given (after moving the
+        simulated clock forward by the timeout), and otherwise raises a RuntimeError.
+        """
+        self.currently_waiting_for_click = True
+        self.wait_for_click_click_happened = False
+        self.wait_for_click_location = None
+        self.last_click = []
+        if self._replay is not None:
+            self._replay.deliver_until(lambda: self.wait_for_click_click_happened)
+        while not self.wait_for_click_click_happened:
+            if not self._pending_input:
+                self.currently_waiting_for_click = False
+                if timeout is None:
+                    raise RuntimeError("wait_for_click called on a HeadlessCanvas with no queued click")
+                self.advance(int(timeout * 1000))
+                return None
+            handler, args = self._pending_input.popleft()
+            handler(*args)
+        self.currently_waiting_for_click = False
+        self.wait_for_click_click_happened = False
+
+        # [CIP]
+        # Save the location of the mouse click
+        self.last_click = self.wait_for_click_location
+        return self.wait_for_click_location
+
+    def get_mouse_x(self):
+        """
+        Same as `Canvas.get_mouse_x`.
+        """
+        if self._replay is not None:
+            return self._replay.sample(_LOG_MOUSE_X)
+        return self.mouse_x
+
+    def get_mouse_y(self):
+        """
+        Same as `Canvas.get_mouse_y`.
+        """
+        if self._replay is not None:
+            return self._replay.sample(_LOG_MOUSE_Y)
+        return self.mouse_y
+
+    """ INTERACTORS """
+
+    def create_button(self, title, location, **kwargs):
+        """
+        Same as `Canvas.create_button`.
+        """
+        button = _HeadlessWidget(title)
+        self.buttons[title] = button
+        return button
+
+    def create_text_field(self, label, location, **kwargs):
+        """
+        Same as `Canvas.create_text_field`.
+        """
+        text_field = _HeadlessWidget()
+        text_field_label = _HeadlessWidget(label)
+        self.text_fields[label] = (text_field, text_field_label)
+        return text_field, text_field_label
+
+    """ GRAPHICAL OBJECT MANIPULATION """
+
+    def __item(self, obj):
+        item = self._scene.first(obj)
+        if item is None:
+            raise tkinter.TclError('item "{}" doesn\'t exist'.format(obj))
+        return item
+
+    def find_all(self):
+        """
+        Same as `tkinter.Canvas.find_all`.
+        """
+        return self._scene.stacking_order()
+
+    def type(self, obj):
+        """
+        Same as `tkinter.Canvas.type`.
+        """
+        item = self._scene.first(obj)
+        return item.kind if item is not None else None
+
+    def bbox(self, obj):
+        """
+        Same as `Canvas.bbox`.
+        """
+        found = [item for item in self._scene.find(obj)]
+        if not found:
+            return None
+        boxes = [item.bbox() for item in found]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def itemconfig(self, obj, **kwargs):
+        """
+        Same as `tkinter.Canvas.itemconfig`.
+        """
+        for item in self._scene.find(obj):
+            for option in kwargs:
+                if option not in _ITEM_OPTIONS[item.kind]:
+                    raise tkinter.TclError('unknown option "-{}"'.format(option))
+            self._scene.configure(item, kwargs)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, obj, option):
+        """
+        Same as `tkinter.Canvas.itemcget`.
+        """
+        item = self.__item(obj)
+        if option not in _ITEM_OPTIONS[item.kind]:
+            raise tkinter.TclError('unknown option "-{}"'.format(option))
+        value = item.options.get(option, "")
+        if option == "font" and isinstance(value, tuple):
+            return " ".join(str(part) for part in value)
+        return value
+
+    def _tk_command(self, *args):
+        """
+        There is no tkinter to send canvas commands to, so this does nothing.
+        """
+        return None
+
+    def _create(self, itemType, args, kw):
+        """
+        Records a new object in the scene, and returns its id.
+        """
+        options = {key: value for key, value in kw.items() if value is not None}
+        return self._scene.add(itemType, tkinter._flatten(args), options)
+
+    def _create_shapes(self, kind, coords, fills, outlines, width):
+        """
+        Records many rectangles or ovals in the scene, and returns their ids.
+        """
+        rows, fills, outlines = _bulk_shapes(coords, fills, outlines)
+        return [self._create(kind, row, {"fill": fill, "outline": fill if outline is None else outline, "width": width})
+                for row, fill, outline in zip(rows, fills, outlines)]
+
+    def _backend_geometry(self, name, obj):
+        """
+        Answers a geometry query about an object the scene doesn't have, which doesn't exist anywhere else either.
+        """
+        if name == "coords":
+            return []
+        raise tkinter.TclError('item "{}" doesn\'t exist'.format(obj))
+
+    def create_text_area(self, x, y, width=200, height=100, text="", bg="#ececec"):
+        """
+        Same as `Canvas.create_text_area`.
+        """
+        text_widget = _HeadlessWidget(text)
+        self._scene.add("window", (x, y), {"anchor": "nw", "window": text_widget, "width": width, "height": height})
+        return text_widget
+
+    def measure_text(self, text, font="Arial", font_size="12"):
+        """
+        Same as `Canvas.measure_text`, but approximate, since there are no font metrics without a display.  The
+        size matches the size of text objects on a `HeadlessCanvas`.
+        """
+        return _headless_text_size(text, font_size)
+
+    """ GROUPS """
+
+    def _create_image(self, x, y, file_path, width=None, height=None, **kwargs):
+        """
+        Records an image item.  The image file is only opened to read its size, and only if no size is given.
+        """
+        if width is None or height is None:
+            from PIL import Image
+            with Image.open(file_path) as image:
+                width, height = image.size
+        options = {"anchor": "nw", "image": file_path, "width": width, "height": height}
+        options.update(kwargs)
+        return self._create("image", (x, y), options)
+
+    def load_atlas(self, file_path, frame_width, frame_height):
+        """
+        Same as `Canvas.load_atlas`.  The image file is only opened to read its size.
         """
-        from PIL import ImageTk
         from PIL import Image
-        image = Image.open(file_path)
+        with Image.open(file_path) as image:
+            return _Atlas(file_path, frame_width, frame_height, image.size)
+
+    def create_sprite(self, x, y, atlas, frame=0):
+        """
+        Same as `Canvas.create_sprite`.  The sprite is an image item whose frame option is the frame it shows.
+        """
+        sprite = self._scene.add("image", (x, y), {"anchor": "nw", "image": atlas.file_path,
+                                                  "width": atlas.frame_width, "height": atlas.frame_height,
+                                                  "frame": atlas.index(frame)})
+        self._image_gb_protection[sprite] = atlas
+        return sprite
+
+    def set_sprite_frame(self, obj, frame):
+        """
+        Same as `Canvas.set_sprite_frame`.
+        """
+        atlas = self._image_gb_protection.get(obj)
+        if not isinstance(atlas, _Atlas):
+            raise ValueError("{} is not a sprite made by create_sprite".format(obj))
+        self._scene.configure(obj, {"frame": atlas.index(frame)})
+
+
+""" FRAME CAPTURE """
+
+# The tkinter color names programs use most, as (red, green, blue).  Other colors must be given as "#rrggbb" to be
+# drawn by `HeadlessCanvas.render_frame`.
+_NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 255, 0),
+    "blue": (0, 0, 255), "yellow": (255, 255, 0), "cyan": (0, 255, 255), "magenta": (255, 0, 255),
+    "orange": (255, 165, 0), "purple": (160, 32, 240), "pink": (255, 192, 203), "brown": (165, 42, 42),
+    "gray": (190, 190, 190), "grey": (190, 190, 190), "salmon": (250, 128, 114), "indigo": (75, 0, 130),
+    "navy": (0, 0, 128), "gold": (255, 215, 0), "silver": (192, 192, 192), "violet": (238, 130, 238),
+    "maroon": (176, 48, 96), "turquoise": (64, 224, 208), "beige": (245, 245, 220), "tan": (210, 180, 140),
+    "khaki": (240, 230, 140), "coral": (255, 127, 80), "tomato": (255, 99, 71), "crimson": (220, 20, 60),
+    "orchid": (218, 112, 214), "plum": (221, 160, 221), "lavender": (230, 230, 250), "ivory": (255, 255, 240),
+    "snow": (255, 250, 250), "chocolate": (210, 105, 30), "sienna": (160, 82, 45), "olive": (128, 128, 0),
+    "teal": (0, 128, 128), "lime": (50, 205, 50), "aqua": (0, 255, 255), "fuchsia": (255, 0, 255),
+    "lightblue": (173, 216, 230), "lightgreen": (144, 238, 144), "lightgray": (211, 211, 211),
+    "lightgrey": (211, 211, 211), "lightyellow": (255, 255, 224), "lightpink": (255, 182, 193),
+    "darkblue": (0, 0, 139), "darkgreen": (0, 100, 0), "darkred": (139, 0, 0), "darkgray": (169, 169, 169),
+    "darkgrey": (169, 169, 169), "darkorange": (255, 140, 0), "skyblue": (135, 206, 235),
+    "steelblue": (70, 130, 180), "royalblue": (65, 105, 225), "forestgreen": (34, 139, 34),
+    "hotpink": (255, 105, 180), "slategray": (112, 128, 144), "slategrey": (112, 128, 144),
+    "dimgray": (105, 105, 105), "dimgrey": (105, 105, 105), "whitesmoke": (245, 245, 245),
+}
+
+
+def _parse_color(color):
+    """
+    Converts a tkinter color (a name, "#rgb", "#rrggbb", "#rrrgggbbb" or "#rrrrggggbbbb") to a (red, green, blue)
+    tuple of 8-bit values.  Raises a ValueError for names that are not in `_NAMED_COLORS`.
+    """
+    name = color.replace(" ", "").lower()
+    if name.startswith("#") and len(name) - 1 in (3, 6, 9, 12):
+        size = (len(name) - 1) // 3
+        try:
+            values = [int(name[1 + i * size:1 + (i + 1) * size], 16) for i in range(3)]
+        except ValueError:
+            pass
+        else:
+            if size == 1:
+                return tuple(value * 17 for value in values)
+            return tuple(value >> (4 * size - 8) for value in values)
+    elif name in _NAMED_COLORS:
+        return _NAMED_COLORS[name]
+    else:
+        match = re.fullmatch(r"gr[ae]y(\d{1,3})", name)
+        if match and int(match.group(1)) <= 100:
+            return (round(int(match.group(1)) * 2.55),) * 3
+    raise ValueError('Cannot draw the color {!r}, use a "#rrggbb" color instead'.format(color))
+
+
+def _pixel_span(low, high, start, stop):
+    """
+    Returns the (first, last + 1) pixels, between start and stop, whose centers lie in [low, high).
+    """
+    return max(start, math.ceil(low - 0.5)), min(stop, math.ceil(high - 0.5))
 
-        # Resize the image if another width and height is specified
-        if width is not None and height is not None:
-            image = image.resize((width, height))
 
-        image = ImageTk.PhotoImage(image)
-        img_obj = super().create_image(x, y, anchor="nw", image=image, **kwargs)
-        # note: if you don't do this, the image gets garbage collected!!!
-        # this introduces a memory leak which can be fixed by overloading delete
-        self._image_gb_protection[img_obj] = image
-        return img_obj
+class _Rasterizer:
+    """
+    Draws a `_Scene` into a NumPy array of RGB pixels, without tkinter.  After the first frame, only the areas
+    covered by items that were added, changed, restacked or removed since the last frame are drawn again.
+
+    Shapes are drawn without anti-aliasing, so edges can be a pixel away from where tkinter draws them.  There are
+    no fonts without a display, so each character of text is drawn as a solid block in the text's color.
+    Text areas, buttons and text fields are not part of the scene and are not drawn.
+    """
+
+    # With more changed areas than this, drawing the one area around all of them is quicker
+    MAX_REGIONS = 64
+
+    def __init__(self, scene):
+        import numpy
+        self.np = numpy
+        self.scene = scene
+        self.frame = None
+        self.background = None
+        self.drawn = {}         # item id -> (x1, y1, x2, y2) pixels the item covered when it was last drawn
+        self.colors = {}        # tkinter color -> (red, green, blue)
+        self.images = {}        # (file path, width, height) -> (height x width x 4 pixels, whether it is opaque)
+        scene.changed = set()
+
+    def render(self, width, height, background):
+        """
+        Brings the frame up to date with the scene and returns it.  The frame is reused by the next render.
+        """
+        scene = self.scene
+        if self.frame is None or self.frame.shape[:2] != (height, width) or background != self.background:
+            self.frame = self.np.empty((height, width, 3), self.np.uint8)
+            self.background = background
+            scene.changed.clear()
+            self.drawn = {}
+            for item in scene.items.values():
+                area = self.__area(item)
+                if area is not None:
+                    self.drawn[item.id] = area
+            self.__draw_region(0, 0, width, height)
+            return self.frame
+
+        regions = []
+        drawn = self.drawn
+        items = scene.items
+        for item_id in scene.changed:
+            area = drawn.pop(item_id, None)
+            if area is not None:
+                regions.append(area)
+            item = items.get(item_id)
+            if item is not None:
+                area = self.__area(item)
+                if area is not None:
+                    drawn[item_id] = area
+                    regions.append(area)
+        scene.changed.clear()
+        if len(regions) > self.MAX_REGIONS:
+            regions = [(min(region[0] for region in regions), min(region[1] for region in regions),
+                        max(region[2] for region in regions), max(region[3] for region in regions))]
+        for region in set(regions):
+            self.__draw_region(*region)
+        return self.frame
+
+    def __area(self, item):
+        """
+        Returns the (x1, y1, x2, y2) pixels of the frame the item can draw on, or None if it draws nothing.
+        """
+        if item.hidden or item.kind == "window":
+            return None
+        height, width = self.frame.shape[:2]
+        x1, y1, x2, y2 = item.bounds()
+        x1 = max(0, math.floor(x1) - 1)
+        y1 = max(0, math.floor(y1) - 1)
+        x2 = min(width, math.ceil(x2) + 1)
+        y2 = min(height, math.ceil(y2) + 1)
+        if x1 >= x2 or y1 >= y2:
+            return None
+        return x1, y1, x2, y2
+
+    def __color(self, color):
+        """
+        Returns the (red, green, blue) of a tkinter color, or None for "" (nothing is drawn).
+        """
+        if not color:
+            return None
+        rgb = self.colors.get(color)
+        if rgb is None:
+            rgb = self.colors[color] = _parse_color(color)
+        return rgb
+
+    def __draw_region(self, x1, y1, x2, y2):
+        """
+        Draws the background and every visible item that touches the region, bottom item first.
+        """
+        self.frame[y1:y2, x1:x2] = self.__color(self.background)
+        found = [item for item in self.scene.index.query(x1, y1, x2, y2) if not item.hidden]
+        found.sort(key=lambda item: item.z)
+        region = (x1, y1, x2, y2)
+        for item in found:
+            kind = item.kind
+            if kind == "rectangle":
+                self.__draw_rectangle(item, region)
+            elif kind == "oval":
+                self.__draw_oval(item, region)
+            elif kind == "polygon":
+                self.__draw_polygon(item, region)
+            elif kind == "line":
+                self.__draw_line(item.coords, float(item.options.get("width", 1)),
+                                 self.__color(item.options.get("fill", "black")), region)
+            elif kind == "text":
+                self.__draw_text(item, region)
+            elif kind == "image":
+                self.__draw_image(item, region)
+
+    def __box(self, left, top, right, bottom, region, color):
+        """
+        Fills the pixels whose centers lie inside the box.
+        """
+        x1, x2 = _pixel_span(left, right, region[0], region[2])
+        y1, y2 = _pixel_span(top, bottom, region[1], region[3])
+        if x1 < x2 and y1 < y2:
+            self.frame[y1:y2, x1:x2] = color
+
+    def __grid(self, left, top, right, bottom, region):
+        """
+        Returns the frame pixels under the box (clipped to the region) and the x and y of their centers, shaped
+        to broadcast against each other, or None if the box is outside the region.
+        """
+        x1, x2 = _pixel_span(left, right, region[0], region[2])
+        y1, y2 = _pixel_span(top, bottom, region[1], region[3])
+        if x1 >= x2 or y1 >= y2:
+            return None
+        np = self.np
+        xs = np.arange(x1, x2, dtype=np.float64)[None, :] + 0.5
+        ys = np.arange(y1, y2, dtype=np.float64)[:, None] + 0.5
+        return self.frame[y1:y2, x1:x2], xs, ys
+
+    def __shape_colors(self, item):
+        options = item.options
+        fill = self.__color(options.get("fill"))
+        outline = self.__color(options.get("outline"))
+        width = float(options.get("width", 1)) if outline is not None else 0
+        return fill, outline, width
+
+    def __draw_rectangle(self, item, region):
+        fill, outline, width = self.__shape_colors(item)
+        left, top, right, bottom = item.extent()
+        if outline is not None and width > 0:
+            half = width / 2
+            inner = (left + half, top + half, right - half, bottom - half)
+            self.__box(left - half, top - half, right + half, inner[1], region, outline)
+            self.__box(left - half, inner[3], right + half, bottom + half, region, outline)
+            self.__box(left - half, inner[1], inner[0], inner[3], region, outline)
+            self.__box(inner[2], inner[1], right + half, inner[3], region, outline)
+            left, top, right, bottom = inner
+        if fill is not None:
+            self.__box(left, top, right, bottom, region, fill)
+
+    def __draw_oval(self, item, region):
+        fill, outline, width = self.__shape_colors(item)
+        left, top, right, bottom = item.extent()
+        center_x = (left + right) / 2
+        center_y = (top + bottom) / 2
+        half = width / 2
+        grid = self.__grid(left - half, top - half, right + half, bottom + half, region)
+        if grid is None:
+            return
+        pixels, xs, ys = grid
+
+        def inside(radius_x, radius_y):
+            if radius_x <= 0 or radius_y <= 0:
+                return self.np.zeros((ys.shape[0], xs.shape[1]), bool)
+            return ((xs - center_x) / radius_x) ** 2 + ((ys - center_y) / radius_y) ** 2 < 1
+
+        radius_x = (right - left) / 2
+        radius_y = (bottom - top) / 2
+        filled = inside(radius_x - half, radius_y - half)
+        if outline is not None and width > 0:
+            pixels[inside(radius_x + half, radius_y + half) & ~filled] = outline
+        if fill is not None:
+            pixels[filled] = fill
+
+    def __draw_polygon(self, item, region):
+        fill, outline, width = self.__shape_colors(item)
+        coords = item.coords
+        if fill is not None and len(coords) >= 6:
+            grid = self.__grid(*item.extent(), region)
+            if grid is not None:
+                pixels, xs, ys = grid
+                inside = self.np.zeros((ys.shape[0], xs.shape[1]), bool)
+                points = list(zip(coords[0::2], coords[1::2]))
+                for (ax, ay), (bx, by) in zip(points, points[1:] + points[:1]):
+                    if ay == by:
+                        continue
+                    # Even-odd rule: count the edges crossed by a ray from each pixel center to the left
+                    crosses = (ay > ys) != (by > ys)
+                    inside ^= crosses & (xs > ax + (ys - ay) * (bx - ax) / (by - ay))
+                pixels[inside] = fill
+        if outline is not None and width > 0:
+            self.__draw_line(coords + coords[:2], width, outline, region)
+
+    def __draw_line(self, coords, width, color, region):
+        """
+        Draws each segment of the line as a band of the given width, with square ends.
+        """
+        if color is None or width <= 0:
+            return
+        half = width / 2
+        # Odd widths are centered on the pixel the coordinates round to, even widths on the edge between pixels
+        shift = 0.5 if round(width) % 2 else 0
+        for i in range(0, len(coords) - 3, 2):
+            ax, ay, bx, by = (value + shift for value in coords[i:i + 4])
+            grid = self.__grid(min(ax, bx) - half, min(ay, by) - half, max(ax, bx) + half, max(ay, by) + half,
+                               region)
+            dx = bx - ax
+            dy = by - ay
+            length = math.hypot(dx, dy)
+            if grid is None or length == 0:
+                continue
+            pixels, xs, ys = grid
+            along = ((xs - ax) * dx + (ys - ay) * dy) / length
+            across = ((xs - ax) * dy - (ys - ay) * dx) / length
+            pixels[(along >= 0) & (along <= length) & (abs(across) <= half)] = color
+
+    def __draw_text(self, item, region):
+        color = self.__color(item.options.get("fill", "black"))
+        if color is None:
+            return
+        font = item.options.get("font", ("Arial", 12))
+        size = abs(float(font[1])) if len(font) > 1 else 12
+        left, top, _, _ = item.extent()
+        char_width = size * HEADLESS_CHAR_WIDTH
+        line_height = size * HEADLESS_LINE_HEIGHT
+        for row, line in enumerate(str(item.options.get("text", "")).split("\n")):
+            y = top + row * line_height
+            for column, char in enumerate(line):
+                if not char.isspace():
+                    x = left + column * char_width
+                    self.__box(x + char_width * 0.1, y + size * 0.2, x + char_width * 0.9, y + size, region, color)
+
+    def __draw_image(self, item, region):
+        options = item.options
+        key = (options["image"], int(options["width"]), int(options["height"]), options.get("frame"))
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = self.__load_image(*key)
+        pixels, opaque = image
+        left, top, _, _ = item.extent()
+        x, y = _round_half_away(left), _round_half_away(top)
+        x1, y1 = max(x, region[0]), max(y, region[1])
+        x2, y2 = min(x + key[1], region[2]), min(y + key[2], region[3])
+        if x1 >= x2 or y1 >= y2:
+            return
+        source = pixels[y1 - y:y2 - y, x1 - x:x2 - x]
+        target = self.frame[y1:y2, x1:x2]
+        if opaque:
+            target[:] = source[:, :, :3]
+        else:
+            alpha = source[:, :, 3:] / 255
+            target[:] = source[:, :, :3] * alpha + target * (1 - alpha) + 0.5
+
+    def __load_image(self, file_path, width, height, frame):
+        from PIL import Image
+        with Image.open(file_path) as image:
+            image = image.convert("RGBA")
+            if frame is not None:
+                image = image.crop(_Atlas(file_path, width, height, image.size).box(frame))
+            if image.size != (width, height):
+                image = image.resize((width, height))
+            pixels = self.np.asarray(image)
+        return pixels, bool((pixels[:, :, 3] == 255).all())
+
+
+def _frame_format(file_path):
+    """
+    Returns the extension (".png" or ".ppm") of a file to save frames to, or raises a ValueError for other files.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in (".png", ".ppm"):
+        raise ValueError("Can only save frames as .png or .ppm files, not {!r}".format(file_path))
+    return extension
+
+
+def _write_frame(file_path, frame):
+    """
+    Saves a height x width x 3 array of RGB pixels as a .png or .ppm file, depending on the file extension.
+    """
+    height, width = frame.shape[:2]
+    if _frame_format(file_path) == ".ppm":
+        with open(file_path, "wb") as file:
+            file.write(b"P6 %d %d 255\n" % (width, height))
+            file.write(frame.tobytes())
+    else:
+        import zlib
+        # Every row of a PNG starts with the number of the filter applied to it, here 0 (none)
+        rows = bytearray(height * (width * 3 + 1))
+        stride = width * 3 + 1
+        data = frame.tobytes()
+        for row in range(height):
+            rows[row * stride + 1:(row + 1) * stride] = data[row * width * 3:(row + 1) * width * 3]
+
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+        with open(file_path, "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n")
+            file.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+            file.write(chunk(b"IDAT", zlib.compress(bytes(rows))))
+            file.write(chunk(b"IEND", b""))
+
+
+""" REMOTE RENDERING """
+
+# Commands sent from a RemoteCanvas to its renderer.  Each message is a 4-byte length followed by the command
+# byte and its arguments, packed as tagged values by _pack_value.  Messages from the renderer back to the
+# RemoteCanvas are input records, packed the same way as in an input recording.
+(_CMD_HELLO, _CMD_CREATE, _CMD_MOVE, _CMD_CONFIGURE, _CMD_DELETE, _CMD_CLEAR, _CMD_RAISE, _CMD_LOWER,
+ _CMD_ADD_TAG, _CMD_REMOVE_TAG, _CMD_BACKGROUND, _CMD_BUTTON, _CMD_TEXT_FIELD, _CMD_DELETE_TEXT_FIELD,
+ _CMD_FRAME, _CMD_TEXT_AREA, _CMD_SET_TEXT_AREA) = range(1, 18)
+
+# Text in an input record is at most 255 bytes, so text area contents are sent back in pieces of this many
+# characters, which is at most 255 bytes of UTF-8
+_TEXT_AREA_PIECE = 63
+
+_MESSAGE_LENGTH = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_COUNT = struct.Struct("<I")
+
+
+def _pack_value(value, out):
+    """
+    Appends value (None, an int, float or string, or a tuple or list of these) to the bytearray out.
+    """
+    if value is None:
+        out += b"n"
+    elif isinstance(value, int):
+        out += b"i" + _INT.pack(value)
+    elif isinstance(value, float):
+        out += b"f" + _FLOAT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s" + _COUNT.pack(len(data)) + data
+    elif isinstance(value, (tuple, list)):
+        out += b"t" + _COUNT.pack(len(value))
+        for element in value:
+            _pack_value(element, out)
+    else:
+        raise TypeError("{!r} cannot be sent to a renderer".format(value))
+
+
+def _unpack_value(data, offset):
+    """
+    Reads the value packed by _pack_value at offset, and returns it and the offset of the next value.
+    """
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b"n":
+        return None, offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"f":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    if tag == b"s":
+        return bytes(data[offset:offset + count]).decode("utf-8"), offset + count
+    values = []
+    for _ in range(count):
+        value, offset = _unpack_value(data, offset)
+        values.append(value)
+    return tuple(values), offset
+
+
+def _pack_command(command, *args):
+    body = bytearray((command,))
+    _pack_value(args, body)
+    return _MESSAGE_LENGTH.pack(len(body)) + body
+
+
+def _unpack_command(body):
+    return body[0], _unpack_value(body, 1)[0]
+
+
+def _flatten_options(options):
+    """
+    Turns an options dictionary into a flat (name, value, name, value, ...) tuple that can be packed.
+    """
+    return tuple(value for pair in options.items() for value in pair)
+
+
+def _options_dict(flat):
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+class _Connection:
+    """
+    One end of a pipe or socket carrying length-prefixed messages.  Reading never blocks, so it can be done
+    once per frame.
+    """
+
+    def __init__(self, read_fd, write_fd, owner=None):
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+        # The socket or process the file descriptors belong to, kept alive as long as the connection
+        self.owner = owner
+        self.buffer = bytearray()
+        self.closed = False
+
+    def send(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.write_fd, view):]
+
+    def wait(self, timeout=None):
+        """
+        Waits until there is something to read (or the other end closes), or timeout seconds pass.
+        """
+        import select
+        select.select([self.read_fd], [], [], timeout)
+
+    def receive(self):
+        """
+        Returns the bodies of all the complete messages that have arrived, oldest first.  Raises an EOFError once
+        the other end has closed the connection and every message has been returned.
+        """
+        import select
+        # Read a bounded amount each time, so a flood of messages cannot stall the caller
+        for _ in range(16):
+            if self.closed or not select.select([self.read_fd], [], [], 0)[0]:
+                break
+            data = os.read(self.read_fd, 65536)
+            if not data:
+                self.closed = True
+            self.buffer += data
+        messages = []
+        while len(self.buffer) >= _MESSAGE_LENGTH.size:
+            (length,) = _MESSAGE_LENGTH.unpack_from(self.buffer)
+            end = _MESSAGE_LENGTH.size + length
+            if len(self.buffer) < end:
+                break
+            messages.append(bytes(self.buffer[_MESSAGE_LENGTH.size:end]))
+            del self.buffer[:end]
+        if self.closed and not messages:
+            raise EOFError("The connection was closed")
+        return messages
+
+    def close(self):
+        if self.owner is not None and hasattr(self.owner, "close"):
+            self.owner.close()
+        else:
+            for fd in {self.read_fd, self.write_fd}:
+                os.close(fd)
+
+
+def _item_ref(obj):
+    """
+    Returns how to refer to obj (an item id, tag, or scene item) in a renderer command.
+    """
+    if isinstance(obj, _SceneItem):
+        return obj.id
+    return obj
+
+
+class _RemoteScene(_Scene):
+    """
+    A scene that also describes every change made to it as a renderer command, passed to send.
+    """
+
+    def __init__(self, send):
+        super().__init__()
+        self.send = send
+
+    def add(self, kind, coords, options, item_id=None, measured=None):
+        item_id = super().add(kind, coords, options, item_id, measured)
+        item = self.items[item_id]
+        self.send(_CMD_CREATE, item_id, kind, item.coords, _flatten_options(item.options))
+        return item_id
+
+    def move(self, obj, dx, dy):
+        super().move(obj, dx, dy)
+        self.send(_CMD_MOVE, _item_ref(obj), dx, dy)
+
+    def configure(self, obj, options, measured=None):
+        super().configure(obj, options, measured)
+        self.send(_CMD_CONFIGURE, _item_ref(obj), _flatten_options(options))
+
+    def remove(self, obj):
+        found = super().remove(obj)
+        self.send(_CMD_DELETE, _item_ref(obj))
+        return found
+
+    def clear(self):
+        super().clear()
+        self.send(_CMD_CLEAR)
+
+    def raise_above(self, obj, above=None):
+        super().raise_above(obj, above)
+        self.send(_CMD_RAISE, _item_ref(obj), _item_ref(above))
+
+    def lower_below(self, obj, below=None):
+        super().lower_below(obj, below)
+        self.send(_CMD_LOWER, _item_ref(obj), _item_ref(below))
+
+    def add_tag(self, obj, tag):
+        super().add_tag(obj, tag)
+        self.send(_CMD_ADD_TAG, _item_ref(obj), tag)
+
+    def remove_tag(self, obj, tag):
+        super().remove_tag(obj, tag)
+        self.send(_CMD_REMOVE_TAG, _item_ref(obj), tag)
+
+
+class _RemoteTextArea(_HeadlessWidget):
+    """
+    Stand-in for the Text widget of a text area on a `RemoteCanvas`, which passes itself to changed whenever
+    the program changes its text or state, so the change can be sent to the renderer.
+    """
+
+    def __init__(self, text, changed):
+        super().__init__(text)
+        self.id = None
+        self.state = tkinter.DISABLED
+        self.changed = changed
+
+    def insert(self, index, text):
+        super().insert(index, text)
+        self.changed(self)
+
+    def delete(self, first, last=None):
+        super().delete(first, last)
+        self.changed(self)
+
+    def config(self, **kwargs):
+        super().config(**kwargs)
+        if "state" in kwargs:
+            self.state = kwargs["state"]
+        self.changed(self)
+
+    configure = config
+
+
+class RemoteCanvas(HeadlessCanvas):
+    """
+    RemoteCanvas runs a program's graphics in a separate renderer process, which shows them on a real `Canvas`
+    window.  Drawing calls are sent to the renderer as a compact binary stream each time `update` is called,
+    and the mouse, keyboard, button and text field input from the window is sent back.  Questions about the
+    canvas contents (`coords`, `get_left_x`, `find_overlapping`, ...) are answered straight away from a copy
+    kept in this process, exactly as `HeadlessCanvas` answers them, so text sizes are approximate.
+
+    By default a renderer is started for this canvas, connected through a pipe.  To show a program in a
+    renderer that is already running, start one with `python graphics.py --render-socket /tmp/game.sock`
+    and pass socket_path="/tmp/game.sock"; it shows one program after another.
+
+    Unlike `HeadlessCanvas`, the clock is the wall clock, so timers registered with `after`, `run_loop` and
+    animations run at real speed, and `mainloop` runs until the renderer's window is closed.
+    """
+
+    def __init__(self, width=HeadlessCanvas.DEFAULT_WIDTH, height=HeadlessCanvas.DEFAULT_HEIGHT,
+                 title=HeadlessCanvas.DEFAULT_TITLE, socket_path=None):
+        super().__init__(width, height, title)
+        if socket_path is None:
+            import subprocess
+            import sys
+            process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--render"],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self.connection = _Connection(process.stdout.fileno(), process.stdin.fileno())
+            self.renderer = process
+        else:
+            import socket
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(socket_path)
+            self.connection = _Connection(connection.fileno(), connection.fileno(), connection)
+            self.renderer = None
+        self.outbox = bytearray()
+        self.renderer_closed = False
+        # current_time, in milliseconds, follows the wall clock from this moment
+        self.start_time = time.perf_counter()
+        self._scene = _RemoteScene(self.__send)
+        self._input_handlers[_LOG_MOUSE_X] = lambda x: setattr(self, "mouse_x", x)
+        self._input_handlers[_LOG_MOUSE_Y] = lambda y: setattr(self, "mouse_y", y)
+        self._input_handlers[_LOG_TEXT_FIELD] = self.__text_field_changed
+        # Map of id -> text area, and the pieces of text typed into a text area received so far
+        self.text_areas = {}
+        self.text_area_pieces = []
+        self._input_handlers[_LOG_TEXT_AREA] = self.__text_area_typed
+        # Errors the renderer hit carrying out commands, raised by the next update
+        self.render_errors = []
+        self._input_handlers[_LOG_RENDER_ERROR] = self.render_errors.append
+        self.__send(_CMD_HELLO, width, height, title)
+        self.__flush()
+
+    def update(self, force=False):
+        """
+        Sends everything drawn since the last update to the renderer and tells it to redraw, then delivers the
+        input that has arrived from it.  Raises a tkinter.TclError once the renderer's window has been closed,
+        just like updating a closed `Canvas` does, or if the renderer could not carry out a drawing command
+        (e.g. because of an unknown color), which `Canvas` would have raised straight away.
+        """
+        self.__send(_CMD_FRAME)
+        self.__flush()
+        self.__receive()
+        self.__sync_clock()
+        super().update(force)
+
+    def after(self, ms, func=None, *args):
+        """
+        Same as `tkinter.Canvas.after`: schedules func(*args) to run ms milliseconds from now.  Timers run during
+        `update` and `mainloop`.
+        """
+        self.__sync_clock()
+        return super().after(ms, func, *args)
+
+    # The clock is the wall clock, so sleeping really waits
+    sleep = _CanvasFunctions.sleep
+
+    def mainloop(self, n=0):
+        """
+        Runs timers when they are due, and delivers input from the renderer as it arrives, until `quit` is called
+        or the renderer's window is closed.  Sleeps in between.
+        """
+        self._running = True
+        try:
+            while self._running:
+                self.update()
+                if not self._running:
+                    break
+                timeout = None
+                if self._timers:
+                    timeout = max(0, (self._timers[0][0] - self.current_time) / 1000)
+                self.connection.wait(timeout)
+        except tkinter.TclError:
+            # The window was closed, which ends tkinter's mainloop too.  Other errors are still raised.
+            if not self.renderer_closed:
+                raise
+        finally:
+            self._running = False
+
+    def run_loop(self, tick, hz=30, max_catchup=5):
+        """
+        Same as `Canvas.run_loop`.
+        """
+        # The loop's first tick is timed from now, not from the last update
+        self.__sync_clock()
+        return super().run_loop(tick, hz, max_catchup)
+
+    def __sync_clock(self):
+        # Never goes backwards, in case advance moved the clock ahead of the wall clock
+        self.current_time = max(self.current_time, (time.perf_counter() - self.start_time) * 1000)
+
+    def wait_for_click(self, timeout=None):
+        """
+        Same as `Canvas.wait_for_click`, waiting for a click in the renderer's window.
+        """
+        self.__send(_CMD_FRAME)
+        self.__flush()
+        self.currently_waiting_for_click = True
+        self.wait_for_click_click_happened = False
+        self.wait_for_click_location = None
+        self.last_click = []
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self.wait_for_click_click_happened:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            self.connection.wait(remaining)
+            self.__receive()
+        self.currently_waiting_for_click = False
+        self.wait_for_click_click_happened = False
+
+        # [CIP]
+        # Save the location of the mouse click
+        if self.wait_for_click_location is not None:
+            self.last_click = self.wait_for_click_location
+        return self.wait_for_click_location
+
+    def set_canvas_background_fill(self, fill):
+        """
+        Same as `Canvas.set_canvas_background_fill`.
+        """
+        super().set_canvas_background_fill(fill)
+        self.__send(_CMD_BACKGROUND, fill)
+
+    def config(self, **kwargs):
+        """
+        Same as `Canvas.config`.
+        """
+        super().config(**kwargs)
+        if "background" in kwargs:
+            self.__send(_CMD_BACKGROUND, kwargs["background"])
+
+    configure = config
+
+    def create_button(self, title, location, **kwargs):
+        """
+        Same as `Canvas.create_button`.  Other tkinter keyword args are not sent to the renderer.
+        """
+        button = super().create_button(title, location, **kwargs)
+        self.__send(_CMD_BUTTON, title, location)
+        return button
+
+    def create_text_field(self, label, location, **kwargs):
+        """
+        Same as `Canvas.create_text_field`.  Other tkinter keyword args are not sent to the renderer.
+        """
+        text_field = super().create_text_field(label, location, **kwargs)
+        self.__send(_CMD_TEXT_FIELD, label, location)
+        return text_field
+
+    def delete_text_field(self, text_field_name):
+        """
+        Same as `Canvas.delete_text_field`.
+        """
+        super().delete_text_field(text_field_name)
+        self.__send(_CMD_DELETE_TEXT_FIELD, text_field_name)
+
+    def create_text_area(self, x, y, width=200, height=100, text="", bg="#ececec"):
+        """
+        Same as `Canvas.create_text_area`.  Changes the program makes to the text or state of the text area are
+        sent to the renderer, and text typed into it there (once it is made editable) is sent back.
+        """
+        text_area = _RemoteTextArea(text, self.__text_area_changed)
+        # Added to the scene without sending a create command, since the renderer makes the window itself
+        text_area.id = _Scene.add(self._scene, "window", (x, y), {"anchor": "nw", "window": text_area,
+                                                                  "width": width, "height": height})
+        self.text_areas[text_area.id] = text_area
+        tags = self._scene.items[text_area.id].tags
+        self.__send(_CMD_TEXT_AREA, text_area.id, x, y, width, height, text, bg, tags)
+        return text_area
+
+    def destroy(self):
+        """
+        Closes the connection to the renderer, which closes its window.
+        """
+        super().destroy()
+        self.connection.close()
+        if self.renderer is not None:
+            self.renderer.wait()
+
+    def __send(self, command, *args):
+        self.outbox += _pack_command(command, *args)
+
+    def __flush(self):
+        try:
+            self.connection.send(self.outbox)
+        except OSError:
+            self.renderer_closed = True
+            raise tkinter.TclError("The renderer window was closed")
+        self.outbox.clear()
+
+    def __receive(self):
+        try:
+            messages = self.connection.receive()
+        except EOFError:
+            self.renderer_closed = True
+            raise tkinter.TclError("The renderer window was closed")
+        for body in messages:
+            kind, _, numbers, strings, _ = _unpack_input(body)
+            _deliver_input(self._input_handlers, kind, numbers, strings)
+        if self.render_errors:
+            error = self.render_errors.pop(0)
+            raise tkinter.TclError("The renderer could not draw: {}".format(error))
+
+    def __text_field_changed(self, name, text):
+        if name in self.text_fields:
+            self.text_fields[name][0].config(text=text)
+
+    def __text_area_changed(self, text_area):
+        self.__send(_CMD_SET_TEXT_AREA, text_area.id, text_area.text, text_area.state)
+
+    def __text_area_typed(self, item_id, more, piece):
+        self.text_area_pieces.append(piece)
+        if not more:
+            text = "".join(self.text_area_pieces)
+            self.text_area_pieces.clear()
+            if item_id in self.text_areas:
+                # Set directly, so the text is not sent straight back to the renderer
+                self.text_areas[item_id].text = text
+
+
+class _InputSender(_InputRecorder):
+    """
+    Sends the input of a renderer's canvas back to the RemoteCanvas, instead of writing it to a file.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.outbox = bytearray()
+
+    def record(self, kind, tick, numbers=(), strings=()):
+        record = _pack_input(kind, tick, numbers, strings)
+        self.outbox += _MESSAGE_LENGTH.pack(len(record)) + record
+
+    def flush(self):
+        if self.outbox:
+            self.connection.send(self.outbox)
+            self.outbox.clear()
+
+    def close(self):
+        pass
+
+
+class _Renderer:
+    """
+    Shows the commands from one RemoteCanvas on a real Canvas, and sends its input back.
+    """
+
+    def __init__(self, connection, hello):
+        width, height, title = hello
+        self.connection = connection
+        self.canvas = Canvas(width, height, title)
+        self.canvas._batch_errors = []
+        self.sender = _InputSender(connection)
+        self.canvas._recorder = self.sender
+        # RemoteCanvas object id -> id of the same object on this canvas
+        self.ids = {}
+        self.mouse = None
+        self.text_fields = {}
+        # RemoteCanvas text area id -> [Text widget, the text the RemoteCanvas last knew it had]
+        self.text_areas = {}
+
+    def run(self):
+        """
+        Shows commands until the RemoteCanvas disconnects or the window is closed.
+        """
+        self.canvas.after(0, self.__poll)
+        self.canvas.mainloop()
+        try:
+            self.canvas.main_window.destroy()
+        except tkinter.TclError:
+            pass
+
+    def __poll(self):
+        try:
+            messages = self.connection.receive()
+        except EOFError:
+            self.canvas.main_window.destroy()
+            return
+        # A command that fails is reported back to the RemoteCanvas, and the rest are still shown
+        errors = self.canvas._batch_errors
+        redraw = False
+        try:
+            with self.canvas.batch():
+                for body in messages:
+                    try:
+                        command, args = _unpack_command(body)
+                        if command == _CMD_FRAME:
+                            redraw = True
+                        else:
+                            self.apply(command, args)
+                    except Exception as error:
+                        errors.append(error)
+            if redraw:
+                self.canvas.update()
+            self.__send_state()
+        except Exception as error:
+            if self.canvas._closed:
+                return
+            errors.append(error)
+        for error in errors:
+            self.sender.record(_LOG_RENDER_ERROR, self.canvas._updates_requested, strings=(str(error),))
+        errors.clear()
+        try:
+            self.sender.flush()
+        except OSError:
+            self.canvas.main_window.destroy()
+            return
+        self.canvas.after(int(Canvas.FRAME_INTERVAL * 1000), self.__poll)
+
+    def __send_state(self):
+        """
+        Sends the mouse location and text field contents when they change.
+        """
+        canvas = self.canvas
+        mouse = (canvas.winfo_pointerx() - canvas.winfo_rootx(), canvas.winfo_pointery() - canvas.winfo_rooty())
+        if mouse != self.mouse:
+            self.mouse = mouse
+            tick = canvas._updates_requested
+            self.sender.record(_LOG_MOUSE_X, tick, (mouse[0],))
+            self.sender.record(_LOG_MOUSE_Y, tick, (mouse[1],))
+        for name in canvas.text_fields:
+            text = canvas.get_text_field_text(name)
+            if self.text_fields.get(name) != text:
+                self.text_fields[name] = text
+                self.sender.record(_LOG_TEXT_FIELD, canvas._updates_requested, strings=(name, text))
+        for item_id, text_area in self.text_areas.items():
+            text = text_area[0].get("1.0", "end-1c")
+            if text_area[1] != text:
+                text_area[1] = text
+                pieces = [text[i:i + _TEXT_AREA_PIECE] for i in range(0, len(text), _TEXT_AREA_PIECE)] or [""]
+                for i, piece in enumerate(pieces):
+                    more = int(i < len(pieces) - 1)
+                    self.sender.record(_LOG_TEXT_AREA, canvas._updates_requested, (item_id, more), (piece,))
+
+    def apply(self, command, args):
+        """
+        Carries out one command on the canvas.
+        """
+        canvas = self.canvas
+        if command == _CMD_CREATE:
+            item_id, kind, coords, options = args
+            self.ids[item_id] = self.__create(kind, coords, _options_dict(options))
+        elif command == _CMD_MOVE:
+            canvas.move(self.__resolve(args[0]), args[1], args[2])
+        elif command == _CMD_CONFIGURE:
+            options = _options_dict(args[1])
+            options.pop("image", None)
+            frame = options.pop("frame", None)
+            if frame is not None:
+                canvas.set_sprite_frame(self.__resolve(args[0]), frame)
+            if options:
+                canvas.itemconfigure(self.__resolve(args[0]), **options)
+        elif command == _CMD_DELETE:
+            canvas.delete(self.__resolve(args[0]))
+            if isinstance(args[0], int):
+                self.ids.pop(args[0], None)
+                self.text_areas.pop(args[0], None)
+        elif command == _CMD_CLEAR:
+            canvas.clear()
+            self.ids.clear()
+            self.text_areas.clear()
+        elif command == _CMD_RAISE:
+            canvas.tag_raise(self.__resolve(args[0]), self.__resolve(args[1]))
+        elif command == _CMD_LOWER:
+            canvas.tag_lower(self.__resolve(args[0]), self.__resolve(args[1]))
+        elif command == _CMD_ADD_TAG:
+            canvas.add_to_group(self.__resolve(args[0]), args[1])
+        elif command == _CMD_REMOVE_TAG:
+            canvas.remove_from_group(self.__resolve(args[0]), args[1])
+        elif command == _CMD_BACKGROUND:
+            canvas.set_canvas_background_fill(args[0])
+        elif command == _CMD_BUTTON:
+            canvas.create_button(args[0], args[1])
+        elif command == _CMD_TEXT_FIELD:
+            canvas.create_text_field(args[0], args[1])
+        elif command == _CMD_DELETE_TEXT_FIELD:
+            canvas.delete_text_field(args[0])
+            self.text_fields.pop(args[0], None)
+        elif command == _CMD_TEXT_AREA:
+            item_id, x, y, width, height, text, bg, tags = args
+            text_widget = canvas.create_text_area(x, y, width, height, text, bg)
+            # The text area's window is the newest object on the canvas
+            self.ids[item_id] = canvas._scene.next_id - 1
+            for tag in tags:
+                canvas.add_to_group(self.ids[item_id], tag)
+            self.text_areas[item_id] = [text_widget, text]
+        elif command == _CMD_SET_TEXT_AREA:
+            item_id, text, state = args
+            text_area = self.text_areas.get(item_id)
+            if text_area is not None:
+                text_widget = text_area[0]
+                text_widget.config(state=tkinter.NORMAL)
+                text_widget.delete("1.0", tkinter.END)
+                text_widget.insert(tkinter.END, text)
+                text_widget.config(state=state)
+                text_area[1] = text
+
+    def __create(self, kind, coords, options):
+        if kind == "image":
+            file_path = options.pop("image")
+            width = options.pop("width")
+            height = options.pop("height")
+            options.pop("anchor", None)
+            frame = options.pop("frame", None)
+            if frame is not None:
+                return self.canvas.create_sprite(coords[0], coords[1],
+                                                 self.canvas.load_atlas(file_path, width, height), frame)
+            return self.canvas.create_image_with_size(coords[0], coords[1], width, height, file_path, **options)
+        return self.canvas._create(kind, tuple(coords), options)
+
+    def __resolve(self, obj):
+        """
+        Turns a RemoteCanvas object id into the id of the same object here.  Tags are the same on both sides.
+        """
+        if isinstance(obj, int):
+            # An object that no longer exists here: give tkinter an id it has never handed out
+            return self.ids.get(obj, -1)
+        if isinstance(obj, str) and obj.isdigit():
+            return self.ids.get(int(obj), -1)
+        return obj
+
+
+def _serve(connection):
+    """
+    Shows the RemoteCanvas on the other end of the connection until it disconnects.
+    """
+    while True:
+        connection.wait()
+        messages = connection.receive()
+        if messages:
+            break
+    command, args = _unpack_command(messages[0])
+    if command != _CMD_HELLO:
+        raise ValueError("Expected a RemoteCanvas to connect, got command {}".format(command))
+    renderer = _Renderer(connection, args)
+    for body in messages[1:]:
+        renderer.apply(*_unpack_command(body))
+    renderer.run()
+
+
+def _main(args):
+    """
+    Runs a renderer for RemoteCanvas: `--render` serves the program on the other end of stdin and stdout, and
+    `--render-socket PATH` serves programs connecting to a Unix socket at PATH, one after another.
+    """
+    import sys
+    if args[:1] == ["--render"]:
+        connection = _Connection(sys.stdin.fileno(), sys.stdout.fileno())
+        # Anything printed would corrupt the messages going back over stdout
+        sys.stdout = sys.stderr
+        try:
+            _serve(connection)
+        except EOFError:
+            pass
+    elif args[:1] == ["--render-socket"] and len(args) == 2:
+        import socket
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(args[1])
+        server.listen(1)
+        try:
+            while True:
+                client, _ = server.accept()
+                try:
+                    _serve(_Connection(client.fileno(), client.fileno(), client))
+                except EOFError:
+                    pass
+                finally:
+                    client.close()
+        finally:
+            server.close()
+            os.remove(args[1])
+    else:
+        print("usage: python graphics.py --render | --render-socket PATH", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    import sys
+    _main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""
+Measures how quickly a game starts: how long importing graphics.py and the game takes, and how long it takes from
+starting the game's main() until its window first shows the canvas.  Each run is a fresh Python process, so the
+times are cold-start times.  Needs a display.
+
+Each game folder has a startup_benchmark.py that calls `main` with its games; this file can also be run directly:
+
+    python graphics_cip/startup_benchmark.py snake_game/snake.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+GRAPHICS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_RUNS = 5
+
+
+def _run_game(game_path):
+    """
+    Runs in the child process: imports graphics.py and the game, then runs the game's main() until the canvas
+    has been drawn in its window, and prints the times as JSON.
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, GRAPHICS_DIR)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(game_path)))
+    import graphics
+    graphics_imported = time.perf_counter()
+
+    import runpy
+    game = runpy.run_path(game_path, run_name="startup_benchmark")
+    game_imported = time.perf_counter()
+
+    def report():
+        shown = time.perf_counter()
+        print(json.dumps({
+            "import_graphics_ms": (graphics_imported - start) * 1000,
+            "import_game_ms": (game_imported - graphics_imported) * 1000,
+            "first_frame_ms": (shown - game_imported) * 1000,
+        }), flush=True)
+        os._exit(0)
+
+    def on_expose(canvas, event):
+        # The canvas is drawn once tkinter runs out of events to handle after it is first exposed
+        if event.widget is canvas:
+            canvas.main_window.unbind("<Expose>")
+            canvas.main_window.after_idle(report)
+
+    canvas_init = graphics.Canvas.__init__
+
+    def init(canvas, *args, **kwargs):
+        canvas_init(canvas, *args, **kwargs)
+        # Bound on the main window rather than the canvas, since using the canvas would show the window early
+        canvas.main_window.bind("<Expose>", lambda event: on_expose(canvas, event))
+
+    graphics.Canvas.__init__ = init
+    game["main"]()
+
+
+def main(game_paths, runs=DEFAULT_RUNS):
+    """
+    Starts each game runs times and prints the median of each time, in milliseconds.  The total is the time from
+    starting the Python process until the canvas was shown.
+    """
+    print("{:<28}{:>12}{:>12}{:>14}{:>10}".format("game", "graphics", "game", "first frame", "total"))
+    for game_path in game_paths:
+        results = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", game_path],
+                                    stdout=subprocess.PIPE, timeout=60, check=True).stdout
+            total = (time.perf_counter() - start) * 1000
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            result["total_ms"] = total
+            results.append(result)
+        medians = [statistics.median(result[key] for result in results)
+                   for key in ("import_graphics_ms", "import_game_ms", "first_frame_ms", "total_ms")]
+        print("{:<28}{:>10.1f}ms{:>10.1f}ms{:>12.1f}ms{:>8.1f}ms".format(os.path.basename(game_path), *medians))
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--run":
+        _run_game(sys.argv[2])
+    else:
+        main([sys.argv[1]], int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RUNS)
@@ -1,6 +1,5 @@
 from graphics import Canvas
 import random
-import time
 
 """
 File: mastermind.py
@@ -687,7 +686,7 @@ def play_row(canvas, guess, color_picker, truth):
 
         # Sleep
         canvas.update() 
-        time.sleep(DELAY)
+        canvas.sleep(DELAY)
         
     return is_correct
 
@@ -807,20 +806,22 @@ def play_mastermind(canvas, difficulty, has_duplicates):
     #print(truth)
     is_winner = False
 
-    # Create the guess rows
-    guesses = []
-    x = CODE_PADDING + CODE_SIZE + 2*CODE_PADDING
-    y = CODE_PADDING + CODE_SIZE + CODE_PADDING
-    for i in range(max_guesses):
-        guess = Guess(canvas, x, y + i*(CODE_SIZE+CODE_PADDING), num_pegs)
-        guess.render(canvas)
-        guesses.append(guess)
-
-    # Create color picker
-    x = CODE_PADDING
-    y = CODE_PADDING + CODE_SIZE + CODE_PADDING
-    color_picker = ColorPicker(canvas, x, y, colors)
-    color_picker.render(canvas)
+    # Draw the whole board in one go
+    with canvas.batch():
+        # Create the guess rows
+        guesses = []
+        x = CODE_PADDING + CODE_SIZE + 2*CODE_PADDING
+        y = CODE_PADDING + CODE_SIZE + CODE_PADDING
+        for i in range(max_guesses):
+            guess = Guess(canvas, x, y + i*(CODE_SIZE+CODE_PADDING), num_pegs)
+            guess.render(canvas)
+            guesses.append(guess)
+
+        # Create color picker
+        x = CODE_PADDING
+        y = CODE_PADDING + CODE_SIZE + CODE_PADDING
+        color_picker = ColorPicker(canvas, x, y, colors)
+        color_picker.render(canvas)
 
     # Play the game
     for i in range(max_guesses):
@@ -842,11 +843,12 @@ def main():
     """
     # Setup
     canvas = Canvas(CANVAS_WIDTH, CANVAS_HEIGHT)
-    display_header(canvas)
+    with canvas.batch():
+        display_header(canvas)
     
-    # User settings
-    settings = GameSettings()
-    settings.render(canvas)
+        # User settings
+        settings = GameSettings()
+        settings.render(canvas)
     settings.handle_config(canvas)
 
     difficulty = settings.difficulty
@@ -859,9 +861,10 @@ def main():
     canvas.update()       
     
     # Display info
-    display_header(canvas)
-    display_difficulty(canvas, difficulty)
-    display_info(canvas, has_duplicates)
+    with canvas.batch():
+        display_header(canvas)
+        display_difficulty(canvas, difficulty)
+        display_info(canvas, has_duplicates)
 
     # Play the game
     print("Starting game (Mode: {}) (Allow duplicates: {})".format(difficulty, has_duplicates))
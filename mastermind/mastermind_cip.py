@@ -658,7 +658,7 @@ def play_row(canvas, guess, color_picker, truth):
                     color_picker.reset(canvas)
 
         # Sleep
-        time.sleep(DELAY)
+        canvas.sleep(DELAY)
         
     return is_correct
 
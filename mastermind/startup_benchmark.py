@@ -0,0 +1,16 @@
+"""
+Measures how quickly the desktop and mobile versions of mastermind start.  Needs a display.  See
+graphics_cip/startup_benchmark.py.
+
+    python mastermind/startup_benchmark.py
+"""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "graphics_cip"))
+
+import startup_benchmark
+
+if __name__ == "__main__":
+    startup_benchmark.main([os.path.join(HERE, "mastermind.py"), os.path.join(HERE, "mastermind-mobile.py")])
@@ -237,7 +237,7 @@ def main():
         else:
             # Reset
             print("No match. Try again.")
-            time.sleep(1)
+            canvas.sleep(1)
             hide_card(canvas, display[first_index])
             hide_card(canvas, display[second_index])        
 
@@ -268,7 +268,7 @@ def main():
         else:
             # Reset
             print("No match. Try again.")
-            time.sleep(1)
+            canvas.sleep(1)
             first_card.hide_card()
             second_card.hide_card()
     
@@ -1,5 +1,4 @@
 from graphics import Canvas
-import time
 import random
     
 CANVAS_WIDTH = 400
@@ -125,7 +124,7 @@ def main():
         canvas.move(player, move_x, move_y)
 
         # sleep
-        time.sleep(DELAY)        
+        canvas.sleep(DELAY)        
 
         # Milestone #4: Detecting collisions
         player_x = canvas.get_left_x(player)
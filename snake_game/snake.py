@@ -1,6 +1,5 @@
 from graphics import Canvas
 import random
-import time
 
 """
 File: snake.py
@@ -45,6 +44,7 @@ class Food:
     """
     def __init__(self):
         self.food = None
+        self.pool = None
 
     def _get_random_location(self):
         return SIZE * random.randint(0, CANVAS_WIDTH//SIZE-1), SIZE * random.randint(0, CANVAS_HEIGHT//SIZE-1)
@@ -57,17 +57,13 @@ class Food:
         while canvas.find_overlapping(x, y, x+SIZE, y+SIZE):
             x, y = self._get_random_location()
         
-        # Clear previous food
+        # Reuse the previous food instead of creating a new oval each time
+        if self.pool is None:
+            self.pool = canvas.pool('oval', FILL_COLOR, SIZE, SIZE)
         if self.food:
-            canvas.delete(self.food)
-
-        self.food = canvas.create_oval(
-            x,
-            y,
-            x+SIZE,
-            y+SIZE,
-            FILL_COLOR
-        )
+            self.pool.release(self.food)
+
+        self.food = self.pool.acquire(x, y)
         canvas.update()
 
 class Snake:
@@ -274,7 +270,7 @@ def main():
 
         # sleep
         canvas.update()
-        time.sleep(DELAY)      
+        canvas.sleep(DELAY)      
 
     # wait for the user to close the window
     canvas.mainloop()                      
@@ -1,6 +1,5 @@
 from graphics import Canvas
 import random
-import time
 
 """
 File: snake_2player.py
@@ -380,7 +379,7 @@ def wait_for_key_press(canvas):
     key = canvas.get_last_key_press()
     while not key or key[0] != ' ':
         key = canvas.get_last_key_press()
-        time.sleep(DELAY) 
+        canvas.sleep(DELAY) 
 
 def display_game_over(canvas, winner):
     """
@@ -462,7 +461,7 @@ def play_snake(canvas, ignore_list):
             is_game_over = True
 
         # sleep
-        time.sleep(DELAY)
+        canvas.sleep(DELAY)
 
     player_1.fade(canvas)
     player_2.fade(canvas)
@@ -1,6 +1,5 @@
 from graphics import Canvas
 import random
-import time
 
 """
 File: snake.py
@@ -397,7 +396,7 @@ def wait_for_key_press(canvas):
     key = canvas.get_last_key_press()
     while not key or key[0] != ' ':
         key = canvas.get_last_key_press()
-        time.sleep(DELAY) 
+        canvas.sleep(DELAY) 
 
 def display_scores(canvas, curr_high_score):
     """
@@ -502,7 +501,7 @@ def play_snake(canvas, score, high_score, curr_high_score):
         update_canvas(canvas)
 
         # Sleep
-        time.sleep(delay)
+        canvas.sleep(delay)
 
     # Grey out the game pieces
     snake.fade(canvas)
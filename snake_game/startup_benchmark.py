@@ -0,0 +1,15 @@
+"""
+Measures how quickly the snake game starts.  Needs a display.  See graphics_cip/startup_benchmark.py.
+
+    python snake_game/startup_benchmark.py
+"""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "graphics_cip"))
+
+import startup_benchmark
+
+if __name__ == "__main__":
+    startup_benchmark.main([os.path.join(HERE, "snake.py")])
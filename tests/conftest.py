@@ -0,0 +1,34 @@
+import os
+import sys
+import tkinter
+
+import pytest
+
+# The games import graphics.py as a top-level module from the folder it is copied into
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "graphics_cip"))
+
+import graphics  # noqa: E402
+
+
+@pytest.fixture
+def canvas():
+    """
+    A real tkinter Canvas, or a skipped test if there is no display to open its window on.
+    """
+    try:
+        canvas = graphics.Canvas()
+    except tkinter.TclError:
+        pytest.skip("needs a display")
+    yield canvas
+    try:
+        canvas.main_window.destroy()
+    except tkinter.TclError:
+        pass
+
+
+@pytest.fixture
+def headless():
+    """
+    A HeadlessCanvas, which needs no display.
+    """
+    return graphics.HeadlessCanvas(200, 100)
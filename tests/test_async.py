@@ -0,0 +1,37 @@
+"""
+Tests of the asyncio functions, driven through HeadlessCanvas so each frame moves the simulated clock.
+"""
+import asyncio
+
+import pytest
+
+
+def test_the_update_task_stops_when_nothing_is_waiting(headless):
+    async def main():
+        assert await headless.frame() == 1
+        assert await headless.frame() == 2
+        bridge = headless._async_bridge
+        await asyncio.sleep(0)
+        assert bridge.task.done()
+        # The next wait starts it again
+        assert await headless.frame() == 3
+        return bridge
+
+    bridge = asyncio.run(main())
+    assert bridge.task.result() is None
+
+
+def test_waiters_get_the_error_when_the_update_fails(headless):
+    def closed():
+        raise RuntimeError("window closed")
+
+    async def main():
+        headless.update = closed
+        with pytest.raises(RuntimeError, match="window closed"):
+            await headless.next_click()
+        await asyncio.sleep(0)
+        return headless._async_bridge.task
+
+    task = asyncio.run(main())
+    assert task.done()
+    assert task.exception() is None
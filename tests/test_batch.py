@@ -0,0 +1,16 @@
+"""
+Tests of batch and of the bulk create functions, driven through HeadlessCanvas.
+"""
+
+
+def test_batch_sees_changes_straight_away(headless):
+    with headless.batch():
+        rect = headless.create_rectangle(0, 0, 10, 10)
+        headless.move(rect, 10, 0)
+        assert headless.find_overlapping(15, 5, 16, 6) == (rect,)
+
+
+def test_create_rectangles_gives_each_its_own_fill(headless):
+    rects = headless.create_rectangles([(0, 0, 5, 5), (50, 50, 55, 55)], fills=["red", "blue"])
+    assert [headless.itemcget(r, "fill") for r in rects] == ["red", "blue"]
+    assert headless.find_overlapping(51, 51, 52, 52) == (rects[1],)
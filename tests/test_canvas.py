@@ -0,0 +1,75 @@
+"""
+Tests of the tkinter Canvas.  They need a display, and are skipped without one.
+"""
+import tkinter
+
+import pytest
+
+
+def test_wait_for_click_raises_when_window_closed_while_waiting(canvas):
+    canvas.after(50, canvas.main_window.destroy)
+    with pytest.raises(tkinter.TclError):
+        canvas.wait_for_click()
+
+
+def test_wait_for_click_raises_when_window_already_closed(canvas):
+    canvas.main_window.destroy()
+    with pytest.raises(tkinter.TclError):
+        canvas.wait_for_click()
+
+
+def test_wait_for_click_times_out(canvas):
+    assert canvas.wait_for_click(timeout=0.05) is None
+
+
+def test_run_loop_raises_the_exception_from_tick(canvas):
+    def tick():
+        raise ValueError("tick failed")
+
+    with pytest.raises(ValueError, match="tick failed"):
+        canvas.run_loop(tick, hz=100)
+
+
+def test_run_loop_returns_when_window_closed(canvas):
+    canvas.after(100, canvas.main_window.destroy)
+    stats = canvas.run_loop(lambda: None, hz=100)
+    assert stats["ticks"] > 0
+
+
+def test_profiling_before_the_window_is_shown_leaves_no_stand_in(canvas):
+    canvas.enable_profiling()
+    canvas.create_text(10, 10, "shows the window")
+    canvas.disable_profiling()
+    assert canvas.tk is canvas.main_window.tk
+
+
+def test_batch_that_shows_the_window_is_sent_once(canvas):
+    canvas.enable_profiling()
+    with canvas.batch():
+        rect = canvas.create_rectangle(0, 0, 10, 10)
+        canvas.move(rect, 5, 5)
+    assert canvas.type(rect) == "rectangle"
+    assert canvas.bbox(rect)[0] == 5
+
+
+def test_inherited_stacking_and_tagging_keep_the_scene_up_to_date(canvas):
+    first = canvas.create_rectangle(0, 0, 10, 10)
+    second = canvas.create_rectangle(20, 20, 30, 30)
+    canvas.lift(first)
+    canvas.lower(second)
+    canvas.addtag_overlapping("near", 5, 5, 25, 25)
+    canvas.addtag_closest("closest", 100, 100)
+    canvas.dtag(first, "near")
+    canvas.scale(second, 20, 20, 2, 2)
+    for tag in ("near", "closest", "all"):
+        assert tuple(item.id for item in canvas._scene.find(tag)) == canvas.find_withtag(tag)
+    assert canvas.find_overlapping(35, 35, 36, 36) == (second,)
+
+
+def test_getters_of_reversed_rectangles_match_tkinter(canvas):
+    canvas.check_geometry = True
+    rect = canvas.create_rectangle(50, 50, 10, 10)
+    assert canvas.get_left_x(rect) == 10
+    assert canvas.get_top_y(rect) == 10
+    canvas.scale(rect, 0, 0, -1, 1)
+    assert canvas.get_left_x(rect) == -50
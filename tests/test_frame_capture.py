@@ -0,0 +1,20 @@
+"""
+Tests of the HeadlessCanvas frame rasterizer.
+"""
+import pytest
+
+import graphics
+
+
+def test_render_frame_draws_shapes():
+    pytest.importorskip("numpy")
+    canvas = graphics.HeadlessCanvas(40, 20)
+    rect = canvas.create_rectangle(0, 0, 10, 10, fill="red")
+    frame = canvas.render_frame()
+    assert frame.shape == (20, 40, 3)
+    assert tuple(frame[5, 5]) == (255, 0, 0)
+    assert tuple(frame[15, 30]) == (255, 255, 255)
+    canvas.move(rect, 20, 0)
+    frame = canvas.render_frame()
+    assert tuple(frame[5, 5]) == (255, 255, 255)
+    assert tuple(frame[5, 25]) == (255, 0, 0)
@@ -0,0 +1,46 @@
+"""
+Tests of HeadlessCanvas, which keeps the canvas contents in a pure-Python scene and needs no display.
+"""
+import pytest
+
+
+def test_queued_input_is_delivered_by_update(headless):
+    presses = []
+    headless.on_mouse_pressed = lambda x, y: presses.append((x, y))
+    headless.queue_click(5, 6)
+    headless.queue_key_press("Left")
+    assert presses == []
+    assert headless.has_pending_input()
+    headless.update()
+    assert presses == [(5, 6)]
+    assert (headless.get_mouse_x(), headless.get_mouse_y()) == (5, 6)
+    assert headless.is_key_down("Left")
+    assert [key.keysym for key in headless.get_new_key_presses()] == ["Left"]
+    headless.queue_key_release("Left")
+    headless.update()
+    assert not headless.is_key_down("Left")
+
+
+def test_wait_for_click_takes_the_next_queued_click(headless):
+    headless.queue_key_press("a")
+    headless.queue_click(7, 8)
+    assert headless.wait_for_click() == [7, 8]
+    assert headless.get_last_click() == [7, 8]
+    with pytest.raises(RuntimeError):
+        headless.wait_for_click()
+    assert headless.wait_for_click(timeout=0.5) is None
+    assert headless.current_time == 500
+
+
+def test_timers_run_on_the_simulated_clock(headless):
+    fired = []
+    headless.after(100, fired.append, "late")
+    headless.after(10, fired.append, "early")
+    cancelled = headless.after(50, fired.append, "cancelled")
+    headless.after_cancel(cancelled)
+    headless.advance(20)
+    assert fired == ["early"]
+    assert headless.current_time == 20
+    headless.mainloop()
+    assert fired == ["early", "late"]
+    assert headless.current_time == 100
@@ -0,0 +1,26 @@
+"""
+Tests of run_loop, driven through HeadlessCanvas so the ticks run on the simulated clock.
+"""
+import pytest
+
+
+def test_run_loop_runs_on_the_simulated_clock(headless):
+    ticks = []
+
+    def tick():
+        ticks.append(headless.current_time)
+        if len(ticks) == 30:
+            headless.stop_loop()
+
+    stats = headless.run_loop(tick, hz=30)
+    assert stats["ticks"] == 30
+    assert stats["skipped_ticks"] == 0
+    assert 990 <= ticks[-1] - ticks[0] + 1000 / 30 <= 1010
+
+
+def test_run_loop_raises_the_exception_from_tick(headless):
+    def tick():
+        raise ValueError("tick failed")
+
+    with pytest.raises(ValueError, match="tick failed"):
+        headless.run_loop(tick)
@@ -0,0 +1,18 @@
+"""
+Tests of Canvas.pool, driven through HeadlessCanvas.
+"""
+
+
+def test_pool_reuses_released_shapes(headless):
+    pool = headless.pool("rectangle", "green", 10, 10)
+    first = pool.acquire(0, 0)
+    second = pool.acquire(20, 0)
+    pool.release(first)
+    assert headless.find_overlapping(1, 1, 2, 2) == ()
+    again = pool.acquire(40, 40, fill="red")
+    assert again == first
+    assert headless.get_left_x(again) == 40
+    assert headless.itemcget(again, "fill") == "red"
+    assert pool.stats() == {"in_use": 2, "free": 0, "created": 2, "reused": 1, "high_water": 2}
+    assert len(headless.find_all()) == 2
+    assert second in headless.find_all()
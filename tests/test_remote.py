@@ -0,0 +1,107 @@
+"""
+Tests of RemoteCanvas against a stand-in renderer on a socket, so they run without a display.
+"""
+import os
+import socket
+import tkinter
+
+import pytest
+
+import graphics
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """
+    A RemoteCanvas connected to a socket whose other end the test plays the renderer on.
+    """
+    path = os.path.join(str(tmp_path), "render.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    canvas = graphics.RemoteCanvas(200, 100, socket_path=path)
+    renderer, _ = server.accept()
+    server.close()
+    yield canvas, renderer
+    renderer.close()
+    canvas.connection.close()
+
+
+def send_input(renderer, kind, numbers=(), strings=()):
+    record = graphics._pack_input(kind, 0, numbers, strings)
+    renderer.sendall(graphics._MESSAGE_LENGTH.pack(len(record)) + record)
+
+
+def receive_commands(renderer):
+    """
+    Returns the (command, args) pairs the RemoteCanvas has sent so far, leaving out frames.
+    """
+    connection = graphics._Connection(renderer.fileno(), renderer.fileno())
+    connection.wait(1)
+    commands = [graphics._unpack_command(body) for body in connection.receive()]
+    return [(command, args) for command, args in commands if command != graphics._CMD_FRAME]
+
+
+def test_renderer_errors_are_raised_by_update(remote):
+    canvas, renderer = remote
+    send_input(renderer, graphics._LOG_RENDER_ERROR, strings=('unknown color name "bleu"',))
+    send_input(renderer, graphics._LOG_MOUSE_PRESS, (3, 4))
+    canvas.connection.wait(1)
+    with pytest.raises(tkinter.TclError, match="bleu"):
+        canvas.update()
+    # Input that arrived with the error is still delivered
+    assert [(click.x, click.y) for click in canvas.get_new_mouse_clicks()] == [(3, 4)]
+    canvas.update()
+
+
+def test_update_raises_once_renderer_closes(remote):
+    canvas, renderer = remote
+    renderer.close()
+    with pytest.raises(tkinter.TclError):
+        for _ in range(10):
+            canvas.update()
+
+
+def test_run_loop_follows_the_wall_clock(remote):
+    canvas, renderer = remote
+    ticks = []
+
+    def tick():
+        ticks.append(canvas.current_time)
+        return len(ticks) < 6
+
+    stats = canvas.run_loop(tick, hz=50)
+    assert stats["ticks"] == 6
+    # Six ticks at 50 per second take a tenth of a second, not no time at all as on a HeadlessCanvas
+    assert ticks[-1] - ticks[0] == pytest.approx(100, abs=40)
+
+
+def test_mainloop_returns_when_renderer_closes(remote):
+    canvas, renderer = remote
+    canvas.after(50, renderer.close)
+    canvas.mainloop()
+    assert canvas.renderer_closed
+
+
+def test_text_areas_are_sent_to_the_renderer_and_typing_comes_back(remote):
+    canvas, renderer = remote
+    canvas.update()
+    receive_commands(renderer)
+    text_area = canvas.create_text_area(10, 20, 150, 50, text="hello")
+    canvas.update()
+    item_id = text_area.id
+    assert receive_commands(renderer) == [
+        (graphics._CMD_TEXT_AREA, (item_id, 10, 20, 150, 50, "hello", "#ececec", ())),
+    ]
+    text_area.insert(tkinter.END, " world")
+    canvas.update()
+    assert receive_commands(renderer) == [(graphics._CMD_SET_TEXT_AREA, (item_id, "hello world", "disabled"))]
+
+    # Long text comes back in pieces
+    typed = "x" * 100
+    send_input(renderer, graphics._LOG_TEXT_AREA, (item_id, 1), (typed[:63],))
+    send_input(renderer, graphics._LOG_TEXT_AREA, (item_id, 0), (typed[63:],))
+    canvas.connection.wait(1)
+    canvas.update()
+    assert text_area.get("1.0", tkinter.END) == typed
+    assert receive_commands(renderer) == []
@@ -0,0 +1,47 @@
+"""
+Tests of input replay, driven through HeadlessCanvas.
+"""
+import random
+import time
+
+import graphics
+
+
+def test_replay_delivers_recorded_input(headless, tmp_path):
+    path = str(tmp_path / "input.rec")
+    recorder = graphics._InputRecorder(path, 1234)
+    recorder.record(graphics._LOG_MOUSE_PRESS, 1, (5, 6))
+    recorder.record(graphics._LOG_MOUSE_RELEASE, 1, (5, 6))
+    recorder.record(graphics._LOG_KEY_PRESS, 2, strings=("a", "a"))
+    recorder.record(graphics._LOG_MOUSE_X, 2, (42,))
+    recorder.close()
+
+    headless.start_replay(path)
+    expected_random = random.random()
+    random.seed(1234)
+    assert random.random() == expected_random
+    headless.update()
+    assert [(click.x, click.y) for click in headless.get_new_mouse_clicks()] == [(5, 6)]
+    assert headless.get_new_key_presses() == []
+    headless.update()
+    assert [key.keysym for key in headless.get_new_key_presses()] == ["a"]
+    assert headless.get_mouse_x() == 42
+    assert headless.stop_replay() == 0
+
+
+def test_sleep_is_skipped_only_when_asked(headless, tmp_path):
+    path = str(tmp_path / "input.rec")
+    graphics._InputRecorder(path, 1234).close()
+    real_sleep = time.sleep
+
+    headless.start_replay(path)
+    headless.sleep(0.5)
+    assert headless.current_time == 500
+
+    headless.start_replay(path, skip_sleep=True)
+    headless.sleep(0.5)
+    assert headless.current_time == 500
+    assert time.sleep is real_sleep
+    headless.stop_replay()
+    headless.sleep(0.5)
+    assert headless.current_time == 1000
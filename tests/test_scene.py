@@ -0,0 +1,52 @@
+"""
+Tests of the shadow scene that answers geometry queries without asking tkinter, driven through HeadlessCanvas.
+"""
+
+
+def test_find_overlapping_uses_the_spatial_hash(headless):
+    # Enough objects, spread over many cells, that the hash rather than a scan of every object answers
+    rects = [headless.create_rectangle(x, y, x + 5, y + 5) for x in range(0, 2000, 20) for y in range(0, 2000, 20)]
+    assert headless.find_overlapping(21, 21, 22, 22) == (rects[101],)
+    assert headless.find_overlapping(1011, 1011, 1012, 1012) == ()
+    headless.move_to(rects[0], 1008, 1008)
+    assert headless.find_overlapping(1011, 1011, 1012, 1012) == (rects[0],)
+    headless.set_hidden(rects[0], True)
+    assert headless.find_overlapping(1011, 1011, 1012, 1012) == ()
+
+
+def test_find_overlapping_is_in_stacking_order(headless):
+    bottom = headless.create_rectangle(0, 0, 10, 10)
+    top = headless.create_oval(0, 0, 10, 10)
+    headless.raise_to_front(bottom)
+    assert headless.find_overlapping(4, 4, 6, 6) == (top, bottom)
+
+
+def test_getters_answer_from_the_scene(headless):
+    rect = headless.create_rectangle(10, 20, 40, 60)
+    headless.move(rect, 5, -5)
+    assert headless.get_left_x(rect) == 15
+    assert headless.get_top_y(rect) == 15
+    # Like tkinter, the size includes the outline
+    assert headless.get_obj_width(rect) == 32
+    assert headless.get_obj_height(rect) == 42
+    assert headless.coords(rect) == [15, 15]
+    assert headless.type(rect) == "rectangle"
+
+
+def test_find_colliding_follows_shapes(headless):
+    ball = headless.create_oval(0, 0, 10, 10)
+    # Inside the ball's bounding box, but outside the circle
+    corner = headless.create_rectangle(10, 10, 13, 13)
+    paddle = headless.create_rectangle(5, 5, 20, 20)
+    assert headless.find_colliding(ball) == (paddle,)
+    headless.delete(paddle)
+    assert headless.find_colliding(ball) == ()
+    assert headless.find_all() == (ball, corner)
+
+
+def test_getters_put_the_corners_of_reversed_rectangles_in_order(headless):
+    rect = headless.create_rectangle(50, 50, 10, 10)
+    assert headless.get_left_x(rect) == 10
+    assert headless.get_top_y(rect) == 10
+    assert headless.coords(rect) == [10, 10]
+    assert headless.get_obj_width(rect) == 42
@@ -0,0 +1,17 @@
+"""
+Tests of snapshot and restore, driven through HeadlessCanvas.
+"""
+
+
+def test_snapshot_and_restore(headless):
+    rect = headless.create_rectangle(0, 0, 10, 10, fill="red")
+    text = headless.create_text(20, 20, "hello")
+    saved = headless.snapshot()
+    headless.move(rect, 50, 50)
+    headless.set_text(text, "changed")
+    ids = headless.restore(saved)
+    assert sorted(ids) == [rect, text]
+    assert headless.get_left_x(ids[rect]) == 0
+    assert headless.itemcget(ids[rect], "fill") == "red"
+    assert headless.get_text(ids[text]) == "hello"
+    assert len(headless.find_all()) == 2
@@ -0,0 +1,33 @@
+"""
+Tests of the quoting used to send batched commands to tkinter as one Tcl script.  They only need Tcl, not a display.
+"""
+import tkinter
+
+import pytest
+
+import graphics
+
+
+@pytest.fixture(scope="module")
+def tcl():
+    return tkinter.Tcl()
+
+
+@pytest.mark.parametrize("value", [
+    "plain", "two words", "", "a{b", "c$[d]\\", "line\nbreak", 12, 12.5, -3,
+])
+def test_words_arrive_unchanged(tcl, value):
+    assert tcl.eval("set x " + graphics._tcl_quote(value)) == str(value)
+
+
+@pytest.mark.parametrize("value", [
+    ("Arial", 12.5), ("Comic Sans MS", -14, "bold"), (), ("",), ["a{b", "c$[d]\\"],
+])
+def test_tuples_arrive_as_tcl_lists(tcl, value):
+    tcl.eval("set x " + graphics._tcl_quote(value))
+    assert tcl.splitlist(tcl.eval("set x")) == tuple(str(element) for element in value)
+
+
+def test_nested_lists(tcl):
+    tcl.eval("set x " + graphics._tcl_quote([1, (2, "x y")]))
+    assert tcl.eval("lindex $x 1 1") == "x y"
@@ -0,0 +1,65 @@
+"""
+Tests of ThreadedCanvas, driving a HeadlessCanvas so they run without a display.
+"""
+import contextlib
+import threading
+import time
+
+import graphics
+
+
+class RecordingCanvas(graphics.HeadlessCanvas):
+    """
+    A HeadlessCanvas that logs when batches start and end, and when get_text asks about the canvas.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    @contextlib.contextmanager
+    def batch(self):
+        self.log.append("batch")
+        with super().batch():
+            yield
+        self.log.append("end batch")
+
+    def get_text(self, obj):
+        self.log.append("get_text")
+        return super().get_text(obj)
+
+
+def test_queries_answered_by_tkinter_are_not_batched():
+    canvas = RecordingCanvas()
+    threaded = graphics.ThreadedCanvas(canvas)
+
+    def worker(threaded):
+        text = threaded.create_text(0, 0, "before")
+        threaded.set_text(text, "after")
+        return threaded.get_text(text).result()
+
+    assert threaded.run(worker, threaded) == "after"
+    assert canvas.log.index("get_text") > canvas.log.index("end batch")
+
+
+def test_scene_queries_see_batched_changes():
+    canvas = graphics.HeadlessCanvas()
+    threaded = graphics.ThreadedCanvas(canvas)
+
+    def worker(threaded):
+        rect = threaded.create_rectangle(0, 0, 10, 10)
+        threaded.move(rect, 5, 0)
+        return threaded.get_left_x(rect).result()
+
+    assert threaded.run(worker, threaded) == 5
+
+
+def test_wait_for_click_sleeps_until_clicked():
+    canvas = graphics.HeadlessCanvas()
+    threaded = graphics.ThreadedCanvas(canvas)
+    threading.Timer(0.3, canvas.queue_click, (3, 4)).start()
+
+    start = time.process_time()
+    assert threaded.run(lambda: threaded.wait_for_click()) == [3, 4]
+    # Polling for the click would keep both threads busy for the whole 0.3 seconds
+    assert time.process_time() - start < 0.15